@@ -0,0 +1,9 @@
+"""
+Performance benchmarks for the task app.
+
+Each module is a standalone script run from the project root, for example::
+
+    python -m benchmarks.board_render
+
+They run in-process against a throwaway test database and print their results.
+"""
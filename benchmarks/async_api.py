@@ -0,0 +1,145 @@
+"""
+Load test of the synchronous task API against the async one, both served by uvicorn.
+
+For each stack a uvicorn server is started on a fresh database (production SQLite
+profile) and ``--clients`` concurrent clients hit it for ``--seconds`` per scenario::
+
+    python -m benchmarks.async_api [--clients 100] [--seconds 10] [--tasks 50]
+
+Requires ``uvicorn`` and ``httpx``, which are not dependencies of the application.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+from .utils import print_table, setup_django_file_db
+
+STACKS = {
+    'sync': '/api/tasks/',
+    'async': '/api/async/tasks/',
+}
+
+# Note that after its first request the sync list is served from the per-user
+# cache, while the async list reads the database every time.
+SCENARIOS = ['retrieve', 'list', 'update']
+
+
+def prepare(path, tasks, results):
+    setup_django_file_db(path, 'production')
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    from task_manager.models import Task
+    from benchmarks.utils import create_user, create_tasks
+    call_command('migrate', verbosity=0)
+    user = create_user('benchmark')
+    create_tasks(user, tasks)
+    results.put((Token.objects.create(user=user).key, list(Task.objects.values_list('id', flat=True))))
+
+
+def serve(path, port):
+    setup_django_file_db(path, 'production')
+    import uvicorn
+    from config.asgi import application
+    uvicorn.run(application, host='127.0.0.1', port=port, log_level='warning', lifespan='off')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def make_request(client, prefix, scenario, task_id):
+    if scenario == 'retrieve':
+        return client.get(f'{prefix}{task_id}/')
+    if scenario == 'list':
+        return client.get(f'{prefix}?fields=id,title,status,due_date')
+    return client.patch(f'{prefix}{task_id}/', json={'status': 'completed'})
+
+
+async def load(port, token, ids, prefix, scenario, clients, seconds):
+    import httpx
+    latencies = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients)
+    headers = {'Authorization': f'Token {token}'}
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', headers=headers, limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def worker(offset):
+            nonlocal errors
+            index = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await make_request(client, prefix, scenario, ids[index % len(ids)])
+                except httpx.TransportError:
+                    errors += 1
+                else:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    errors += response.status_code >= 400
+                index += clients
+
+        await asyncio.gather(*(worker(offset) for offset in range(clients)))
+    return latencies, errors
+
+
+def run(stack, args):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'db.sqlite3')
+        results = context.Queue()
+        setup = context.Process(target=prepare, args=(path, args.tasks, results))
+        setup.start()
+        token, ids = results.get()
+        setup.join()
+
+        port = free_port()
+        server = context.Process(target=serve, args=(path, port))
+        server.start()
+        try:
+            wait_for_port(port)
+            rows = []
+            for scenario in SCENARIOS:
+                latencies, errors = asyncio.run(load(port, token, ids, STACKS[stack], scenario, args.clients, args.seconds))
+                latencies.sort()
+                rows.append([
+                    scenario, stack, f'{len(latencies) / args.seconds:,.0f}', errors,
+                    f'{statistics.median(latencies):.1f}', f'{latencies[int(len(latencies) * 0.99) - 1]:.1f}',
+                ])
+            return rows
+        finally:
+            server.terminate()
+            server.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=100)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--tasks', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {stack: run(stack, args) for stack in STACKS}
+    rows = [row for scenario_rows in zip(*results.values()) for row in scenario_rows]
+    print_table(['scenario', 'stack', 'req/s', 'errors', 'p50 ms', 'p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Render time of the task board against the number of tasks.
+
+Compares the previous template, which looped over every task once per status
+column, with the column-limited board served by ``TaskListView``: cold, after one
+task changed, which reloads the columns but reuses the other cached cards, and with
+its per-user cache warm::
+
+    python -m benchmarks.board_render [--sizes 100 1000 10000 50000]
+"""
+import argparse
+
+from .utils import setup_django, create_user, create_tasks, clear_tasks, measure, print_table
+
+# The board template as it was before columns were grouped in the view.
+LEGACY_TEMPLATE = """{% extends 'base.html' %}
+{% block body %}
+<div class="task-board">
+    {% for status in statuses %}
+    <div class="kanban-block">
+        {% for task in tasks %}
+            {% if task.status == status %}
+            <div class="task" id="task-{{task.id}}" onclick="editTask(`{% url 'task_detail' task.id %}`)">
+                <span>{{task.title}}</span>
+                <div class="task-info"><span class="task-due">{{task.due_date}}</span></div>
+            </div>
+            {% endif %}
+        {% endfor %}
+    </div>
+    {% endfor %}
+</div>
+{% endblock body %}
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.core.cache import cache
+    from django.template import engines
+    from django.test import Client, RequestFactory
+    from django.urls import reverse
+    from task_manager.models import Task
+    from task_manager.signals import tasks_saved
+
+    user = create_user('benchmark')
+    client = Client()
+    client.force_login(user)
+    request = RequestFactory().get(reverse('task_list'))
+    request.user = user
+    legacy = engines['django'].from_string(LEGACY_TEMPLATE)
+    statuses = [status for status, _ in Task.STATUS_CHOICES]
+
+    def render_legacy():
+        legacy.render({'tasks': Task.objects.filter(assignee=user), 'statuses': statuses}, request)
+
+    def render_board_cold():
+        cache.clear()
+        client.get(reverse('task_list'))
+
+    def render_board_one_changed():
+        task = Task.objects.filter(assignee=user).order_by('due_date', 'id').first()
+        task.save()
+        tasks_saved.send(sender=Task, tasks=[task], created=False)
+        client.get(reverse('task_list'))
+
+    def render_board_cached():
+        client.get(reverse('task_list'))
+
+    rows = []
+    for size in args.sizes:
+        clear_tasks()
+        create_tasks(user, size)
+        rows.append([
+            size,
+            f'{measure(render_legacy, args.repeat):.1f}',
+            f'{measure(render_board_cold, args.repeat):.1f}',
+            f'{measure(render_board_one_changed, args.repeat):.1f}',
+            f'{measure(render_board_cached, args.repeat):.1f}',
+        ])
+    print_table(['tasks', 'legacy ms', 'board ms', 'one changed ms', 'board cached ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+Task read latency during a login storm, with and without the password hashing limit.
+
+A uvicorn server (production SQLite profile) serves ``--readers`` clients reading
+task details for ``--seconds``, first alone, then while ``--logins`` clients log in
+as fast as they can, once with the limit lifted and once with the configured limit::
+
+    python -m benchmarks.login_storm [--readers 10] [--logins 20] [--seconds 10]
+
+Requires ``uvicorn`` and ``httpx``, which are not dependencies of the application.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+
+from .async_api import free_port, wait_for_port
+from .utils import print_table, setup_django_file_db
+
+SCENARIOS = {
+    # name: (login clients, environment of the server)
+    'reads only': (False, {}),
+    'storm, no limit': (True, {'TASK_PASSWORD_HASHING_CONCURRENCY': '1000', 'TASK_PASSWORD_HASHING_QUEUE_SIZE': '1000'}),
+    'storm, limited': (True, {}),
+}
+
+
+def prepare(path, results):
+    setup_django_file_db(path, 'production')
+    from django.core.management import call_command
+    from rest_framework.authtoken.models import Token
+    from task_manager.models import Task
+    from benchmarks.utils import create_user, create_tasks
+    call_command('migrate', verbosity=0)
+    user = create_user('reader')
+    create_user('storm', password='storm-password')
+    create_tasks(user, 50)
+    results.put((Token.objects.create(user=user).key, list(Task.objects.values_list('id', flat=True))))
+
+
+def serve(path, port, environment):
+    os.environ.update(environment)
+    setup_django_file_db(path, 'production')
+    import uvicorn
+    from config.asgi import application
+    uvicorn.run(application, host='127.0.0.1', port=port, log_level='warning', lifespan='off')
+
+
+async def load(port, token, ids, readers, logins, seconds):
+    import httpx
+    latencies = []
+    login_results = {'ok': 0, 'busy': 0}
+    limits = httpx.Limits(max_connections=readers + logins)
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{port}', limits=limits, timeout=60) as client:
+        deadline = time.perf_counter() + seconds
+
+        async def reader(offset):
+            index = offset
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                response = await client.get(f'/api/tasks/{ids[index % len(ids)]}/', headers={'Authorization': f'Token {token}'})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+                index += readers
+
+        async def login():
+            while time.perf_counter() < deadline:
+                response = await client.post('/api/login/', json={'username': 'storm', 'password': 'storm-password'})
+                if response.status_code == 503:
+                    login_results['busy'] += 1
+                    await asyncio.sleep(float(response.headers['Retry-After']))
+                else:
+                    response.raise_for_status()
+                    login_results['ok'] += 1
+
+        await asyncio.gather(*(reader(offset) for offset in range(readers)), *(login() for _ in range(logins)))
+    return latencies, login_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--readers', type=int, default=10)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context('spawn')
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'db.sqlite3')
+        results = context.Queue()
+        setup = context.Process(target=prepare, args=(path, results))
+        setup.start()
+        token, ids = results.get()
+        setup.join()
+
+        for name, (storm, environment) in SCENARIOS.items():
+            port = free_port()
+            server = context.Process(target=serve, args=(path, port, environment))
+            server.start()
+            try:
+                wait_for_port(port)
+                latencies, logins = asyncio.run(load(port, token, ids, args.readers, args.logins if storm else 0, args.seconds))
+            finally:
+                server.terminate()
+                server.join()
+            latencies.sort()
+            rows.append([
+                name, f'{len(latencies) / args.seconds:,.0f}', f'{statistics.median(latencies):.1f}',
+                f'{latencies[int(len(latencies) * 0.99) - 1]:.1f}',
+                f'{logins["ok"] / args.seconds:.1f}', logins['busy'],
+            ])
+    print_table(['scenario', 'reads/s', 'read p50 ms', 'read p99 ms', 'logins/s', 'logins 503'], rows)
+
+
+if __name__ == '__main__':
+    main()
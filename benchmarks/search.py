@@ -0,0 +1,95 @@
+"""
+Task search latency: the FTS5 index against an ``icontains`` scan.
+
+Creates ``--tasks`` tasks for one user, with titles and descriptions drawn from a
+vocabulary with a Zipf-like word frequency, then times searches for common and rare
+words, a half-typed second word and a word that matches nothing::
+
+    python -m benchmarks.search [--tasks 1000000]
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from .utils import setup_django, create_user, measure, print_table
+
+SYLLABLES = ['ka', 'lo', 'mi', 'ne', 'ru', 'sa', 'ti', 'vo', 'za', 'pe', 'dor', 'gan', 'bel', 'fir', 'hun']
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words, key=lambda word: rng.random())
+
+
+def create_text_tasks(user, count, vocabulary, rng, batch_size=10000):
+    from task_manager.models import Task
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    start = date.today()
+    for offset in range(0, count, batch_size):
+        Task.objects.bulk_create([
+            Task(
+                title=' '.join(rng.choices(vocabulary, weights, k=4)).capitalize(),
+                description=' '.join(rng.choices(vocabulary, weights, k=30)),
+                due_date=start + timedelta(days=i % 60),
+                assignee=user,
+            )
+            for i in range(offset, min(offset + batch_size, count))
+        ])
+
+
+def icontains_search(user, query, limit):
+    from django.db.models import Q
+    from task_manager.models import Task
+    queryset = Task.objects.filter(assignee_id=user.id)
+    for term in query.split():
+        queryset = queryset.filter(Q(title__icontains=term) | Q(description__icontains=term))
+    return list(queryset.order_by('due_date', 'id').values_list('id', flat=True)[:limit])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=1000000)
+    parser.add_argument('--vocabulary', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    from task_manager.models import Task
+    from task_manager.search import search_task_ids, order_by_ids
+
+    rng = random.Random(42)
+    vocabulary = make_vocabulary(args.vocabulary, rng)
+    user = create_user('benchmark')
+    start = time.perf_counter()
+    create_text_tasks(user, args.tasks, vocabulary, rng)
+    print(f'Created {args.tasks:,} tasks in {time.perf_counter() - start:.0f} s (index maintained by triggers)\n')
+
+    queries = {
+        'common word': vocabulary[0],
+        'rare word': vocabulary[-1],
+        'typing': f'{vocabulary[3]} {vocabulary[40][:3]}',
+        'two rare words': f'{vocabulary[-2]} {vocabulary[-3]}',
+        'no match': 'zzzz',
+    }
+    rows = []
+    for name, query in queries.items():
+        def fts():
+            ids = search_task_ids(user, query, args.limit)
+            return order_by_ids(Task.objects.filter(pk__in=ids), ids)
+
+        def scan():
+            ids = icontains_search(user, query, args.limit)
+            return list(Task.objects.filter(pk__in=ids))
+
+        rows.append([
+            name, query, len(search_task_ids(user, query, args.limit)),
+            f'{measure(fts):.1f}', f'{measure(scan, repeat=3):.1f}',
+        ])
+    print_table(['query', 'text', 'results', 'fts5 ms', 'icontains ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
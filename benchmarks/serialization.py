@@ -0,0 +1,49 @@
+"""
+Throughput of ``TaskSerializer`` against ``TaskFastSerializer`` for task lists.
+
+Each run serializes and JSON-renders every task of one user, the work done by an
+uncached ``GET /api/tasks/``, and checks that both produce the same bytes::
+
+    python -m benchmarks.serialization [--sizes 1000 10000 100000]
+"""
+import argparse
+
+from .utils import setup_django, create_user, create_tasks, clear_tasks, measure, print_table
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    from rest_framework.renderers import JSONRenderer
+    from task_manager.models import Task
+    from task_manager.serializers import TaskSerializer, TaskFastSerializer
+
+    user = create_user('benchmark')
+    queryset = Task.objects.filter(assignee=user).order_by('due_date', 'id')
+    renderer = JSONRenderer()
+
+    # .all() gives each run a fresh queryset instead of one with cached results.
+    def model_serializer():
+        return renderer.render(TaskSerializer(queryset.all(), many=True).data)
+
+    def fast_serializer():
+        return renderer.render(TaskFastSerializer().serialize(queryset.all()))
+
+    rows = []
+    for size in args.sizes:
+        clear_tasks()
+        create_tasks(user, size)
+        if model_serializer() != fast_serializer():
+            raise SystemExit(f'Outputs differ at {size} tasks')
+        slow = measure(model_serializer, args.repeat)
+        fast = measure(fast_serializer, args.repeat)
+        rows.append([size, f'{slow:.1f}', f'{fast:.1f}', f'{size / slow * 1000:,.0f}', f'{size / fast * 1000:,.0f}', f'{slow / fast:.1f}x'])
+    print_table(['tasks', 'TaskSerializer ms', 'fast ms', 'TaskSerializer rows/s', 'fast rows/s', 'speedup'], rows)
+
+
+if __name__ == '__main__':
+    main()
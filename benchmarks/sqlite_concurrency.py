@@ -0,0 +1,100 @@
+"""
+Multi-process read/write throughput of SQLite with and without the production profile.
+
+Each profile gets a fresh database file shared by ``--processes`` worker processes,
+which for ``--seconds`` run a mix of task list reads and read-modify-write
+transactions (load a task, then update it), like several gunicorn workers::
+
+    python -m benchmarks.sqlite_concurrency [--processes 8] [--seconds 10]
+
+"errors" counts operations that failed with "database is locked".
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from .utils import print_table, setup_django_file_db
+
+PROFILES = ['development', 'production']
+
+
+def prepare(profile, path, tasks):
+    setup_django_file_db(path, profile)
+    from django.core.management import call_command
+    from benchmarks.utils import create_user, create_tasks
+    call_command('migrate', verbosity=0)
+    create_tasks(create_user('benchmark'), tasks)
+
+
+def work(profile, path, seconds, write_ratio, results):
+    setup_django_file_db(path, profile)
+    from django.db import OperationalError, transaction
+    from task_manager.models import Task
+
+    reads = writes = errors = 0
+    latencies = []
+    ids = list(Task.objects.values_list('id', flat=True))
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            if random.random() < write_ratio:
+                with transaction.atomic():
+                    task = Task.objects.get(pk=random.choice(ids))
+                    task.status = random.choice(['pending', 'in_progress', 'completed'])
+                    task.save(update_fields=['status', 'updated_at'])
+                writes += 1
+            else:
+                list(Task.objects.filter(status='pending').order_by('due_date')[:50])
+                reads += 1
+        except OperationalError:
+            errors += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+    results.put((reads, writes, errors, latencies))
+
+
+def run(profile, processes, seconds, write_ratio, tasks):
+    context = multiprocessing.get_context('spawn')
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'db.sqlite3')
+        setup = context.Process(target=prepare, args=(profile, path, tasks))
+        setup.start()
+        setup.join()
+
+        results = context.Queue()
+        workers = [context.Process(target=work, args=(profile, path, seconds, write_ratio, results)) for _ in range(processes)]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+
+    reads = sum(outcome[0] for outcome in outcomes)
+    writes = sum(outcome[1] for outcome in outcomes)
+    errors = sum(outcome[2] for outcome in outcomes)
+    latencies = sorted(latency for outcome in outcomes for latency in outcome[3])
+    p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else 0
+    return [
+        profile, f'{reads / seconds:,.0f}', f'{writes / seconds:,.0f}', errors,
+        f'{statistics.median(latencies):.2f}', f'{p99:.2f}',
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--processes', type=int, default=8)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--tasks', type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = [run(profile, args.processes, args.seconds, args.write_ratio, args.tasks) for profile in PROFILES]
+    print_table(['profile', 'reads/s', 'writes/s', 'errors', 'p50 ms', 'p99 ms'], rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Task stats cost as a user's task count grows.
+
+For each size in ``--sizes`` one user gets that many tasks, a third of them completed
+over the last weeks, and the stats are computed three ways: by fetching every task
+and counting in Python as dashboards used to, with the single aggregate query over
+the tasks, and from the summary table::
+
+    python -m benchmarks.stats [--sizes 1000 10000 100000]
+"""
+import argparse
+from collections import Counter
+from datetime import timedelta
+
+from .utils import setup_django, create_user, create_tasks, clear_tasks, measure, print_table
+
+
+def count_in_python(user):
+    from task_manager.models import Task
+    from task_manager.serializers import TaskFastSerializer
+    tasks = TaskFastSerializer().serialize(Task.objects.filter(assignee_id=user.id))
+    return Counter(task['status'] for task in tasks)
+
+
+def complete_tasks(user, weeks=8):
+    # bulk_create() bypasses save(), so give the completed tasks completion times here.
+    from django.db.models import F, Value
+    from django.db.models.functions import Mod
+    from django.utils import timezone
+    from task_manager.models import Task
+    start = timezone.now() - timedelta(weeks=weeks)
+    Task.objects.filter(assignee_id=user.id, status='completed').update(
+        completed_at=Value(start) + Mod(F('id'), Value(weeks * 7)) * Value(timedelta(days=1)),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    args = parser.parse_args()
+
+    setup_django()
+    from task_manager.models import TaskSummary
+    from task_manager.stats import get_task_stats
+
+    rows = []
+    for index, size in enumerate(args.sizes):
+        clear_tasks()
+        user = create_user(f'benchmark{index}')
+        create_tasks(user, size)
+        complete_tasks(user)
+        assert get_task_stats(user, use_summary=True) == get_task_stats(user, use_summary=False)
+        rows.append([
+            f'{size:,}',
+            f'{measure(lambda: count_in_python(user), repeat=3):.1f}',
+            f'{measure(lambda: get_task_stats(user, use_summary=False)):.1f}',
+            f'{measure(lambda: get_task_stats(user, use_summary=True)):.2f}',
+            TaskSummary.objects.filter(assignee_id=user.id).count(),
+        ])
+    print_table(['tasks', 'fetch all ms', 'aggregate ms', 'summary ms', 'summary rows'], rows)
+
+
+if __name__ == '__main__':
+    main()
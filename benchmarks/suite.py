@@ -0,0 +1,362 @@
+"""
+End-to-end benchmark suite of the task app, with JSON results and a regression check.
+
+``run`` generates ``--users`` users with ``--tasks`` tasks each, then sends every
+scenario's requests through Django's test client, in-process and without network,
+spread over the users. It reports throughput, latency percentiles, SQL queries per
+request and the peak RSS of the process, and saves them as JSON with ``--output``.
+It exits with status 1 if any request failed, after printing the cause of the
+first failure of each scenario, which is also saved as ``first_error``.
+``compare`` reads two saved runs and flags every metric that got worse by more than
+``--threshold`` percent, and every scenario with failed requests in the new run,
+exiting with status 1 if there is any::
+
+    python -m benchmarks.suite run [--users 10] [--tasks 1000] [--requests 200] [--output new.json]
+    python -m benchmarks.suite compare baseline.json new.json [--threshold 10]
+
+Runs are reproducible: the data and the request order are fixed, so two runs of the
+same code differ only by timing noise. Peak RSS is the high-water mark of the whole
+process once the scenario finished, so it never goes down from one scenario to the
+next.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import traceback
+from datetime import datetime, timezone
+
+from .utils import setup_django, create_user, create_tasks, print_table
+
+# Metric, whether higher is better, and whether compare flags it. p99 is reported
+# but not checked: with a few hundred requests it rests on a couple of samples.
+METRICS = [
+    ('throughput', True, True),
+    ('p50_ms', False, True),
+    ('p95_ms', False, True),
+    ('p99_ms', False, False),
+    ('queries_per_request', False, True),
+    ('peak_rss_mb', False, True),
+]
+
+
+class Scenario:
+    """
+    A named request repeated by the suite.
+
+    Args:
+        name (str): The scenario name used in the results.
+        request (callable): Sends the ``index``-th request as ``request(users, index)``
+            and returns the response.
+        expected_status (int): The status code of a successful response.
+    """
+
+    def __init__(self, name, request, expected_status=200):
+        self.name = name
+        self.request = request
+        self.expected_status = expected_status
+
+
+class BenchmarkUser:
+    """
+    A generated user with the clients and task ids the scenarios need.
+    """
+
+    def __init__(self, user, token, task_ids):
+        from django.test import Client
+        self.user = user
+        self.api = Client(HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.html = Client()
+        self.html.force_login(user)
+        self.task_ids = task_ids
+        # Tasks made by api_create, removed again by api_delete.
+        self.created_ids = []
+
+
+def generate_data(users, tasks):
+    """
+    Create ``users`` users with ``tasks`` tasks and an API token each.
+
+    Args:
+        users (int): The number of users.
+        tasks (int): The number of tasks per user.
+
+    Returns:
+        list: The :class:`BenchmarkUser` instances.
+    """
+    from rest_framework.authtoken.models import Token
+    from task_manager.models import Task
+    generated = []
+    for index in range(users):
+        user = create_user(f'benchmark{index}')
+        create_tasks(user, tasks)
+        task_ids = list(Task.objects.filter(assignee=user).order_by('id').values_list('id', flat=True))
+        generated.append(BenchmarkUser(user, Token.objects.create(user=user), task_ids))
+    return generated
+
+
+def pick(users, index):
+    # Consecutive requests go to different users, each walking through its own tasks.
+    user = users[index % len(users)]
+    return user, user.task_ids[(index // len(users)) % len(user.task_ids)]
+
+
+def create_task(users, index):
+    user = users[index % len(users)]
+    response = user.api.post('/api/tasks/', {
+        'title': f'Created {index}', 'description': 'Created by the benchmark suite', 'due_date': '2030-01-01',
+    }, content_type='application/json')
+    if response.status_code == 201:
+        user.created_ids.append(response.json()['id'])
+    return response
+
+
+def patch_task(users, index):
+    user, pk = pick(users, index)
+    status = ['pending', 'in_progress', 'completed'][index % 3]
+    return user.api.patch(f'/api/tasks/{pk}/', {'status': status}, content_type='application/json')
+
+
+def delete_task(users, index):
+    user = users[index % len(users)]
+    return user.api.delete(f'/api/tasks/{user.created_ids.pop()}/')
+
+
+SCENARIOS = [
+    Scenario('api_list', lambda users, index: pick(users, index)[0].api.get('/api/tasks/')),
+    Scenario('api_list_page', lambda users, index: pick(users, index)[0].api.get('/api/tasks/?page_size=100')),
+    Scenario('api_retrieve', lambda users, index: pick(users, index)[0].api.get(f'/api/tasks/{pick(users, index)[1]}/')),
+    Scenario('api_create', create_task, expected_status=201),
+    Scenario('api_patch', patch_task),
+    # Deletes exactly the tasks api_create made, so the data ends as it started.
+    Scenario('api_delete', delete_task, expected_status=204),
+    Scenario('html_task_list', lambda users, index: pick(users, index)[0].html.get('/tasks/')),
+    Scenario('html_task_detail', lambda users, index: pick(users, index)[0].html.get(f'/tasks/{pick(users, index)[1]}/')),
+]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries run.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def send(scenario, users, index):
+    """
+    Send one request of a scenario.
+
+    A view raising an exception fails the request instead of the whole run.
+
+    Returns:
+        str | None: Why the request failed, the traceback for an exception, or
+        None if it succeeded.
+    """
+    try:
+        response = scenario.request(users, index)
+    except Exception:
+        return traceback.format_exc()
+    if response.status_code != scenario.expected_status:
+        return f'Status {response.status_code} instead of {scenario.expected_status}'
+    return None
+
+
+def run_scenario(scenario, users, requests, warmup):
+    """
+    Time ``requests`` requests of a scenario after ``warmup`` untimed ones.
+
+    Args:
+        scenario (Scenario): The scenario.
+        users (list): The generated users.
+        requests (int): The number of timed requests.
+        warmup (int): The number of requests sent first and left out of the results.
+
+    Returns:
+        dict: The metrics of the scenario.
+    """
+    from django.db import connection
+    from task_manager.performance import percentile
+
+    for index in range(warmup):
+        send(scenario, users, index)
+    counter = QueryCounter()
+    latencies = []
+    errors = 0
+    first_error = None
+    with connection.execute_wrapper(counter):
+        start = time.perf_counter()
+        for index in range(warmup, warmup + requests):
+            request_start = time.perf_counter()
+            error = send(scenario, users, index)
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            if error is not None:
+                errors += 1
+                first_error = first_error or error
+        seconds = time.perf_counter() - start
+    latencies.sort()
+    if first_error is not None:
+        # Only the first, so a view failing every request does not flood the output.
+        print(f'First failed request of {scenario.name}:\n{first_error}', file=sys.stderr)
+    return {
+        'requests': requests,
+        'errors': errors,
+        'first_error': first_error,
+        'seconds': round(seconds, 3),
+        'throughput': round(requests / seconds, 1),
+        'mean_ms': round(statistics.mean(latencies), 3),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+        'queries_per_request': round(counter.count / requests, 2),
+        # ru_maxrss is in KiB on Linux.
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def get_git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    setup_django()
+    import django
+    names = args.scenarios or [scenario.name for scenario in SCENARIOS]
+    unknown = set(names) - {scenario.name for scenario in SCENARIOS}
+    if unknown:
+        sys.exit(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+    if 'api_delete' in names and 'api_create' not in names:
+        sys.exit('api_delete deletes the tasks made by api_create, so it needs it too')
+
+    users = generate_data(args.users, args.tasks)
+    results = {}
+    for scenario in SCENARIOS:
+        if scenario.name in names:
+            results[scenario.name] = run_scenario(scenario, users, args.requests, args.warmup)
+
+    print_table(
+        ['scenario', 'req/s', 'p50 ms', 'p95 ms', 'p99 ms', 'queries', 'peak RSS MB', 'errors'],
+        [
+            [name, r['throughput'], r['p50_ms'], r['p95_ms'], r['p99_ms'], r['queries_per_request'], r['peak_rss_mb'], r['errors']]
+            for name, r in results.items()
+        ],
+    )
+    if args.output:
+        data = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'git_commit': get_git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'parameters': {
+                    'users': args.users, 'tasks': args.tasks, 'requests': args.requests, 'warmup': args.warmup,
+                },
+            },
+            'scenarios': results,
+        }
+        with open(args.output, 'w') as file:
+            json.dump(data, file, indent=2)
+        print(f'\nSaved to {args.output}')
+    failing = [name for name, r in results.items() if r['errors']]
+    if failing:
+        sys.exit(f'\nRequests failed in: {", ".join(failing)}')
+
+
+def compare_results(baseline, current, threshold):
+    """
+    Compare two runs scenario by scenario.
+
+    Scenarios found in only one run are listed as missing. A scenario with failed
+    requests in the current run counts as a regression, whatever its timings.
+
+    Args:
+        baseline (dict): The saved results of the reference run.
+        current (dict): The saved results of the run under test.
+        threshold (float): The change, in percent, beyond which a worse checked
+            metric is a regression. Query counts are exact, so any increase is one.
+
+    Returns:
+        tuple: Table rows, and the number of regressions.
+    """
+    rows = []
+    regressions = 0
+    names = [*baseline['scenarios'], *(name for name in current['scenarios'] if name not in baseline['scenarios'])]
+    for name in names:
+        baseline_metrics = baseline['scenarios'].get(name)
+        current_metrics = current['scenarios'].get(name)
+        if baseline_metrics is None or current_metrics is None:
+            where = 'baseline' if baseline_metrics is None else 'current'
+            rows.append([name, '', '', '', '', f'MISSING FROM {where.upper()}'])
+            continue
+        old_errors, new_errors = baseline_metrics['errors'], current_metrics['errors']
+        if old_errors or new_errors:
+            regressions += bool(new_errors)
+            rows.append([name, 'errors', old_errors, new_errors, '', 'ERRORS' if new_errors else ''])
+        for metric, higher_is_better, checked in METRICS:
+            old, new = baseline_metrics[metric], current_metrics[metric]
+            if old:
+                change = (new - old) / old * 100
+            else:
+                # Growing from nothing, e.g. a scenario that ran no query now running one.
+                change = 0.0 if new == old else float('inf') if new > old else float('-inf')
+            worse = -change if higher_is_better else change
+            limit = 0 if metric == 'queries_per_request' else threshold
+            regression = checked and worse > limit
+            regressions += regression
+            rows.append([name, metric, old, new, f'{change:+.1f}%', 'REGRESSION' if regression else ''])
+    return rows, regressions
+
+
+def compare(args):
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    if baseline['meta']['parameters'] != current['meta']['parameters']:
+        print('Warning: the runs used different parameters, their numbers may not be comparable\n')
+    rows, regressions = compare_results(baseline, current, args.threshold)
+    print_table(['scenario', 'metric', 'baseline', 'current', 'change', ''], rows)
+    print(f'\n{regressions} regression(s) beyond {args.threshold}% or failing scenario(s)')
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='run the scenarios')
+    run_parser.add_argument('--users', type=int, default=10)
+    run_parser.add_argument('--tasks', type=int, default=1000, help='tasks per user')
+    run_parser.add_argument('--requests', type=int, default=200, help='timed requests per scenario')
+    run_parser.add_argument('--warmup', type=int, default=20, help='untimed requests per scenario')
+    run_parser.add_argument('--scenarios', nargs='+', help='run only these scenarios')
+    run_parser.add_argument('--output', help='save the results to this JSON file')
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser('compare', help='flag regressions between two saved runs')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=10, help='percent change tolerated')
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == '__main__':
+    main()
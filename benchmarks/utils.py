@@ -0,0 +1,125 @@
+import os
+import statistics
+import time
+from datetime import date, timedelta
+
+
+def setup_django():
+    """
+    Configure Django and create an empty test database for a benchmark run.
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+
+
+def setup_django_file_db(path, profile='development'):
+    """
+    Configure Django against the SQLite file at ``path`` with the given settings profile.
+
+    Used by benchmarks that share one database between several processes, which the
+    in-memory test database cannot do. Must run before anything touches the database.
+
+    Args:
+        path (str): The database file.
+        profile (str): The ``DJANGO_ENV`` to load the settings with.
+    """
+    os.environ['DJANGO_ENV'] = profile
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    import django
+    django.setup()
+
+    from django.conf import settings
+    # Not connected yet, so the database can still be pointed at the benchmark file.
+    settings.DATABASES['default']['NAME'] = path
+
+
+def create_user(username, password='benchmark-password'):
+    """
+    Create a user to own benchmark tasks.
+
+    Args:
+        username (str): The username.
+        password (str): The password.
+
+    Returns:
+        User: The new user.
+    """
+    from django.contrib.auth.models import User
+    return User.objects.create_user(username=username, password=password)
+
+
+def create_tasks(user, count, description_size=200, batch_size=5000):
+    """
+    Bulk-insert ``count`` tasks for ``user`` with a spread of statuses and due dates.
+
+    Args:
+        user (User): The assignee.
+        count (int): How many tasks to create.
+        description_size (int): Length of each description.
+        batch_size (int): Rows per INSERT.
+    """
+    from task_manager.models import Task
+    statuses = [status for status, _ in Task.STATUS_CHOICES]
+    start = date.today() - timedelta(days=count // 20)
+    description = ('lorem ipsum ' * (description_size // 12 + 1))[:description_size]
+    Task.objects.bulk_create(
+        (
+            Task(
+                title=f'Task {i}',
+                description=description,
+                due_date=start + timedelta(days=i % 60),
+                status=statuses[i % len(statuses)],
+                assignee=user,
+            )
+            for i in range(count)
+        ),
+        batch_size=batch_size,
+    )
+
+
+def clear_tasks():
+    """
+    Delete every task created by a previous benchmark step.
+    """
+    from task_manager.models import Task
+    Task.objects.all().delete()
+
+
+def measure(func, repeat=5):
+    """
+    Call ``func`` ``repeat`` times and return the median wall time in milliseconds.
+
+    Args:
+        func (callable): The code to time.
+        repeat (int): How many timed calls to make.
+
+    Returns:
+        float: The median duration in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def print_table(headers, rows):
+    """
+    Print rows as an aligned plain-text table.
+
+    Args:
+        headers (list): Column titles.
+        rows (list): Rows of values, formatted with ``str``.
+    """
+    rows = [[str(value) for value in row] for row in rows]
+    widths = [max(len(str(header)), *(len(row[i]) for row in rows)) for i, header in enumerate(headers)]
+    print('  '.join(str(header).rjust(width) for header, width in zip(headers, widths)))
+    for row in rows:
+        print('  '.join(value.rjust(width) for value, width in zip(row, widths)))
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -27,6 +28,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = []
 
+# Set DJANGO_ENV=production to switch on the production profiles below.
+DJANGO_ENV = os.environ.get('DJANGO_ENV', 'development')
+
 
 # Application definition
 
@@ -44,6 +48,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'task_manager.middleware.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,8 +56,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.middleware.PasswordHashingBusyMiddleware',
 ]
 
+# Per-request timing (Server-Timing header, JSON log line, latency percentiles at
+# /api/performance/). PerformanceMiddleware stays out of the stack unless enabled.
+PERFORMANCE_INSTRUMENTATION = False
+PERFORMANCE_HISTOGRAM_SIZE = 1000
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -71,6 +82,21 @@ TEMPLATES = [
     },
 ]
 
+# Production template profile: templates are compiled once per process by the cached
+# loader, listed explicitly so that it does not depend on DEBUG, and rendered without
+# the source positions kept for the debug error page.
+if DJANGO_ENV == 'production':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS'].update({
+        'debug': False,
+        'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ],
+    })
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
@@ -84,6 +110,46 @@ DATABASES = {
     }
 }
 
+# Production SQLite profile for several worker processes sharing one database file:
+# WAL lets readers run alongside the writer, BEGIN IMMEDIATE makes writers queue on
+# busy_timeout instead of failing with "database is locked", and connections are
+# kept open between requests. See config/sqlite3/base.py.
+if DJANGO_ENV == 'production':
+    DATABASES['default'].update({
+        'ENGINE': 'config.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'pragmas': {
+                'journal_mode': 'WAL',
+                'synchronous': 'NORMAL',
+                'busy_timeout': 5000,  # milliseconds
+                'cache_size': -65536,  # negative means KiB, i.e. 64 MiB
+                'mmap_size': 268435456,  # 256 MiB
+                'temp_store': 'MEMORY',
+            },
+        },
+    })
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# LocMemCache is per process: with several worker processes, point this at a shared
+# backend (Redis, Memcached, database) so task writes invalidate every worker.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        # The default of 300 entries does not even hold the cards of one full board.
+        'OPTIONS': {'MAX_ENTRIES': 50000},
+    }
+}
+
+# Cache holding each user's task list, and how long (seconds) an entry may live
+TASK_CACHE_ALIAS = 'default'
+TASK_CACHE_TIMEOUT = 300
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -103,16 +169,128 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing. LimitedPBKDF2PasswordHasher is Django's PBKDF2 hasher run under a
+# per-process limit, so that a burst of logins cannot take every CPU from task
+# reads: at most TASK_PASSWORD_HASHING_CONCURRENCY hashes at once (half the CPUs by
+# default), up to TASK_PASSWORD_HASHING_QUEUE_SIZE callers waiting at most
+# TASK_PASSWORD_HASHING_TIMEOUT seconds for a slot, and 503 for anyone else.
+# TASK_PASSWORD_ITERATIONS is the PBKDF2 work factor (Django's default is 600,000).
+# All four can be set per environment through environment variables.
+PASSWORD_HASHERS = [
+    'task_manager.hashers.LimitedPBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+TASK_PASSWORD_HASHING_CONCURRENCY = int(os.environ.get('TASK_PASSWORD_HASHING_CONCURRENCY', max(1, (os.cpu_count() or 1) // 2)))
+TASK_PASSWORD_HASHING_QUEUE_SIZE = int(os.environ.get('TASK_PASSWORD_HASHING_QUEUE_SIZE', 8))
+TASK_PASSWORD_HASHING_TIMEOUT = float(os.environ.get('TASK_PASSWORD_HASHING_TIMEOUT', 5))
+TASK_PASSWORD_ITERATIONS = int(os.environ.get('TASK_PASSWORD_ITERATIONS', 600000))
+
 AUTHENTICATION_BACKENDS = (
     'django.contrib.auth.backends.ModelBackend',
 )
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'task_manager.authentication.CachedTokenAuthentication',
     ),
 }
 
+# Token lookups remembered per process by CachedTokenAuthentication: most tokens kept,
+# and seconds before a lookup is repeated. A token deleted or a user deactivated by
+# another process keeps working in this one for up to TASK_TOKEN_CACHE_TTL seconds;
+# 0 disables the cache.
+TASK_TOKEN_CACHE_SIZE = 10000
+TASK_TOKEN_CACHE_TTL = 60
+
+# Keyset pagination of the task API, used when a client passes ?page_size= or ?cursor=
+TASK_PAGE_SIZE = 100
+TASK_MAX_PAGE_SIZE = 1000
+
+# Cards shown per kanban column on the task board, and added by each "Load more",
+# and the most cards a column shows however many are asked for
+TASK_BOARD_COLUMN_LIMIT = 50
+TASK_BOARD_COLUMN_MAX = 500
+
+# Number of tasks read from the database per round trip by /api/tasks/export/
+TASK_EXPORT_CHUNK_SIZE = 2000
+
+# Largest batch accepted by /api/tasks/bulk/
+TASK_BULK_MAX_ITEMS = 1000
+
+# Task change stream at /api/tasks/events/: events kept in memory per process for
+# replay to reconnecting clients, seconds between reads of the change feed by an
+# open stream (writes of other processes show up within this delay), seconds
+# between keepalive comments, seconds before a stream is closed for the client to
+# reconnect, and the client's reconnect delay in milliseconds.
+TASK_EVENT_BUFFER_SIZE = 1000
+TASK_EVENT_POLL_INTERVAL = 2
+TASK_EVENT_KEEPALIVE = 15
+TASK_EVENT_STREAM_TIMEOUT = 300
+TASK_EVENT_RETRY = 3000
+
+# Incremental sync at /api/tasks/changes/: days deletions are remembered (older sync
+# tokens get a full sync; run manage.py prune_tombstones daily), and seconds each
+# sync overlaps the previous one to catch writes that committed late.
+TASK_TOMBSTONE_RETENTION_DAYS = 30
+TASK_SYNC_OVERLAP = 5
+
+# Most results returned by task search, in the API and on the board
+TASK_SEARCH_LIMIT = 50
+
+# Task stats at /api/tasks/stats/: open tasks due within each number of days from
+# today, and the number of weeks of completion counts.
+TASK_STATS_DUE_DAYS = [1, 7, 30]
+TASK_STATS_WEEKS = 8
+
+# Background jobs, run by manage.py run_jobs: jobs handed to a handler at once,
+# attempts before a failing job is given up (the wait before a retry starts at
+# TASK_JOB_RETRY_DELAY seconds and doubles each time), seconds a worker may hold a job
+# before another one takes it over, seconds an idle worker sleeps, and days finished
+# jobs, and with them their idempotency keys, are kept.
+TASK_JOB_BATCH_SIZE = 100
+TASK_JOB_MAX_ATTEMPTS = 5
+TASK_JOB_RETRY_DELAY = 10
+TASK_JOB_LEASE = 300
+TASK_JOB_POLL_INTERVAL = 1
+TASK_JOB_RETENTION_DAYS = 7
+
+# Due-date reminders sent by manage.py send_reminders: days ahead a task counts as due
+# soon, tasks handled per transaction, the delivery backend (Console, File, Locmem or
+# EmailReminderBackend in task_manager.reminders, or any subclass of
+# BaseReminderBackend), the file FileReminderBackend appends to, and the seconds
+# after which a reminder recorded but never marked sent is delivered again.
+TASK_REMINDER_DUE_SOON_DAYS = 1
+TASK_REMINDER_BATCH_SIZE = 500
+TASK_REMINDER_BACKEND = 'task_manager.reminders.ConsoleReminderBackend'
+TASK_REMINDER_FILE_PATH = BASE_DIR / 'reminders.log'
+TASK_REMINDER_RETRY_AFTER = 300
+
+# manage.py archive_tasks: days after completion a task is moved to the archive table,
+# read-only at /api/archived-tasks/, and tasks moved per transaction.
+TASK_ARCHIVE_AFTER_DAYS = 90
+TASK_ARCHIVE_BATCH_SIZE = 1000
+
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'task_manager.performance': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/4.2/topics/i18n/
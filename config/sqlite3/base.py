@@ -0,0 +1,47 @@
+"""
+SQLite database backend tuned for serving several worker processes.
+
+Adds two entries to a database's ``OPTIONS`` on top of Django's SQLite backend:
+
+- ``pragmas``: a mapping of PRAGMA names to values, run on every new connection
+  (e.g. ``{'journal_mode': 'WAL', 'busy_timeout': 5000}``).
+- ``transaction_mode``: ``'DEFERRED'``, ``'IMMEDIATE'`` or ``'EXCLUSIVE'``, the
+  locking mode of the ``BEGIN`` that opens each transaction.
+
+With the default deferred transactions, a transaction that reads and then writes
+has to upgrade its lock, and SQLite fails that upgrade at once with "database is
+locked" when another connection is writing, without waiting for the busy
+timeout. ``BEGIN IMMEDIATE`` takes the write lock up front, so concurrent writers
+queue on the busy timeout instead of failing.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    Django's SQLite wrapper, plus the ``pragmas`` and ``transaction_mode`` options.
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        # Consumed here, not by sqlite3.connect().
+        params.pop('pragmas', None)
+        params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(f'transaction_mode must be one of {", ".join(TRANSACTION_MODES)}.')
+        self.cursor().execute(f'BEGIN {mode.upper()}')
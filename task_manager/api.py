@@ -1,13 +1,39 @@
-from rest_framework.permissions import IsAuthenticated
+from operator import itemgetter
+
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
 from django.contrib.auth.models import User
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework import viewsets,generics
-from .serializers import TaskSerializer,UserRegistrationSerializer
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, PermissionDenied, ValidationError
+from django.conf import settings
+from django.db import transaction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .serializers import TaskSerializer,TaskFastSerializer,ArchivedTaskSerializer,UserRegistrationSerializer
 from .permissions import IsTaskAssignee
-from .models import Task
+from .authentication import CachedTokenAuthentication
+from .pagination import TaskKeysetPagination
+from .filters import TaskListFilter
+from .renderers import StreamingJSONRenderer, NDJSONRenderer, EventStreamRenderer
+from .cache import get_or_set_task_list
+from .conditional import task_list_validators, task_validators, not_modified_response, set_validators
+from .signals import tasks_saved, tasks_deleted
+from .events import stream_events, astream_events
+from .sync import get_changes
+from .search import search_task_ids, order_by_ids
+from .stats import get_task_stats
+from .middleware import histogram
+from .hashers import limiter
+from .performance import measure
+from .models import Task, ArchivedTask
 
 
 
@@ -20,21 +46,458 @@ class TaskViewSet(viewsets.ModelViewSet):
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsTaskAssignee]
+    pagination_class = TaskKeysetPagination
+
+    # Always loaded, even when ?fields= leaves them out: they drive the orderings,
+    # the keyset cursors and the ETag validators.
+    required_fields = ('id', 'due_date', 'created_at', 'updated_at')
+
+    def get_requested_fields(self):
+        """
+        Parse the ``fields`` query parameter of a read request.
+
+        Returns:
+            list | None: The requested field names, or None to return every field.
+
+        Raises:
+            ValidationError: If an unknown field is requested.
+        """
+        if self.request.method not in SAFE_METHODS or 'fields' not in self.request.query_params:
+            return None
+        fields = [name.strip() for name in self.request.query_params['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in TaskSerializer().fields]
+        if unknown:
+            raise ValidationError({'fields': [f'Unknown field "{name}".' for name in unknown]})
+        return fields
+
+    def get_queryset(self):
+        """
+        Return the tasks assigned to the authenticated user, loading only the
+        columns the response needs.
+
+        Scoping the queryset makes other users' tasks answer 404 from the lookup
+        query itself, without loading anything else for the permission check.
+
+        Returns:
+            QuerySet: The tasks this view operates on.
+        """
+        queryset = super().get_queryset().filter(assignee_id=self.request.user.id)
+        fields = self.get_requested_fields()
+        if fields is not None:
+            queryset = queryset.only(*self.required_fields, *fields)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        """
+        Return a serializer restricted to the fields requested with ``?fields=``.
+        """
+        kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
 
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of tasks assigned to the authenticated user.
+
+        ``?status=``, ``?due=overdue|week`` and ``?ordering=`` filter and order the
+        list, in the combinations described by :class:`TaskListFilter`; it is ordered
+        by ``(due_date, id)`` by default. The full list is returned unless the client
+        passes ``page_size`` or ``cursor``, in which case the response is paginated
+        along the same ordering. The serialized full list is cached per user until
+        one of their tasks is written, and requests carrying a matching
+        If-None-Match/If-Modified-Since get a 304.
         """
         user = self.request.user
-        queryset = Task.objects.filter(assignee=user).order_by('due_date')
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        list_filter = TaskListFilter(request.query_params)
+        variant = self.get_representation_variant()
+        if list_filter.is_date_relative():
+            variant += f':{list_filter.today.isoformat()}'
+        etag, last_modified = task_list_validators(user, variant)
+        if list_filter.is_date_relative():
+            # Which tasks are overdue changes at midnight without any write, which
+            # the ETag reflects and Last-Modified cannot.
+            last_modified = None
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        queryset = list_filter.filter_queryset(self.get_queryset())
+        self.keyset_ordering = list_filter.ordering
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with measure('serialize'):
+                data = self.get_serializer(page, many=True).data
+            return set_validators(self.get_paginated_response(data), etag, last_modified)
+        fields = self.get_requested_fields()
+        name = f'api:{list_filter.get_cache_name()}:' + ','.join(fields or [])
+        with measure('serialize'):
+            data = get_or_set_task_list(user.id, name, lambda: TaskFastSerializer(fields).serialize(queryset))
+        return set_validators(Response(data, status=status.HTTP_200_OK), etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Retrieve a single task, answering 304 if the client's copy is still current.
+        """
+        instance = self.get_object()
+        etag, last_modified = task_validators(instance, request.user, self.get_representation_variant())
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        with measure('serialize'):
+            data = self.get_serializer(instance).data
+        return set_validators(Response(data), etag, last_modified)
+
+    def get_representation_variant(self):
+        """
+        Describe what besides the data shapes the response, for use in ETags.
+
+        Returns:
+            str: The request path with its query string and the negotiated media type.
+        """
+        return f'{self.request.get_full_path()}:{self.request.accepted_media_type}'
+
+    @action(detail=False, methods=['get'], renderer_classes=[StreamingJSONRenderer, NDJSONRenderer])
+    def export(self, request, *args, **kwargs):
+        """
+        Stream every task assigned to the authenticated user.
+
+        Tasks are read from the database in chunks and written out as they are
+        serialized, so memory use does not grow with the number of tasks. Use
+        ``?format=ndjson`` for newline-delimited JSON, otherwise a JSON array is sent.
+        """
+        chunk_size = getattr(settings, 'TASK_EXPORT_CHUNK_SIZE', 2000)
+        queryset = self.get_queryset().order_by('due_date', 'id')
+        rows = TaskFastSerializer(self.get_requested_fields()).iter_serialize(queryset, chunk_size)
+        renderer = request.accepted_renderer
+        return StreamingHttpResponse(renderer.render_stream(rows, chunk_size), content_type=renderer.media_type)
+
+    @action(
+        detail=False, methods=['get'], renderer_classes=[EventStreamRenderer],
+        authentication_classes=[CachedTokenAuthentication, SessionAuthentication],
+    )
+    def events(self, request, *args, **kwargs):
+        """
+        Stream changes to the authenticated user's tasks as Server-Sent Events.
+
+        Sends a ``created``, ``updated`` or ``deleted`` event per changed task instead
+        of the client polling the full list. A reconnecting client sends the id of the
+        last event it received as ``Last-Event-ID`` (or ``?last_event_id=``) and gets
+        the events it missed, or a ``reset`` event if they are no longer known. Under
+        ASGI the stream waits without holding a thread. Session authentication is
+        accepted because ``EventSource`` cannot send an Authorization header.
+        """
+        last_event_id = request.headers.get('Last-Event-ID') or request.query_params.get('last_event_id')
+        if isinstance(request._request, ASGIRequest):
+            stream = astream_events(request.user, last_event_id)
+        else:
+            stream = stream_events(request.user, last_event_id)
+        response = StreamingHttpResponse(stream, content_type=EventStreamRenderer.media_type)
+        response['Cache-Control'] = 'no-cache'
+        # Stop nginx from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=False, methods=['get'])
+    def search(self, request, *args, **kwargs):
+        """
+        Search the authenticated user's tasks by title and description.
+
+        Every word of ``?q=`` must match a word of the task, the last one possibly
+        only its start, and up to ``TASK_SEARCH_LIMIT`` tasks are returned, best match
+        first. ``?fields=`` is supported.
+        """
+        ids = search_task_ids(request.user, request.query_params.get('q', ''), getattr(settings, 'TASK_SEARCH_LIMIT', 50))
+        fields = self.get_requested_fields()
+        with measure('serialize'):
+            # The ids come from a search of this user's tasks only. Filtering on the
+            # assignee again would make SQLite walk all of the user's tasks instead.
+            serializer = TaskFastSerializer(None if fields is None else [*fields, 'id'])
+            data = order_by_ids(serializer.serialize(Task.objects.filter(pk__in=ids)), ids, key=itemgetter('id'))
+            if fields is not None and 'id' not in fields:
+                for item in data:
+                    del item['id']
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request, *args, **kwargs):
+        """
+        Return dashboard figures for the authenticated user's tasks.
+
+        Counts by status, open tasks overdue and due within each number of days in
+        ``TASK_STATS_DUE_DAYS``, and tasks completed per week over the last
+        ``TASK_STATS_WEEKS`` weeks, all computed by the database in one query. The
+        result is cached per user and day until one of their tasks is written.
+        """
+        today = timezone.localdate()
+        with measure('serialize'):
+            data = get_or_set_task_list(request.user.id, f'stats:{today.isoformat()}', lambda: get_task_stats(request.user, today))
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        """
+        Return the tasks changed and deleted since the ``since`` token of the previous sync.
+
+        Without ``since`` every task is returned. The response holds ``changed`` tasks,
+        ``deleted`` task ids, the ``token`` to send as ``since`` next time and ``full``,
+        which is True when the client must replace its tasks rather than merge.
+        """
+        with measure('serialize'):
+            data = get_changes(request.user, request.query_params.get('since'))
+        return Response(data)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request, *args, **kwargs):
+        """
+        Create a batch of tasks, assigning each one to the authenticated user.
+
+        Valid items are inserted with a single ``bulk_create`` inside one transaction;
+        invalid items are skipped and reported with their validation errors.
+        """
+        items = self.get_bulk_items(request)
+        results = []
+        created = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if not serializer.is_valid():
+                results.append(self.bulk_result(index, status.HTTP_400_BAD_REQUEST, errors=serializer.errors))
+                continue
+            result = self.bulk_result(index, status.HTTP_201_CREATED)
+            results.append(result)
+            # Same rule as perform_create: the assignee is always the requesting user.
+            created.append((result, Task(**{**serializer.validated_data, 'assignee': request.user})))
+
+        for _, task in created:
+            # bulk_create() bypasses save().
+            task.track_completion()
+        with transaction.atomic():
+            Task.objects.bulk_create([task for _, task in created])
+        tasks_saved.send(sender=Task, tasks=[task for _, task in created], created=True)
+
+        serializer = self.get_serializer()
+        for result, task in created:
+            result['data'] = serializer.to_representation(task)
+        return self.get_bulk_response(results, status.HTTP_201_CREATED)
+
+    @bulk_create.mapping.patch
+    def bulk_update(self, request, *args, **kwargs):
+        """
+        Partially update a batch of tasks identified by the ``id`` of each item.
+
+        Each task is checked against the view's object permissions, exactly like a
+        single PATCH. Valid changes are written with one ``bulk_update`` inside a
+        single transaction.
+        """
+        items = self.get_bulk_items(request)
+        tasks = self.get_queryset().in_bulk([item.get('id') for item in items if isinstance(item, dict) and self.is_bulk_id(item.get('id'))])
+        results = []
+        updated = {}
+        previous_assignees = {}
+        fields = set()
+        for index, item in enumerate(items):
+            pk = item.get('id') if isinstance(item, dict) else None
+            if not self.is_bulk_id(pk):
+                results.append(self.bulk_result(index, status.HTTP_400_BAD_REQUEST, errors={'id': ['A valid integer is required.']}))
+                continue
+            if pk in updated:
+                results.append(self.bulk_result(index, status.HTTP_400_BAD_REQUEST, errors={'id': ['Duplicate id in batch.']}))
+                continue
+            error = self.get_bulk_object_error(request, tasks.get(pk))
+            if error is not None:
+                results.append(self.bulk_result(index, error.status_code, errors={'detail': error.detail}))
+                continue
+            serializer = self.get_serializer(tasks[pk], data=item, partial=True)
+            if not serializer.is_valid():
+                results.append(self.bulk_result(index, status.HTTP_400_BAD_REQUEST, errors=serializer.errors))
+                continue
+            previous_assignees[pk] = serializer.instance.assignee_id
+            for attr, value in serializer.validated_data.items():
+                setattr(serializer.instance, attr, value)
+            fields.update(serializer.validated_data)
+            result = self.bulk_result(index, status.HTTP_200_OK)
+            results.append(result)
+            updated[pk] = (result, serializer.instance)
+
+        if updated:
+            # bulk_update() bypasses save(), so auto_now and completed_at have to be
+            # applied by hand.
+            now = timezone.now()
+            for _, task in updated.values():
+                task.updated_at = now
+                task.track_completion(now)
+            with transaction.atomic():
+                Task.objects.bulk_update([task for _, task in updated.values()], [*fields, 'updated_at', 'completed_at'])
+            tasks_saved.send(
+                sender=Task, tasks=[task for _, task in updated.values()], created=False,
+                previous_assignees=previous_assignees,
+            )
+
+        serializer = self.get_serializer()
+        for result, task in updated.values():
+            result['data'] = serializer.to_representation(task)
+        return self.get_bulk_response(results, status.HTTP_200_OK)
+
+    @bulk_create.mapping.delete
+    def bulk_destroy(self, request, *args, **kwargs):
+        """
+        Delete a batch of tasks given as a list of ids.
+
+        Each task is checked against the view's object permissions, exactly like a
+        single DELETE, and the permitted ones are removed in one query.
+        """
+        ids = self.get_bulk_items(request)
+        tasks = self.get_queryset().in_bulk([pk for pk in ids if self.is_bulk_id(pk)])
+        results = []
+        deleted = {}
+        for index, pk in enumerate(ids):
+            if not self.is_bulk_id(pk):
+                results.append(self.bulk_result(index, status.HTTP_400_BAD_REQUEST, errors={'id': ['A valid integer is required.']}))
+                continue
+            error = self.get_bulk_object_error(request, tasks.get(pk))
+            if error is not None:
+                results.append(self.bulk_result(index, error.status_code, errors={'detail': error.detail}))
+                continue
+            deleted[pk] = tasks[pk].assignee_id
+            results.append(self.bulk_result(index, status.HTTP_204_NO_CONTENT, id=pk))
+
+        with transaction.atomic():
+            self.get_queryset().filter(pk__in=deleted).delete()
+            tasks_deleted.send(sender=Task, task_assignees=deleted)
+        return self.get_bulk_response(results, status.HTTP_204_NO_CONTENT, success_status=status.HTTP_200_OK)
+
+    def get_bulk_items(self, request):
+        """
+        Return the list of items in the body of a bulk request.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            list: The items to process.
+
+        Raises:
+            ValidationError: If the body is not a list or holds too many items.
+        """
+        items = request.data
+        max_items = getattr(settings, 'TASK_BULK_MAX_ITEMS', 1000)
+        if not isinstance(items, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if len(items) > max_items:
+            raise ValidationError({'non_field_errors': [f'Ensure this list has no more than {max_items} items.']})
+        return items
+
+    def is_bulk_id(self, value):
+        """
+        Check that a value from a bulk request body is a task id.
+
+        Args:
+            value (object): The decoded JSON value.
+
+        Returns:
+            bool: True for integers. JSON ``true`` and ``false`` decode to bools, which
+            are ints in Python, so they are rejected rather than read as ids 1 and 0.
+        """
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    def get_bulk_object_error(self, request, task):
+        """
+        Apply the lookup and object permission checks of a single-task request.
+
+        Args:
+            request (Request): The incoming API request.
+            task (Task | None): The task found for the item, if any.
+
+        Returns:
+            APIException | None: The error the item would have raised, or None.
+        """
+        if task is None:
+            return NotFound()
+        for permission in self.get_permissions():
+            if not permission.has_object_permission(request, self, task):
+                return PermissionDenied(getattr(permission, 'message', None))
+        return None
+
+    def bulk_result(self, index, item_status, **extra):
+        """
+        Build the result entry reported for one item of a bulk request.
+        """
+        return {'index': index, 'status': item_status, **extra}
+
+    def get_bulk_response(self, results, item_status, success_status=None):
+        """
+        Wrap per-item results, answering 207 Multi-Status if any item failed.
+
+        Args:
+            results (list): The per-item results.
+            item_status (int): The status of an item that succeeded.
+            success_status (int): The response status when every item succeeded,
+                defaulting to ``item_status``.
+
+        Returns:
+            Response: The bulk API response.
+        """
+        if any(result['status'] != item_status for result in results):
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = success_status or item_status
+        return Response({'results': results}, status=response_status)
 
     def perform_create(self, serializer):
         """
         Create a new task, assigning it to the authenticated user.
         """
         serializer.save(assignee=self.request.user)
+        tasks_saved.send(sender=Task, tasks=[serializer.instance], created=True)
+
+    def perform_update(self, serializer):
+        """
+        Save changes to a task, notifying both its previous and current assignee.
+        """
+        previous_assignees = {serializer.instance.pk: serializer.instance.assignee_id}
+        serializer.save()
+        tasks_saved.send(sender=Task, tasks=[serializer.instance], created=False, previous_assignees=previous_assignees)
+
+    def destroy(self, request, *args, **kwargs):
+        """
+        Delete a task without looking it up first.
+
+        The queryset is scoped to the user's own tasks, so the DELETE itself is the
+        ownership check; the only other query records the tombstone.
+        """
+        try:
+            pk = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            raise NotFound()
+        # The deletion commits together with the tombstone the signal records.
+        with transaction.atomic(savepoint=False):
+            deleted, _ = self.get_queryset().filter(pk=pk).delete()
+            if deleted:
+                tasks_deleted.send(sender=Task, task_assignees={pk: request.user.id})
+        if not deleted:
+            raise NotFound()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class ArchivedTaskViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only API endpoint for the archived tasks of the authenticated user.
+
+    Lists are ordered by ``(due_date, id)`` and paginated like the task list when
+    the client passes ``page_size`` or ``cursor``.
+    """
+    queryset = ArchivedTask.objects.all()
+    serializer_class = ArchivedTaskSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = TaskKeysetPagination
+
+    def get_queryset(self):
+        """
+        Return the archived tasks of the authenticated user, in list order.
+
+        Returns:
+            QuerySet: The archived tasks this view reads.
+        """
+        return super().get_queryset().filter(assignee_id=self.request.user.id).order_by('due_date', 'id')
+
 
 class UserLoginView(ObtainAuthToken):
     """
@@ -55,7 +518,19 @@ class UserRegistrationView(generics.CreateAPIView):
     permission_classes = [AllowAny]
 
 
+class PerformanceStatsView(APIView):
+    """
+    API endpoint reporting request latency percentiles and password hashing metrics.
 
+    Staff only. Returns the p50/p95/p99 of the recent requests of this process,
+    per URL name, as recorded by ``PerformanceMiddleware``, and the queueing metrics
+    of the password hashing limiter.
+    """
+    authentication_classes = [SessionAuthentication, CachedTokenAuthentication]
+    permission_classes = [IsAdminUser]
 
-
-
+    def get(self, request, *args, **kwargs):
+        """
+        Return the latency histogram and password hashing snapshots.
+        """
+        return Response({'latency_ms': histogram.snapshot(), 'password_hashing': limiter.snapshot()})
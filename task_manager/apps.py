@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TaskManagerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager'
+
+    def ready(self):
+        # Connect the receivers listening to task, token and user writes.
+        from . import authentication, cache, events, sync  # noqa: F401
@@ -0,0 +1,40 @@
+from django.db import transaction
+
+from .models import ArchivedTask, Task
+from .signals import tasks_deleted
+
+
+def archive_tasks(cutoff, batch_size):
+    """
+    Move the tasks completed before ``cutoff`` to the archive table.
+
+    Each batch is copied and deleted in its own transaction, so the task table is
+    never locked for long and an interrupted run loses nothing. The tasks leave the
+    task table like deleted ones: the caches of their assignees are invalidated and
+    tombstones tell syncing clients to drop them. Being deleted from the task table,
+    they also leave the task stats, the search index and the board.
+
+    Args:
+        cutoff (datetime): Tasks completed before this time are archived.
+        batch_size (int): Tasks moved per transaction.
+
+    Returns:
+        int: The number of tasks archived.
+    """
+    archived = 0
+    while True:
+        with transaction.atomic():
+            # Read through task_status_completed_idx; archived rows are gone, so
+            # every batch starts at the oldest task left.
+            rows = list(
+                Task.objects.filter(status='completed', completed_at__lt=cutoff)
+                .order_by('completed_at', 'id')
+                .values(*ArchivedTask.TASK_FIELDS)[:batch_size]
+            )
+            if not rows:
+                return archived
+            ArchivedTask.objects.bulk_create(ArchivedTask(**row) for row in rows)
+            task_assignees = {row['id']: row['assignee_id'] for row in rows}
+            Task.objects.filter(pk__in=task_assignees).delete()
+            tasks_deleted.send(sender=Task, task_assignees=task_assignees)
+        archived += len(rows)
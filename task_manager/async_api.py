@@ -0,0 +1,283 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from .authentication import token_cache
+from .models import Task
+from .renderers import StreamingJSONRenderer
+from .serializers import TaskSerializer, TaskFastSerializer
+from .signals import tasks_saved, tasks_deleted
+
+
+class AsyncTaskAPIView(View):
+    """
+    Base class for the async task API endpoints.
+
+    These views serve the same tasks as ``TaskViewSet`` but run natively under ASGI:
+    every database call goes through Django's async ORM (``aget``, ``acreate``,
+    ``aiterator``, ``adelete``) instead of handing the whole request to a worker
+    thread. DRF views are synchronous, so authentication, parsing and rendering are
+    done here by hand, using token authentication and the same JSON output.
+    """
+    keyword = 'Token'
+
+    # Fields a client may write. The assignee is always the requesting user and is
+    # not validated here, because resolving it would need a synchronous query.
+    writable_fields = ('title', 'description', 'due_date', 'status')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        """
+        Return the view function, exempt from CSRF checks like DRF's token-authenticated views.
+        """
+        view = super().as_view(**initkwargs)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        """
+        Authenticate the request before handing it to the method handler.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            HttpResponse: The JSON response.
+        """
+        request.user, error = await self.authenticate(request)
+        if error is not None:
+            response = self.error_response(error, status.HTTP_401_UNAUTHORIZED)
+            response['WWW-Authenticate'] = self.keyword
+            return response
+        return await super().dispatch(request, *args, **kwargs)
+
+    async def authenticate(self, request):
+        """
+        Resolve the user from an ``Authorization: Token <key>`` header, sharing the
+        token cache of ``CachedTokenAuthentication``.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            tuple: The user (or None) and the error message (or None).
+        """
+        parts = request.headers.get('Authorization', '').split()
+        if not parts or parts[0].lower() != self.keyword.lower():
+            return None, 'Authentication credentials were not provided.'
+        if len(parts) != 2:
+            return None, 'Invalid token header.'
+        token = token_cache.get(parts[1])
+        if token is None:
+            try:
+                token = await Token.objects.select_related('user').aget(key=parts[1])
+            except Token.DoesNotExist:
+                return None, 'Invalid token.'
+            if not token.user.is_active:
+                return None, 'User inactive or deleted.'
+            token_cache.set(token)
+        return token.user, None
+
+    def get_queryset(self):
+        """
+        Return the tasks assigned to the authenticated user.
+
+        Returns:
+            QuerySet: The tasks this view operates on.
+        """
+        return Task.objects.filter(assignee_id=self.request.user.id)
+
+    def get_requested_fields(self):
+        """
+        Parse the ``fields`` query parameter, like ``TaskViewSet.get_requested_fields``.
+
+        Returns:
+            list | None: The requested field names, or None to return every field.
+
+        Raises:
+            ValueError: If an unknown field is requested.
+        """
+        if 'fields' not in self.request.GET:
+            return None
+        fields = [name.strip() for name in self.request.GET['fields'].split(',') if name.strip()]
+        unknown = [name for name in fields if name not in TaskSerializer().fields]
+        if unknown:
+            raise ValueError({'fields': [f'Unknown field "{name}".' for name in unknown]})
+        return fields
+
+    def get_data(self):
+        """
+        Parse the JSON request body.
+
+        Returns:
+            object: The decoded body.
+
+        Raises:
+            ValueError: If the body is not valid JSON.
+        """
+        try:
+            return json.loads(self.request.body or b'{}')
+        except ValueError as exc:
+            raise ValueError({'detail': f'JSON parse error - {exc}'})
+
+    def validate(self, data, partial=False):
+        """
+        Validate task data with ``TaskSerializer`` restricted to the writable fields.
+
+        None of these fields touch the database, so this is safe to call from async code.
+
+        Args:
+            data (dict): The decoded request body.
+            partial (bool): Whether missing fields are allowed.
+
+        Returns:
+            tuple: The validated data (or None) and the errors (or None).
+        """
+        serializer = TaskSerializer(data=data, partial=partial, fields=self.writable_fields)
+        if not serializer.is_valid():
+            return None, serializer.errors
+        return serializer.validated_data, None
+
+    def json_response(self, data, response_status=status.HTTP_200_OK):
+        """
+        Render ``data`` exactly like the synchronous API does.
+
+        Args:
+            data (object): The data to send.
+            response_status (int): The HTTP status code.
+
+        Returns:
+            HttpResponse: The JSON response.
+        """
+        renderer = StreamingJSONRenderer()
+        return HttpResponse(renderer.render(data), status=response_status, content_type=renderer.media_type)
+
+    def error_response(self, detail, response_status):
+        """
+        Build an error response in DRF's ``{"detail": ...}`` shape.
+        """
+        return self.json_response(detail if isinstance(detail, dict) else {'detail': detail}, response_status)
+
+    async def send_signal(self, signal, **kwargs):
+        """
+        Send one of the task signals from async code.
+
+        Receivers are synchronous and may query the database, so they run in a
+        worker thread, as they would for a synchronous view.
+        """
+        await sync_to_async(signal.send)(sender=Task, **kwargs)
+
+
+class AsyncTaskListView(AsyncTaskAPIView):
+    """
+    Async API endpoint listing and creating the authenticated user's tasks.
+    """
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Retrieve every task assigned to the authenticated user, ordered by due date.
+
+        Rows are read with ``aiterator()`` in chunks of ``TASK_EXPORT_CHUNK_SIZE`` and
+        serialized with ``TaskFastSerializer``. ``?fields=`` is supported.
+        """
+        try:
+            fields = self.get_requested_fields()
+        except ValueError as exc:
+            return self.error_response(exc.args[0], status.HTTP_400_BAD_REQUEST)
+        serializer = TaskFastSerializer(fields)
+        chunk_size = getattr(settings, 'TASK_EXPORT_CHUNK_SIZE', 2000)
+        # values() rather than values_list(): on Django 4.2 the latter runs its query
+        # when the iterator is created, i.e. in the event loop, which is not allowed.
+        rows = self.get_queryset().order_by('due_date', 'id').values(*serializer.columns)
+        rows = [[row[column] for column in serializer.columns] async for row in rows.aiterator(chunk_size=chunk_size)]
+        return self.json_response(list(serializer.serialize_rows(rows)))
+
+    async def post(self, request, *args, **kwargs):
+        """
+        Create a new task, assigning it to the authenticated user.
+        """
+        try:
+            data, errors = self.validate(self.get_data())
+        except ValueError as exc:
+            return self.error_response(exc.args[0], status.HTTP_400_BAD_REQUEST)
+        if errors is not None:
+            return self.error_response(errors, status.HTTP_400_BAD_REQUEST)
+        task = await Task.objects.acreate(**data, assignee=request.user)
+        await self.send_signal(tasks_saved, tasks=[task], created=True)
+        return self.json_response(TaskSerializer(task).data, status.HTTP_201_CREATED)
+
+
+class AsyncTaskDetailView(AsyncTaskAPIView):
+    """
+    Async API endpoint reading, updating and deleting one of the authenticated user's tasks.
+    """
+
+    async def get(self, request, pk, *args, **kwargs):
+        """
+        Retrieve a single task. ``?fields=`` is supported.
+        """
+        try:
+            fields = self.get_requested_fields()
+        except ValueError as exc:
+            return self.error_response(exc.args[0], status.HTTP_400_BAD_REQUEST)
+        serializer = TaskFastSerializer(fields)
+        try:
+            row = await self.get_queryset().values_list(*serializer.columns).aget(pk=pk)
+        except Task.DoesNotExist:
+            return self.error_response('Not found.', status.HTTP_404_NOT_FOUND)
+        return self.json_response(next(serializer.serialize_rows([row])))
+
+    async def put(self, request, pk, *args, **kwargs):
+        """
+        Fully update a task.
+        """
+        return await self.update(pk, partial=False)
+
+    async def patch(self, request, pk, *args, **kwargs):
+        """
+        Partially update a task.
+        """
+        return await self.update(pk, partial=True)
+
+    async def update(self, pk, partial):
+        """
+        Validate the request body and save it onto the task.
+
+        Args:
+            pk (int): The id of the task to update.
+            partial (bool): Whether missing fields are allowed.
+
+        Returns:
+            HttpResponse: The updated task, or the errors.
+        """
+        try:
+            data, errors = self.validate(self.get_data(), partial=partial)
+        except ValueError as exc:
+            return self.error_response(exc.args[0], status.HTTP_400_BAD_REQUEST)
+        try:
+            task = await self.get_queryset().aget(pk=pk)
+        except Task.DoesNotExist:
+            return self.error_response('Not found.', status.HTTP_404_NOT_FOUND)
+        if errors is not None:
+            return self.error_response(errors, status.HTTP_400_BAD_REQUEST)
+        for attr, value in data.items():
+            setattr(task, attr, value)
+        await task.asave()
+        await self.send_signal(tasks_saved, tasks=[task], created=False, previous_assignees={task.pk: task.assignee_id})
+        return self.json_response(TaskSerializer(task).data)
+
+    async def delete(self, request, pk, *args, **kwargs):
+        """
+        Delete a task with a single query, scoped to the user's own tasks.
+        """
+        # The async ORM cannot open a transaction, so unlike the sync views the tombstone
+        # recorded by the signal is written after the deletion has committed.
+        deleted, _ = await self.get_queryset().filter(pk=pk).adelete()
+        if not deleted:
+            return self.error_response('Not found.', status.HTTP_404_NOT_FOUND)
+        await self.send_signal(tasks_deleted, task_assignees={pk: request.user.id})
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
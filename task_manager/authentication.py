@@ -0,0 +1,160 @@
+import copy
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """
+    In-process, bounded LRU cache of tokens and their users, by token key.
+
+    Entries expire after ``TASK_TOKEN_CACHE_TTL`` seconds and the least recently used
+    ones are dropped beyond ``size``. Deleting a token, or saving or deleting its user,
+    evicts the matching entries at once, but only in the process that made the
+    change: in other processes a revoked token or a deactivated user is accepted
+    until the entry expires, so the TTL bounds how stale a worker can be.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self.user_keys = defaultdict(set)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return a token with its user, if cached and not expired.
+
+        Args:
+            key (str): The token key.
+
+        Returns:
+            Token | None: A copy of the cached token and user, so that requests never
+            share an instance.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            token = copy.copy(entry[0])
+        token.user = copy.copy(token.user)
+        return token
+
+    def set(self, token):
+        """
+        Cache a token.
+
+        Args:
+            token (Token): The token, with its user loaded.
+        """
+        ttl = getattr(settings, 'TASK_TOKEN_CACHE_TTL', 60)
+        if ttl <= 0:
+            return
+        with self.lock:
+            self._remove(token.key)
+            self.entries[token.key] = (token, time.monotonic() + ttl)
+            self.user_keys[token.user_id].add(token.key)
+            while len(self.entries) > self.size:
+                self._remove(next(iter(self.entries)))
+
+    def delete(self, key):
+        """
+        Forget a token.
+
+        Args:
+            key (str): The token key.
+        """
+        with self.lock:
+            self._remove(key)
+
+    def delete_user(self, user_id):
+        """
+        Forget every token of a user.
+
+        Args:
+            user_id (int): The id of the user.
+        """
+        with self.lock:
+            for key in list(self.user_keys.get(user_id, ())):
+                self._remove(key)
+
+    def clear(self):
+        """
+        Forget every token.
+        """
+        with self.lock:
+            self.entries.clear()
+            self.user_keys.clear()
+
+    def _remove(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            keys = self.user_keys[entry[0].user_id]
+            keys.discard(key)
+            if not keys:
+                del self.user_keys[entry[0].user_id]
+
+
+token_cache = TokenCache(getattr(settings, 'TASK_TOKEN_CACHE_SIZE', 10000))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that remembers token lookups in :data:`token_cache`.
+
+    DRF's ``TokenAuthentication`` joins ``Token`` and ``User`` on every request;
+    with a warm cache the request reaches the view without any query.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Resolve a token key to its user, from the cache when possible.
+
+        Args:
+            key (str): The token key from the Authorization header.
+
+        Returns:
+            tuple: The user and the token.
+
+        Raises:
+            AuthenticationFailed: If the token is unknown or its user is inactive.
+        """
+        token = token_cache.get(key)
+        if token is not None:
+            return token.user, token
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(token)
+        return user, token
+
+
+@receiver(post_delete, sender=Token)
+@receiver(post_save, sender=Token)
+def evict_token(sender, instance, **kwargs):
+    """
+    Forget a token that was deleted or rotated.
+    """
+    token_cache.delete(instance.key)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=User)
+def evict_user_tokens(sender, instance, **kwargs):
+    """
+    Forget the tokens of a user that was changed, e.g. deactivated, or deleted.
+    """
+    token_cache.delete_user(instance.pk)
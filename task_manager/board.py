@@ -0,0 +1,138 @@
+from django.conf import settings
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from .cache import get_task_cache
+from .models import Task
+from .search import search_task_ids, order_by_ids
+
+# Board columns in display order: (status, id of the column element in the template).
+BOARD_COLUMNS = [
+    ('pending', 'todo'),
+    ('in_progress', 'inprogress'),
+    ('completed', 'done'),
+]
+
+# The only task fields a card displays, and updated_at, which keys its cached fragment.
+CARD_FIELDS = ('id', 'title', 'status', 'due_date', 'updated_at')
+
+
+def get_column_limit(params, status):
+    """
+    Read how many cards of a column to show from the query string.
+
+    Args:
+        params (QueryDict): The request's GET parameters.
+        status (str): The status of the column.
+
+    The value is rounded up to a multiple of ``TASK_BOARD_COLUMN_LIMIT``, the
+    "load more" step, and capped at ``TASK_BOARD_COLUMN_MAX``. A huge value thus
+    cannot load a whole column, and the few possible limits share cached boards.
+
+    Returns:
+        int: The number of cards to show, at least the configured default.
+    """
+    step = getattr(settings, 'TASK_BOARD_COLUMN_LIMIT', 50)
+    maximum = max(getattr(settings, 'TASK_BOARD_COLUMN_MAX', 500), step)
+    try:
+        requested = int(params[status])
+    except (KeyError, ValueError):
+        return step
+    return min(max(-(-requested // step) * step, step), maximum)
+
+
+def build_board(user, limits):
+    """
+    Load the kanban columns of a user's board.
+
+    Each column is read with its own query on the ``(assignee, status, due_date)``
+    index and stops one card past its limit, so the cost of the board depends on
+    the limits rather than on how many tasks the user has. Only the fields shown
+    on a card are loaded.
+
+    Args:
+        user (User): The task assignee.
+        limits (dict): The number of cards to show, keyed by status.
+
+    Returns:
+        list: One dict per column with its ``status``, ``label``, ``element_id``,
+        ``tasks`` and ``has_more`` flag.
+    """
+    labels = dict(Task.STATUS_CHOICES)
+    columns = []
+    for status, element_id in BOARD_COLUMNS:
+        limit = limits[status]
+        queryset = Task.objects.filter(assignee=user, status=status).only(*CARD_FIELDS).order_by('due_date', 'id')
+        tasks = list(queryset[:limit + 1])
+        columns.append({
+            'status': status,
+            'label': labels[status],
+            'element_id': element_id,
+            'tasks': tasks[:limit],
+            'has_more': len(tasks) > limit,
+        })
+    return columns
+
+
+def build_search_board(user, query, limit):
+    """
+    Load a board holding only the user's tasks that match a search.
+
+    Cards keep the search rank order within their column.
+
+    Args:
+        user (User): The task assignee.
+        query (str): The search text.
+        limit (int): The maximum number of matching tasks to show.
+
+    Returns:
+        list: The columns, shaped like those of :func:`build_board`.
+    """
+    ids = search_task_ids(user, query, limit)
+    # The ids come from a search of this user's tasks only. Filtering on the assignee
+    # again would make SQLite walk all of the user's tasks instead of the ids.
+    tasks = order_by_ids(Task.objects.filter(pk__in=ids).only(*CARD_FIELDS), ids)
+    labels = dict(Task.STATUS_CHOICES)
+    return [
+        {
+            'status': status,
+            'label': labels[status],
+            'element_id': element_id,
+            'tasks': [task for task in tasks if task.status == status],
+            'has_more': False,
+        }
+        for status, element_id in BOARD_COLUMNS
+    ]
+
+
+def get_card_key(task):
+    # Every write to a task moves updated_at, so a key never outlives its card.
+    return f'task_manager:card:{task.id}:{task.updated_at.isoformat()}'
+
+
+def render_cards(tasks):
+    """
+    Render the kanban cards of tasks, reusing the HTML cached for unchanged ones.
+
+    Cards are cached by task id and ``updated_at`` and fetched with a single
+    ``get_many()``, so after a write only the changed card is rendered again. A
+    lookup per card, as the ``{% cache %}`` tag does, would cost more than
+    rendering the card.
+
+    Args:
+        tasks (list): The tasks, with at least :data:`CARD_FIELDS` loaded.
+
+    Returns:
+        list: The HTML of each card, in the order of ``tasks``.
+    """
+    cache = get_task_cache()
+    keys = [get_card_key(task) for task in tasks]
+    cards = cache.get_many(keys)
+    rendered = {}
+    template = get_template('task_manager/task_card.html')
+    for task, key in zip(tasks, keys):
+        if key not in cards:
+            cards[key] = rendered[key] = template.render({'task': task})
+    if rendered:
+        cache.set_many(rendered, timeout=getattr(settings, 'TASK_CACHE_TIMEOUT', 300))
+    return [mark_safe(cards[key]) for key in keys]
@@ -0,0 +1,102 @@
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.dispatch import receiver
+
+from .signals import tasks_saved, tasks_deleted
+
+
+def get_task_cache():
+    """
+    Return the cache backend holding task lists.
+
+    Returns:
+        BaseCache: The cache named by ``TASK_CACHE_ALIAS``.
+    """
+    return caches[getattr(settings, 'TASK_CACHE_ALIAS', 'default')]
+
+
+def _version_key(user_id):
+    return f'task_manager:tasks:version:{user_id}'
+
+
+def get_task_list_version(user_id):
+    """
+    Return the current version of a user's task list.
+
+    The version changes whenever one of the user's tasks is written, so every key
+    built from it becomes unreachable at once instead of being deleted one by one.
+
+    Args:
+        user_id (int): The id of the task assignee.
+
+    Returns:
+        int: The current version number.
+    """
+    cache = get_task_cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        # Start from the clock rather than 1 so that a counter which was evicted
+        # never comes back to a value whose entries may still be cached.
+        cache.add(_version_key(user_id), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+def invalidate_task_list(*user_ids):
+    """
+    Bump the task list version of each given user.
+
+    Args:
+        *user_ids (int): Ids of the assignees whose tasks changed. None is ignored.
+    """
+    cache = get_task_cache()
+    for user_id in set(user_ids) - {None}:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            cache.set(_version_key(user_id), time.time_ns(), timeout=None)
+
+
+def get_or_set_task_list(user_id, name, compute):
+    """
+    Return a cached value derived from a user's tasks, computing it on a miss.
+
+    Args:
+        user_id (int): The id of the task assignee.
+        name (str): Identifies the value, e.g. ``'board'`` or ``'api'``.
+        compute (callable): Builds the value; it must not return None.
+
+    Returns:
+        object: The cached or freshly computed value.
+    """
+    cache = get_task_cache()
+    key = f'task_manager:tasks:{name}:{user_id}:{get_task_list_version(user_id)}'
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout=getattr(settings, 'TASK_CACHE_TIMEOUT', 300))
+    return value
+
+
+@receiver(tasks_saved)
+def invalidate_saved_tasks(sender, tasks, previous_assignees=None, **kwargs):
+    """
+    Invalidate the lists of the old and new assignees of saved tasks.
+
+    The version is bumped once the write commits: bumped earlier, a concurrent
+    reader could cache the list as it was before the write under the new version.
+    """
+    user_ids = [*(task.assignee_id for task in tasks), *(previous_assignees or {}).values()]
+    transaction.on_commit(partial(invalidate_task_list, *user_ids))
+
+
+@receiver(tasks_deleted)
+def invalidate_deleted_tasks(sender, task_assignees, **kwargs):
+    """
+    Invalidate the lists of the assignees of deleted tasks, once the delete commits.
+    """
+    transaction.on_commit(partial(invalidate_task_list, *task_assignees.values()))
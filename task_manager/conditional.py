@@ -0,0 +1,99 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_or_set_task_list
+from .models import Task, TaskTombstone
+
+
+def _make_etag(*parts):
+    return quote_etag(hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def task_list_validators(user, variant=''):
+    """
+    Compute the ETag and Last-Modified validators of a user's task list.
+
+    The validators come from the number of tasks and the latest of ``max(updated_at)``
+    and the time of the user's latest tombstone. A task deleted or given to someone
+    else leaves no newer ``updated_at`` behind, so without the tombstones the
+    Last-Modified time could move backwards and answer an If-Modified-Since request
+    sent after the deletion with a stale 304. Tombstones pruned after
+    ``TASK_TOMBSTONE_RETENTION_DAYS`` no longer count, but the ETag still changes with
+    the number of tasks. The validators are cached alongside the list itself and
+    recomputed after every write.
+
+    Args:
+        user (User): The task assignee.
+        variant (str): Anything else the representation depends on, such as the
+            request path and media type.
+
+    Returns:
+        tuple: The quoted ETag and the last modification time (None without tasks).
+    """
+    def compute():
+        aggregate = Task.objects.filter(assignee=user).aggregate(last_modified=Max('updated_at'), count=Count('id'))
+        # Read through tombstone_assignee_idx.
+        last_deleted = TaskTombstone.objects.filter(assignee=user).aggregate(last_deleted=Max('deleted_at'))['last_deleted']
+        return aggregate['count'], max(filter(None, [aggregate['last_modified'], last_deleted]), default=None)
+
+    count, last_modified = get_or_set_task_list(user.id, 'validators', compute)
+    etag = _make_etag(user.pk, user.get_username(), count, last_modified and last_modified.isoformat(), variant)
+    return etag, last_modified
+
+
+def task_validators(task, user, variant=''):
+    """
+    Compute the ETag and Last-Modified validators of a single task.
+
+    Args:
+        task (Task): The task being displayed.
+        user (User): The requesting user.
+        variant (str): Anything else the representation depends on.
+
+    Returns:
+        tuple: The quoted ETag and the last modification time.
+    """
+    etag = _make_etag(user.pk, user.get_username(), task.pk, task.updated_at.isoformat(), variant)
+    return etag, task.updated_at
+
+
+def not_modified_response(request, etag, last_modified):
+    """
+    Evaluate the request's conditional headers against the validators.
+
+    Args:
+        request (HttpRequest): The incoming request.
+        etag (str): The current ETag.
+        last_modified (datetime | None): The current last modification time.
+
+    Returns:
+        HttpResponse | None: A 304 (or 412) response, or None if the full response
+        has to be built.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    """
+    Add the validators to a response and ask clients to revalidate it before reuse.
+
+    Args:
+        response (HttpResponse): The outgoing response.
+        etag (str): The current ETag.
+        last_modified (datetime | None): The current last modification time.
+
+    Returns:
+        HttpResponse: The same response.
+    """
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
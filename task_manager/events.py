@@ -0,0 +1,465 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .renderers import StreamingJSONRenderer
+from .serializers import TaskSerializer
+from .signals import tasks_saved, tasks_deleted
+from .sync import decode_sync_token, encode_sync_token, get_changes
+
+
+class TaskChangeNotifier:
+    """
+    Wakes up the async event streams of this process when :data:`buffer` publishes
+    an event for their user.
+
+    Each stream waits on its own :class:`asyncio.Event`, which is set in the
+    stream's event loop from whichever thread committed the write.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiters = {}
+
+    def subscribe(self, user_id):
+        """
+        Register a waiter for changes to the tasks of ``user_id``.
+
+        Must be called from the event loop of the waiting stream.
+
+        Args:
+            user_id (int): The user whose tasks are watched.
+
+        Returns:
+            tuple: The event loop and the :class:`asyncio.Event` set on a change.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self.lock:
+            self.waiters.setdefault(user_id, set()).add(waiter)
+        return waiter
+
+    def unsubscribe(self, user_id, waiter):
+        """
+        Forget a waiter returned by :meth:`subscribe`.
+        """
+        with self.lock:
+            waiters = self.waiters.get(user_id, set())
+            waiters.discard(waiter)
+            if not waiters:
+                self.waiters.pop(user_id, None)
+
+    def notify(self, *user_ids):
+        """
+        Wake up the streams of the given users. Safe to call from any thread.
+
+        Args:
+            *user_ids (int): Ids of the users whose tasks changed. None is ignored.
+        """
+        with self.lock:
+            waiters = [waiter for user_id in set(user_ids) for waiter in self.waiters.get(user_id, ())]
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The loop was closed under a stream that has not cleaned up yet.
+                pass
+
+
+notifier = TaskChangeNotifier()
+
+
+class TaskEventBuffer:
+    """
+    In-process, bounded log of the task changes committed by this process.
+
+    Lets streams push a change as soon as it commits, and replay the changes a
+    client missed while it reconnected to the same process. Events get consecutive
+    sequence numbers and only the last ``size`` are kept. Positions also carry the
+    start time of the buffer, so one issued by another process, or before a
+    restart, is recognised as unknown instead of being compared with unrelated
+    sequence numbers.
+    """
+
+    def __init__(self, size):
+        self.epoch = str(time.time_ns())
+        self.events = deque(maxlen=size)
+        self.sequence = 0
+        self.condition = threading.Condition()
+
+    def position(self):
+        """
+        Return the sequence number of the latest event.
+        """
+        with self.condition:
+            return self.sequence
+
+    def format_position(self, sequence):
+        return f'{self.epoch}-{sequence}'
+
+    def parse_position(self, position):
+        """
+        Turn a position back into a sequence number of this buffer.
+
+        Args:
+            position (str): A position made by :meth:`format_position`.
+
+        Returns:
+            int | None: The sequence number, or None if the position was not issued here.
+        """
+        epoch, _, sequence = position.partition('-')
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        return int(sequence)
+
+    def publish(self, events):
+        """
+        Record events and wake up the streams of their users.
+
+        Args:
+            events (list): ``(user id, event type, payload)`` tuples.
+        """
+        with self.condition:
+            for user_id, event, data in events:
+                self.sequence += 1
+                self.events.append((self.sequence, user_id, event, data))
+            self.condition.notify_all()
+        notifier.notify(*(user_id for user_id, _, _ in events))
+
+    def since(self, user_id, sequence):
+        """
+        Return the events for ``user_id`` that came after ``sequence``.
+
+        Args:
+            user_id (int): The user reading the events.
+            sequence (int): The sequence number of the last event the client has.
+
+        Returns:
+            list | None: ``(sequence, event, data)`` tuples, or None when events the
+            client missed have already dropped out of the buffer.
+        """
+        with self.condition:
+            oldest = self.events[0][0] if self.events else self.sequence + 1
+            if sequence > self.sequence or sequence < oldest - 1:
+                return None
+            return [
+                (event_sequence, event, data) for event_sequence, event_user_id, event, data in self.events
+                if event_sequence > sequence and event_user_id == user_id
+            ]
+
+    def wait(self, user_id, sequence, timeout):
+        """
+        Block until there are events for ``user_id`` after ``sequence``, or ``timeout`` passes.
+
+        Args:
+            user_id (int): The user reading the events.
+            sequence (int): The sequence number of the last event the client has.
+            timeout (float): The maximum number of seconds to wait.
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while self.since(user_id, sequence) == []:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self.condition.wait(remaining)
+
+    def clear(self):
+        """
+        Forget every event.
+        """
+        with self.condition:
+            self.events.clear()
+
+
+buffer = TaskEventBuffer(getattr(settings, 'TASK_EVENT_BUFFER_SIZE', 1000))
+
+
+def format_event(event, data, event_id=None):
+    """
+    Encode one Server-Sent Event.
+
+    Args:
+        event (str): The event type.
+        data (object): The payload, sent as compact JSON.
+        event_id (str): The id the client will send back as ``Last-Event-ID``.
+
+    Returns:
+        bytes: The encoded event.
+    """
+    lines = [f'id: {event_id}'] if event_id is not None else []
+    lines += [f'event: {event}', f'data: {StreamingJSONRenderer().encode(data)}']
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+class TaskEventFeed:
+    """
+    Reads the task change events of a user for a Server-Sent Events stream.
+
+    Changes committed by this process come from :data:`buffer` as soon as they are
+    published. The changes of other processes, and those a reconnecting client
+    missed that the buffer does not hold, are read from the sync feed instead. An
+    event id holds both positions, ``<buffer position>/<sync token>``, so a client
+    reconnecting to the same process is replayed its events from memory and one
+    reconnecting anywhere else from the database. A client without an id starts
+    from now; one whose id is malformed, or older than the tombstones are kept
+    for, gets a ``reset`` event and must fetch its tasks again.
+
+    A change reported by both sources is sent once. Like the sync, each read of the
+    feed overlaps the previous one by ``TASK_SYNC_OVERLAP`` seconds.
+
+    Args:
+        user (User): The user whose events are read.
+        last_event_id (str): The id of the last event the client received.
+    """
+
+    def __init__(self, user, last_event_id=None):
+        self.user = user
+        # Per task id, the updated_at sent last, or None once it was deleted.
+        self.sent = {}
+        self.reset = False
+        # Taken before the feed is read, so that no event falls in between.
+        self.sequence = buffer.position()
+        self.replay = False
+        self.token = None
+        if last_event_id:
+            position, _, token = last_event_id.rpartition('/')
+            try:
+                decode_sync_token(token)
+            except ValidationError:
+                self.reset = True
+            else:
+                self.token = token
+                sequence = buffer.parse_position(position)
+                if sequence is not None and buffer.since(user.id, sequence) is not None:
+                    self.sequence = sequence
+                else:
+                    # Issued by another process or before a restart, or the
+                    # client missed more events than the buffer holds.
+                    self.replay = True
+        self.token = self.token or encode_sync_token(timezone.now())
+
+    def event_id(self):
+        return f'{buffer.format_position(self.sequence)}/{self.token}'
+
+    def position(self):
+        """
+        Encode the current position alone, for the client to resume from.
+
+        Returns:
+            bytes: An id without an event, which clients record without dispatching.
+        """
+        return f'id: {self.event_id()}\n\n'.encode()
+
+    def wait(self, timeout):
+        """
+        Block until this process publishes an event for the user, or ``timeout`` passes.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+        """
+        buffer.wait(self.user.id, self.sequence, timeout)
+
+    def read(self, poll=False):
+        """
+        Read the changes since the previous read.
+
+        Args:
+            poll (bool): Also read the sync feed, for the writes of other processes.
+
+        Returns:
+            bytes: The encoded events, empty if nothing changed.
+        """
+        if self.reset:
+            self.reset = False
+            return format_event('reset', {}, self.event_id())
+        events = buffer.since(self.user.id, self.sequence)
+        if events is None:
+            # Fell behind the buffer since the previous read.
+            self.sequence = buffer.position()
+            events = []
+            self.replay = True
+        chunks = []
+        for sequence, event, data in events:
+            self.sequence = sequence
+            chunks.append(self.format_change(event, data))
+        if poll or self.replay:
+            self.replay = False
+            chunks.append(self.read_feed())
+        return b''.join(chunks)
+
+    def read_feed(self):
+        """
+        Read the changes in the sync feed since the previous read of it.
+
+        Returns:
+            bytes: The encoded events.
+        """
+        since = decode_sync_token(self.token)
+        changes = get_changes(self.user, self.token)
+        self.token = changes['token']
+        if changes['full']:
+            # Deletions since then may be forgotten.
+            self.sent.clear()
+            return format_event('reset', {}, self.event_id())
+
+        chunks = []
+        for task in changes['changed']:
+            created = task['id'] not in self.sent and parse_datetime(task['created_at']) > since
+            chunks.append(self.format_change('created' if created else 'updated', task))
+        for pk in changes['deleted']:
+            chunks.append(self.format_change('deleted', {'id': pk}))
+        return b''.join(chunks)
+
+    def format_change(self, event, data):
+        """
+        Encode a change, unless the same change was already sent.
+
+        Args:
+            event (str): ``created``, ``updated`` or ``deleted``.
+            data (dict): The task, or its id alone for ``deleted``.
+
+        Returns:
+            bytes: The encoded event, empty if it was already sent.
+        """
+        state = None if event == 'deleted' else data['updated_at']
+        if data['id'] in self.sent and self.sent[data['id']] == state:
+            return b''
+        self.sent[data['id']] = state
+        return format_event(event, data, self.event_id())
+
+
+def stream_events(user, last_event_id=None):
+    """
+    Yield the task change events of a user as a Server-Sent Events stream.
+
+    The events since ``last_event_id`` are sent first, or just the current
+    position. The stream then sends the changes this process commits as they are
+    published, and reads the feed every ``TASK_EVENT_POLL_INTERVAL`` seconds for
+    the writes of other processes. A comment is sent every ``TASK_EVENT_KEEPALIVE``
+    seconds without events, and the stream ends after ``TASK_EVENT_STREAM_TIMEOUT``
+    seconds, so that it does not hold a WSGI worker forever; the client reconnects
+    by itself with the id of the last event.
+
+    Args:
+        user (User): The user whose events are streamed.
+        last_event_id (str): The id of the last event the client received.
+
+    Yields:
+        bytes: Encoded events and keepalive comments.
+    """
+    poll_interval = getattr(settings, 'TASK_EVENT_POLL_INTERVAL', 2)
+    keepalive = getattr(settings, 'TASK_EVENT_KEEPALIVE', 15)
+    deadline = time.monotonic() + getattr(settings, 'TASK_EVENT_STREAM_TIMEOUT', 300)
+    feed = TaskEventFeed(user, last_event_id)
+    yield f'retry: {getattr(settings, "TASK_EVENT_RETRY", 3000)}\n\n'.encode()
+
+    # The first read always sends the position, so the client can resume from it.
+    yield feed.read() or feed.position()
+    last_sent = time.monotonic()
+    next_poll = last_sent + poll_interval
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        feed.wait(min(next_poll, deadline, last_sent + keepalive) - now)
+        poll = time.monotonic() >= next_poll
+        if poll:
+            next_poll = time.monotonic() + poll_interval
+        chunk = feed.read(poll)
+        if chunk:
+            yield chunk
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= keepalive:
+            yield b': keepalive\n' + feed.position()
+            last_sent = time.monotonic()
+
+
+async def astream_events(user, last_event_id=None):
+    """
+    Async version of :func:`stream_events`, for ASGI servers.
+
+    Waiting for a change holds no thread: the stream waits on the :data:`notifier`,
+    which :data:`buffer` wakes up when it publishes an event for the user.
+
+    Args:
+        user (User): The user whose events are streamed.
+        last_event_id (str): The id of the last event the client received.
+
+    Yields:
+        bytes: Encoded events and keepalive comments.
+    """
+    loop = asyncio.get_running_loop()
+    poll_interval = getattr(settings, 'TASK_EVENT_POLL_INTERVAL', 2)
+    keepalive = getattr(settings, 'TASK_EVENT_KEEPALIVE', 15)
+    deadline = loop.time() + getattr(settings, 'TASK_EVENT_STREAM_TIMEOUT', 300)
+    feed = TaskEventFeed(user, last_event_id)
+    read = sync_to_async(feed.read)
+    yield f'retry: {getattr(settings, "TASK_EVENT_RETRY", 3000)}\n\n'.encode()
+
+    waiter = notifier.subscribe(user.id)
+    changed = waiter[1]
+    try:
+        chunk = await read()
+        yield chunk or feed.position()
+        last_sent = loop.time()
+        next_poll = last_sent + poll_interval
+        while True:
+            now = loop.time()
+            if now >= deadline:
+                return
+            try:
+                await asyncio.wait_for(changed.wait(), min(next_poll, deadline, last_sent + keepalive) - now)
+            except asyncio.TimeoutError:
+                pass
+            # Cleared before reading, so an event published during the read is read next.
+            changed.clear()
+            poll = loop.time() >= next_poll
+            if poll:
+                next_poll = loop.time() + poll_interval
+            chunk = await read(poll)
+            if chunk:
+                yield chunk
+                last_sent = loop.time()
+            elif loop.time() - last_sent >= keepalive:
+                yield b': keepalive\n' + feed.position()
+                last_sent = loop.time()
+    finally:
+        notifier.unsubscribe(user.id, waiter)
+
+
+@receiver(tasks_saved)
+def publish_saved_tasks(sender, tasks, created, previous_assignees=None, **kwargs):
+    """
+    Publish a ``created`` or ``updated`` event per saved task, and a ``deleted``
+    event to a previous assignee who lost the task, once the write commits.
+    """
+    previous_assignees = previous_assignees or {}
+    events = []
+    for task, data in zip(tasks, TaskSerializer(tasks, many=True).data):
+        previous = previous_assignees.get(task.pk, task.assignee_id)
+        if previous != task.assignee_id and previous is not None:
+            events.append((previous, 'deleted', {'id': task.pk}))
+        if task.assignee_id is not None:
+            events.append((task.assignee_id, 'created' if created else 'updated', data))
+    if events:
+        transaction.on_commit(partial(buffer.publish, events))
+
+
+@receiver(tasks_deleted)
+def publish_deleted_tasks(sender, task_assignees, **kwargs):
+    """
+    Publish a ``deleted`` event per deleted task, once the delete commits.
+    """
+    events = [(user_id, 'deleted', {'id': pk}) for pk, user_id in task_assignees.items() if user_id is not None]
+    if events:
+        transaction.on_commit(partial(buffer.publish, events))
@@ -0,0 +1,142 @@
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import Task
+
+
+class TaskListFilter:
+    """
+    Filtering and ordering of the task list from ``?status=``, ``?due=`` and ``?ordering=``.
+
+    Only the combinations an index on ``Task`` can serve are accepted, so that every
+    list query reads the user's tasks in index order and stops at the page size,
+    instead of sorting all of them first:
+
+    - ordering by ``due_date`` (the default) combines with any filter, through the
+      ``(assignee, due_date, id)`` and ``(assignee, status, due_date)`` indexes;
+    - ordering by ``created_at`` or ``updated_at`` takes no filter, through the
+      ``(assignee, created_at)`` and ``(assignee, updated_at)`` indexes.
+
+    Every ordering ends with ``id`` so that keyset pages have a unique position.
+    """
+    status_query_param = 'status'
+    due_query_param = 'due'
+    ordering_query_param = 'ordering'
+
+    # Orderings accepted by ?ordering=, mapped to whether they can be filtered.
+    orderings = {
+        'due_date': True,
+        'created_at': False,
+        'updated_at': False,
+    }
+    default_ordering = 'due_date'
+    due_choices = ('overdue', 'week')
+
+    def __init__(self, query_params):
+        """
+        Parse and validate the list parameters.
+
+        Args:
+            query_params (QueryDict): The request's query parameters.
+
+        Raises:
+            ValidationError: If a value is unknown or the combination is not index-backed.
+        """
+        self.status = query_params.get(self.status_query_param) or None
+        self.due = query_params.get(self.due_query_param) or None
+        ordering = query_params.get(self.ordering_query_param) or self.default_ordering
+        self.descending = ordering.startswith('-')
+        self.ordering_field = ordering.lstrip('-')
+
+        errors = {}
+        if self.status is not None and self.status not in dict(Task.STATUS_CHOICES):
+            errors[self.status_query_param] = [f'"{self.status}" is not a valid status.']
+        if self.due is not None and self.due not in self.due_choices:
+            errors[self.due_query_param] = [f'Expected one of: {", ".join(self.due_choices)}.']
+        if self.ordering_field not in self.orderings:
+            allowed = ', '.join(f'{name}, -{name}' for name in self.orderings)
+            errors[self.ordering_query_param] = [f'Expected one of: {allowed}.']
+        elif not self.orderings[self.ordering_field] and self.is_filtered():
+            errors[self.ordering_query_param] = [
+                f'Ordering by {self.ordering_field} cannot be combined with the status or due filters.'
+            ]
+        if errors:
+            raise ValidationError(errors)
+        self.today = timezone.localdate()
+
+    def is_filtered(self):
+        """
+        Tell whether any filter was requested.
+
+        Returns:
+            bool: True if ``status`` or ``due`` was given.
+        """
+        return self.status is not None or self.due is not None
+
+    def is_date_relative(self):
+        """
+        Tell whether the result depends on today's date besides the tasks themselves.
+
+        Returns:
+            bool: True for the ``due`` filters.
+        """
+        return self.due is not None
+
+    @property
+    def ordering(self):
+        """
+        tuple: The field names to order by, ending with ``id``.
+        """
+        prefix = '-' if self.descending else ''
+        return (f'{prefix}{self.ordering_field}', f'{prefix}id')
+
+    def get_due_range(self):
+        """
+        Return the due date bounds of the ``due`` filter.
+
+        ``overdue`` is anything due before today; ``week`` runs from Monday to
+        Sunday of the current week.
+
+        Returns:
+            dict: ``due_date`` lookups.
+        """
+        if self.due == 'overdue':
+            return {'due_date__lt': self.today}
+        monday = self.today - timedelta(days=self.today.weekday())
+        return {'due_date__range': (monday, monday + timedelta(days=6))}
+
+    def filter_queryset(self, queryset):
+        """
+        Apply the filters and the ordering to a user's tasks.
+
+        Args:
+            queryset (QuerySet): The tasks of one assignee.
+
+        Returns:
+            QuerySet: The filtered, ordered tasks.
+        """
+        if self.status is not None:
+            queryset = queryset.filter(status=self.status)
+        if self.due is not None:
+            queryset = queryset.filter(**self.get_due_range())
+            if self.due == 'overdue':
+                # Completed tasks are not late. A range on the index plus a check of
+                # each row it yields, rather than a second range that the
+                # (assignee, due_date, id) index could not serve in order.
+                queryset = queryset.exclude(status='completed')
+        return queryset.order_by(*self.ordering)
+
+    def get_cache_name(self):
+        """
+        Identify the filtered list among the values cached for the user.
+
+        Returns:
+            str: A name part covering the filters, the ordering and, for the date
+            relative filters, today's date.
+        """
+        parts = [self.status or '', self.due or '', ('-' if self.descending else '') + self.ordering_field]
+        if self.is_date_relative():
+            parts.append(self.today.isoformat())
+        return ':'.join(parts)
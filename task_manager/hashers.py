@@ -0,0 +1,127 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .performance import LatencyHistogram
+
+
+class PasswordHashingBusy(APIException):
+    """
+    Raised when a password cannot be hashed or checked because too many already wait.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many logins at once, try again shortly.'
+    default_code = 'password_hashing_busy'
+
+    # Seconds the client is asked to wait, sent as Retry-After.
+    wait = 1
+
+
+class PasswordHashingLimiter:
+    """
+    Bounds how many passwords this process hashes at once.
+
+    Hashing a password costs a few hundred milliseconds of CPU by design. Without a
+    bound a burst of logins takes every CPU and worker thread, and task reads queue
+    behind it. At most ``concurrency`` hashes run at once; up to ``queue_size``
+    callers wait for a slot, for at most ``timeout`` seconds, and anyone beyond that
+    gets :class:`PasswordHashingBusy` straight away, which answers 503, rather than
+    holding a worker thread.
+    """
+
+    def __init__(self, concurrency, queue_size, timeout, histogram_size=1000):
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.condition = threading.Condition()
+        self.in_progress = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self.histogram = LatencyHistogram(histogram_size)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one of the hashing slots while the enclosed block runs.
+
+        Raises:
+            PasswordHashingBusy: If the queue is full or no slot freed up in time.
+        """
+        start = time.monotonic()
+        with self.condition:
+            if self.in_progress >= self.concurrency and self.waiting >= self.queue_size:
+                self.rejected += 1
+                raise PasswordHashingBusy()
+            self.waiting += 1
+            try:
+                while self.in_progress >= self.concurrency:
+                    remaining = start + self.timeout - time.monotonic()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        raise PasswordHashingBusy()
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_progress += 1
+        acquired = time.monotonic()
+        self.histogram.record('wait', (acquired - start) * 1000)
+        try:
+            yield
+        finally:
+            self.histogram.record('hash', (time.monotonic() - acquired) * 1000)
+            with self.condition:
+                self.in_progress -= 1
+                self.completed += 1
+                self.condition.notify()
+
+    def snapshot(self):
+        """
+        Report the queueing metrics of this process.
+
+        Returns:
+            dict: The limits, the current ``in_progress`` and ``waiting`` counts, the
+            ``completed`` and ``rejected`` totals, and the percentiles of the time
+            spent waiting for a slot and hashing, in milliseconds.
+        """
+        with self.condition:
+            counters = {
+                'concurrency': self.concurrency,
+                'queue_size': self.queue_size,
+                'in_progress': self.in_progress,
+                'waiting': self.waiting,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+        return {**counters, **{f'{name}_ms': value for name, value in self.histogram.snapshot().items()}}
+
+
+limiter = PasswordHashingLimiter(
+    getattr(settings, 'TASK_PASSWORD_HASHING_CONCURRENCY', 1),
+    getattr(settings, 'TASK_PASSWORD_HASHING_QUEUE_SIZE', 8),
+    getattr(settings, 'TASK_PASSWORD_HASHING_TIMEOUT', 5),
+)
+
+
+class LimitedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher, run under :data:`limiter` with configurable iterations.
+
+    Keeps the ``pbkdf2_sha256`` algorithm name, so existing hashes are read as
+    before; hashes made with another iteration count are upgraded at the next login.
+    Every hash goes through ``encode()``, whether it is made for a new password or
+    to check one, including the dummy hash run for unknown usernames.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'TASK_PASSWORD_ITERATIONS', PBKDF2PasswordHasher.iterations)
+
+    def encode(self, password, salt, iterations=None):
+        with limiter.slot():
+            return super().encode(password, salt, iterations)
@@ -0,0 +1,179 @@
+import uuid
+from datetime import timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+# Handlers by job name, as (function, batch size).
+registry = {}
+
+
+def register(name, batch_size=None):
+    """
+    Register a function as the handler of the jobs called ``name``.
+
+    The function receives the payloads of up to ``batch_size`` jobs at once, so side
+    effects can be applied in bulk, and runs in a transaction. If it raises, every
+    job of the batch is retried later. A job may run more than once, e.g. when its
+    worker dies before recording the result, so handlers must be idempotent.
+
+    Args:
+        name (str): The job name given to :func:`enqueue`.
+        batch_size (int): Most payloads per call, ``TASK_JOB_BATCH_SIZE`` by default.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(function):
+        registry[name] = (function, batch_size)
+        return function
+    return decorator
+
+
+def enqueue(name, payload=None, key=None, delay=0):
+    """
+    Add a job to the queue.
+
+    Called inside a write's transaction, the job is only queued if the write commits.
+
+    Args:
+        name (str): The name the handler was registered under.
+        payload (dict): JSON-serializable arguments of the job.
+        key (str): Idempotency key: the job is not queued if a job with the same key
+            already exists, whatever its status.
+        delay (float): Seconds before the job may run.
+
+    Returns:
+        bool: Whether the job was queued.
+    """
+    run_at = timezone.now() + timedelta(seconds=delay)
+    try:
+        # In a savepoint, so that a duplicate key leaves the caller's transaction usable.
+        with transaction.atomic():
+            Job.objects.create(name=name, payload=payload or {}, key=key, run_at=run_at)
+    except IntegrityError:
+        if key is None:
+            raise
+        return False
+    return True
+
+
+def claim_jobs(limit, now=None):
+    """
+    Take up to ``limit`` jobs that are due for this worker.
+
+    Due jobs are pending ones whose ``run_at`` has passed, and running ones whose
+    worker let its lease of ``TASK_JOB_LEASE`` seconds run out. They are claimed by a
+    single UPDATE, so workers sharing the database never take the same job. A job
+    whose lease ran out on its last allowed attempt, e.g. because it kills its
+    worker, is marked failed instead of being run again.
+
+    Args:
+        limit (int): Most jobs to claim.
+        now (datetime): The current time.
+
+    Returns:
+        list: The claimed jobs, oldest first, with ``attempts`` already counting this run.
+    """
+    now = now or timezone.now()
+    Job.objects.filter(
+        status='running', run_at__lte=now, attempts__gte=getattr(settings, 'TASK_JOB_MAX_ATTEMPTS', 5),
+    ).update(status='failed', claimed_by='', run_at=now, last_error='Lease expired on the last attempt')
+    claim = uuid.uuid4().hex
+    due = Q(status__in=['pending', 'running'], run_at__lte=now)
+    Job.objects.filter(due, pk__in=Job.objects.filter(due).order_by('run_at', 'id').values('pk')[:limit]).update(
+        status='running',
+        claimed_by=claim,
+        attempts=F('attempts') + 1,
+        run_at=now + timedelta(seconds=getattr(settings, 'TASK_JOB_LEASE', 300)),
+    )
+    return list(Job.objects.filter(status='running', claimed_by=claim).order_by('id'))
+
+
+def get_retry_delay(attempts):
+    """
+    Return the seconds to wait before the next attempt of a job.
+
+    Args:
+        attempts (int): The attempts made so far.
+
+    Returns:
+        float: ``TASK_JOB_RETRY_DELAY`` doubled after each attempt.
+    """
+    return getattr(settings, 'TASK_JOB_RETRY_DELAY', 10) * 2 ** (attempts - 1)
+
+
+def run_jobs(jobs, now=None):
+    """
+    Run claimed jobs in batches, one per handler call, and record the outcome.
+
+    Args:
+        jobs (list): Jobs returned by :func:`claim_jobs`.
+        now (datetime): The current time.
+
+    Returns:
+        dict: The number of jobs ``done``, to be ``retried`` and ``failed``.
+    """
+    counts = {'done': 0, 'retried': 0, 'failed': 0}
+    for name, batch in groupby(sorted(jobs, key=attrgetter('name', 'id')), key=attrgetter('name')):
+        batch = list(batch)
+        if name not in registry:
+            _record_failure(batch, f'No handler registered for {name!r}', counts, now, retry=False)
+            continue
+        function, batch_size = registry[name]
+        batch_size = batch_size or getattr(settings, 'TASK_JOB_BATCH_SIZE', 100)
+        for start in range(0, len(batch), batch_size):
+            chunk = batch[start:start + batch_size]
+            try:
+                with transaction.atomic():
+                    function([job.payload for job in chunk])
+            except Exception as error:
+                _record_failure(chunk, f'{type(error).__name__}: {error}', counts, now)
+            else:
+                _record(chunk, status='done', run_at=now or timezone.now())
+                counts['done'] += len(chunk)
+    return counts
+
+
+def _record(jobs, **fields):
+    # Jobs whose lease ran out and that another worker claimed again are left to it.
+    Job.objects.filter(pk__in=[job.pk for job in jobs], status='running', claimed_by=jobs[0].claimed_by).update(
+        claimed_by='', **fields,
+    )
+
+
+def _record_failure(jobs, error, counts, now=None, retry=True):
+    now = now or timezone.now()
+    max_attempts = getattr(settings, 'TASK_JOB_MAX_ATTEMPTS', 5)
+    for attempts, group in groupby(sorted(jobs, key=attrgetter('attempts')), key=attrgetter('attempts')):
+        group = list(group)
+        if retry and attempts < max_attempts:
+            _record(group, status='pending', run_at=now + timedelta(seconds=get_retry_delay(attempts)), last_error=error)
+            counts['retried'] += len(group)
+        else:
+            _record(group, status='failed', run_at=now, last_error=error)
+            counts['failed'] += len(group)
+
+
+def prune_jobs(now=None):
+    """
+    Delete the jobs that finished more than ``TASK_JOB_RETENTION_DAYS`` ago.
+
+    Their idempotency keys can then be queued again.
+
+    Args:
+        now (datetime): The current time.
+
+    Returns:
+        int: The number of jobs deleted.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(days=getattr(settings, 'TASK_JOB_RETENTION_DAYS', 7))
+    deleted, _ = Job.objects.filter(status__in=['done', 'failed'], run_at__lt=cutoff).delete()
+    return deleted
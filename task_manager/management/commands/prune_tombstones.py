@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from task_manager.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    """
+    Delete task tombstones older than ``TASK_TOMBSTONE_RETENTION_DAYS``.
+
+    Clients whose last sync is older than that get a full sync instead, so the
+    tombstones are no longer needed. Run it daily, e.g. from cron.
+    """
+    help = 'Delete task tombstones older than TASK_TOMBSTONE_RETENTION_DAYS.'
+
+    def handle(self, *args, **options):
+        retention = timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+        deleted, _ = TaskTombstone.objects.filter(deleted_at__lt=timezone.now() - retention).delete()
+        self.stdout.write(f'Deleted {deleted} tombstones.')
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.jobs import claim_jobs, prune_jobs, run_jobs
+
+
+class Command(BaseCommand):
+    """
+    Run queued background jobs until interrupted, or until the queue is empty with ``--once``.
+
+    Jobs are claimed ``--batch-size`` at a time and handed to their handlers in
+    batches. When nothing is due the worker prunes old finished jobs and sleeps for
+    ``TASK_JOB_POLL_INTERVAL`` seconds. Several workers can share the database.
+    """
+    help = 'Run queued background jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit once no job is due.')
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'TASK_JOB_BATCH_SIZE', 100))
+
+    def handle(self, *args, **options):
+        interval = getattr(settings, 'TASK_JOB_POLL_INTERVAL', 1)
+        totals = {'done': 0, 'retried': 0, 'failed': 0}
+        try:
+            while True:
+                jobs = claim_jobs(options['batch_size'])
+                if jobs:
+                    for outcome, count in run_jobs(jobs).items():
+                        totals[outcome] += count
+                    continue
+                prune_jobs()
+                if options['once']:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Jobs done: {totals["done"]}, retried: {totals["retried"]}, failed: {totals["failed"]}.')
@@ -0,0 +1,31 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from task_manager.reminders import send_reminders
+
+
+class Command(BaseCommand):
+    """
+    Send due-soon and overdue reminders of tasks through ``TASK_REMINDER_BACKEND``.
+
+    Each run only reads the tasks that crossed a threshold since the previous one,
+    so it can run every minute, e.g. from cron, or keep running with ``--interval``.
+    """
+    help = 'Send due-soon and overdue task reminders.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, help='Run again every this many seconds until interrupted.')
+        parser.add_argument('--batch-size', type=int, default=getattr(settings, 'TASK_REMINDER_BATCH_SIZE', 500))
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                sent = send_reminders(batch_size=options['batch_size'])
+                self.stdout.write('Reminders sent: ' + ', '.join(f'{count} {kind}' for kind, count in sent.items()) + '.')
+                if not options['interval']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
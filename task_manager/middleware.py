@@ -0,0 +1,129 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from rest_framework.response import Response
+
+from .hashers import PasswordHashingBusy
+from .performance import LatencyHistogram, RequestTimings, current_timings, measure
+
+logger = logging.getLogger('task_manager.performance')
+
+# Rolling latency samples of this process, exposed at /api/performance/.
+histogram = LatencyHistogram(getattr(settings, 'PERFORMANCE_HISTOGRAM_SIZE', 1000))
+
+
+class PerformanceMiddleware:
+    """
+    Middleware recording where the time of each request goes.
+
+    Measures the wall time, the number and duration of SQL queries, and the time
+    spent serializing API data and rendering templates. The results are sent in a
+    ``Server-Timing`` header, logged as JSON to the ``task_manager.performance``
+    logger and added to the per-URL-name latency histogram.
+
+    Opt-in: the middleware removes itself unless ``PERFORMANCE_INSTRUMENTATION``
+    is True.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PERFORMANCE_INSTRUMENTATION', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(timings))
+                response = self.get_response(request)
+        finally:
+            current_timings.reset(token)
+        total = time.perf_counter() - start
+
+        response['Server-Timing'] = timings.server_timing(total)
+        match = request.resolver_match
+        url_name = match.url_name if match else None
+        if url_name:
+            histogram.record(url_name, total * 1000)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'url_name': url_name,
+            'status': response.status_code,
+            **timings.as_dict(total),
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        """
+        Time the rendering of the response, which happens after the view returns.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+            response (SimpleTemplateResponse): A template or DRF response.
+
+        Returns:
+            SimpleTemplateResponse: The same response, with a timed ``render``.
+        """
+        render = response.render
+        # DRF responses render their data as JSON; others render a template.
+        phase = 'serialize' if isinstance(response, Response) else 'template'
+
+        def timed_render():
+            with measure(phase):
+                return render()
+
+        response.render = timed_render
+        return response
+
+
+class PasswordHashingBusyMiddleware:
+    """
+    Middleware answering 503 when the password hashing queue is full.
+
+    Covers the HTML login and registration pages; DRF views turn
+    ``PasswordHashingBusy`` into a JSON 503 themselves. Supports both modes, so
+    under ASGI the async views are not run through a thread for its sake.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_exception(self, request, exception):
+        """
+        Turn ``PasswordHashingBusy`` into a 503 response asking the client to retry.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+            exception (Exception): The exception raised by the view.
+
+        Returns:
+            HttpResponse | None: The 503 response, or None for other exceptions.
+        """
+        if not isinstance(exception, PasswordHashingBusy):
+            return None
+        response = HttpResponse(str(exception.detail), status=exception.status_code, content_type='text/plain')
+        response['Retry-After'] = str(exception.wait)
+        return response
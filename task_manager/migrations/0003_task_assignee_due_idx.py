@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0002_alter_task_assignee'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'due_date', 'id'], name='task_assignee_due_idx'),
+        ),
+    ]
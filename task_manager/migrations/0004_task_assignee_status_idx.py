@@ -0,0 +1,25 @@
+# Generated by Django 4.2.5 on 2026-10-18 16:35
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0003_task_assignee_due_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='assignee',
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'status', 'due_date'], name='task_assignee_status_idx'),
+        ),
+    ]
@@ -0,0 +1,65 @@
+from django.db import migrations
+
+# Full-text index over task titles and descriptions, see task_manager/search.py.
+# SQLite only: other databases fall back to icontains. A later migration that makes
+# SQLite rebuild the task table drops these triggers and has to create them again.
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE task_manager_task_fts USING fts5(
+        assignee_id, title, description,
+        content='task_manager_task', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER task_manager_task_fts_insert AFTER INSERT ON task_manager_task BEGIN
+        INSERT INTO task_manager_task_fts(rowid, assignee_id, title, description)
+        VALUES (new.id, new.assignee_id, new.title, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER task_manager_task_fts_delete AFTER DELETE ON task_manager_task BEGIN
+        INSERT INTO task_manager_task_fts(task_manager_task_fts, rowid, assignee_id, title, description)
+        VALUES ('delete', old.id, old.assignee_id, old.title, old.description);
+    END
+    """,
+    # Model.save() writes every column, so only reindex when the indexed text changed.
+    """
+    CREATE TRIGGER task_manager_task_fts_update AFTER UPDATE ON task_manager_task
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+        OR old.assignee_id IS NOT new.assignee_id
+    BEGIN
+        INSERT INTO task_manager_task_fts(task_manager_task_fts, rowid, assignee_id, title, description)
+        VALUES ('delete', old.id, old.assignee_id, old.title, old.description);
+        INSERT INTO task_manager_task_fts(rowid, assignee_id, title, description)
+        VALUES (new.id, new.assignee_id, new.title, new.description);
+    END
+    """,
+    "INSERT INTO task_manager_task_fts(task_manager_task_fts) VALUES ('rebuild')",
+]
+
+REVERSE_SQL = [
+    'DROP TRIGGER IF EXISTS task_manager_task_fts_update',
+    'DROP TRIGGER IF EXISTS task_manager_task_fts_delete',
+    'DROP TRIGGER IF EXISTS task_manager_task_fts_insert',
+    'DROP TABLE IF EXISTS task_manager_task_fts',
+]
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0005_task_tombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(run(FORWARD_SQL), run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.5 on 2026-10-18 17:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0006_task_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee', 'created_at'], name='task_assignee_created_idx'),
+        ),
+    ]
@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+# Counts of tasks per user, status, due date and completion day, see task_manager/stats.py.
+# SQLite only: triggers keep task_manager_tasksummary in step with every write to the
+# task table, however it is made. Elsewhere the stats read the tasks directly. Like
+# the full-text index of 0006, a later migration that makes SQLite rebuild the task
+# table drops these triggers and has to create them again.
+#
+# completed_at is stored in UTC; 'localtime' turns it into the day in TIME_ZONE,
+# which Django also sets as the process time zone.
+SUMMARY_TABLE = 'task_manager_tasksummary'
+
+
+def match(row):
+    return (
+        f"assignee_id = {row}.assignee_id AND status = {row}.status AND due_date = {row}.due_date"
+        f" AND completed_on IS date({row}.completed_at, 'localtime')"
+    )
+
+
+def count_in(row):
+    return f"""
+        INSERT INTO {SUMMARY_TABLE} (assignee_id, status, due_date, completed_on, count)
+        SELECT {row}.assignee_id, {row}.status, {row}.due_date, date({row}.completed_at, 'localtime'), 0
+        WHERE {row}.assignee_id IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {SUMMARY_TABLE} WHERE {match(row)});
+        UPDATE {SUMMARY_TABLE} SET count = count + 1 WHERE {match(row)};
+    """
+
+
+def count_out(row):
+    return f"""
+        UPDATE {SUMMARY_TABLE} SET count = count - 1 WHERE {match(row)};
+        DELETE FROM {SUMMARY_TABLE} WHERE {match(row)} AND count = 0;
+    """
+
+
+FORWARD_SQL = [
+    f"""
+    CREATE TRIGGER task_manager_task_summary_insert AFTER INSERT ON task_manager_task BEGIN
+        {count_in('new')}
+    END
+    """,
+    f"""
+    CREATE TRIGGER task_manager_task_summary_delete AFTER DELETE ON task_manager_task BEGIN
+        {count_out('old')}
+    END
+    """,
+    # Model.save() writes every column, so only recount when a counted column changed.
+    f"""
+    CREATE TRIGGER task_manager_task_summary_update AFTER UPDATE ON task_manager_task
+    WHEN old.assignee_id IS NOT new.assignee_id OR old.status IS NOT new.status
+        OR old.due_date IS NOT new.due_date
+        OR date(old.completed_at, 'localtime') IS NOT date(new.completed_at, 'localtime')
+    BEGIN
+        {count_out('old')}
+        {count_in('new')}
+    END
+    """,
+    f"""
+    INSERT INTO {SUMMARY_TABLE} (assignee_id, status, due_date, completed_on, count)
+    SELECT assignee_id, status, due_date, date(completed_at, 'localtime'), COUNT(*)
+    FROM task_manager_task WHERE assignee_id IS NOT NULL
+    GROUP BY assignee_id, status, due_date, date(completed_at, 'localtime')
+    """,
+]
+
+REVERSE_SQL = [
+    'DROP TRIGGER IF EXISTS task_manager_task_summary_update',
+    'DROP TRIGGER IF EXISTS task_manager_task_summary_delete',
+    'DROP TRIGGER IF EXISTS task_manager_task_summary_insert',
+    f'DELETE FROM {SUMMARY_TABLE}',
+]
+
+
+def backfill_completed_at(apps, schema_editor):
+    # The last update is the best estimate of when existing tasks were completed.
+    Task = apps.get_model('task_manager', 'Task')
+    Task.objects.filter(status='completed').update(completed_at=models.F('updated_at'))
+
+
+def run(statements):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0007_task_assignee_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='TaskSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('completed_on', models.DateField(null=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('assignee', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['assignee', 'status', 'due_date', 'completed_on'], name='task_summary_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+        migrations.RunPython(run(FORWARD_SQL), run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.5 on 2026-10-18 18:23
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0009_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderDelivery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('due_soon', 'Due soon'), ('overdue', 'Overdue')], max_length=20)),
+                ('due_date', models.DateField()),
+                ('sent_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReminderWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20, unique=True)),
+                ('due_date', models.DateField()),
+                ('task_id', models.BigIntegerField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderdelivery',
+            constraint=models.UniqueConstraint(fields=('task_id', 'kind', 'due_date'), name='reminder_delivery_unique'),
+        ),
+    ]
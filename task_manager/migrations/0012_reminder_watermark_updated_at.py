@@ -0,0 +1,24 @@
+# Generated by Django 4.2.5 on 2026-10-18 19:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0011_archived_task'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='reminderwatermark',
+            name='task_id',
+        ),
+        migrations.AddField(
+            model_name='reminderwatermark',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
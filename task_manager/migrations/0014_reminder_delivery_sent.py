@@ -0,0 +1,28 @@
+from django.db import migrations, models
+
+# Reminders recorded before this migration were sent in the transaction that
+# recorded them, so existing rows are added as sent; new rows default to unsent.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0013_task_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminderdelivery',
+            name='sent',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name='reminderdelivery',
+            name='sent',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='reminderdelivery',
+            index=models.Index(condition=models.Q(('sent', False)), fields=['sent_at'], name='reminder_delivery_unsent_idx'),
+        ),
+    ]
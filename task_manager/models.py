@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 
 class Task(models.Model):
     """
@@ -19,14 +20,245 @@ class Task(models.Model):
     description = models.TextField()
     due_date = models.DateField()
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
-    assignee = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    # Indexed through the composite indexes in Meta, which all lead with assignee.
+    assignee = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set by track_completion() when the task is completed, cleared when it is reopened.
+    completed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Serves the per-user task list ordered by due date, including keyset pages.
+            models.Index(fields=['assignee', 'due_date', 'id'], name='task_assignee_due_idx'),
+            # Serves the kanban board, which reads one status column at a time by due date.
+            models.Index(fields=['assignee', 'status', 'due_date'], name='task_assignee_status_idx'),
+            # Serves the incremental sync, which reads the tasks changed since a point in
+            # time, and the task list ordered by update time.
+            models.Index(fields=['assignee', 'updated_at'], name='task_assignee_updated_idx'),
+            # Serves the task list ordered by creation time.
+            models.Index(fields=['assignee', 'created_at'], name='task_assignee_created_idx'),
+            # Serves the reminder scheduler, which reads the open tasks of every user
+            # whose due date crossed a threshold since its previous run.
+            models.Index(fields=['status', 'due_date'], name='task_status_due_idx'),
+            # Serves the archiving of the tasks completed before a cutoff.
+            models.Index(fields=['status', 'completed_at'], name='task_status_completed_idx'),
+            # Serves the reminder scheduler, which reads the tasks of every user written
+            # since its previous run.
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        """
+        Save the task, recording when it was completed.
+
+        When ``update_fields`` includes ``status``, ``completed_at`` is added to it,
+        so that a partial save never leaves the two out of step.
+
+        Args:
+            *args: Passed on to ``Model.save()``.
+            **kwargs: Passed on to ``Model.save()``.
+
+        Returns:
+            None
+        """
+        self.track_completion()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'completed_at'}
+        super().save(*args, **kwargs)
+
+    def track_completion(self, now=None):
+        """
+        Keep ``completed_at`` in line with the status.
+
+        Called by save(); writes that bypass it, such as ``bulk_update()``, must call
+        it themselves.
+
+        Args:
+            now (datetime): The completion time to record, the current time by default.
+        """
+        if self.status != 'completed':
+            self.completed_at = None
+        elif self.completed_at is None:
+            self.completed_at = now or timezone.now()
+
+
+class TaskTombstone(models.Model):
+    """
+    Model recording that a task was deleted, or taken away from its assignee.
+
+    Lets the incremental sync tell clients which tasks to drop. Tombstones are kept
+    for ``TASK_TOMBSTONE_RETENTION_DAYS`` and removed by ``manage.py prune_tombstones``.
+    """
+
+    # Not a foreign key: the task no longer exists.
+    task_id = models.BigIntegerField()
+    assignee = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignee', 'deleted_at'], name='tombstone_assignee_idx'),
+            models.Index(fields=['deleted_at'], name='tombstone_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'Task {self.task_id}'
+
+
+class TaskSummary(models.Model):
+    """
+    Model counting a user's tasks by status, due date and completion day.
+
+    Backs the task stats, which then read a few rows per user instead of every task.
+    On SQLite, triggers created by migration 0008 update the counts on every write
+    to the task table; elsewhere the table stays empty and the stats are computed
+    from the tasks themselves.
+    """
+
+    assignee = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    due_date = models.DateField()
+    # The day completed_at falls on in the current time zone, for completed tasks.
+    completed_on = models.DateField(null=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['assignee', 'status', 'due_date', 'completed_on'], name='task_summary_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.status} {self.due_date}: {self.count}'
+
+
+class Job(models.Model):
+    """
+    Model holding a background job, run by ``manage.py run_jobs``.
+
+    Jobs are created by :func:`task_manager.jobs.enqueue` in the same transaction as
+    the write they follow, and handed to the handler registered under ``name``. While
+    a job is running, ``run_at`` is the end of the worker's lease; once it is done,
+    the time it finished.
+    """
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict)
+    # Enqueuing a key that is already known is a no-op, until the job is pruned.
+    key = models.CharField(max_length=200, null=True, blank=True, unique=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    run_at = models.DateTimeField(default=timezone.now)
+    # Identifies the claim of the worker running the job.
+    claimed_by = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Serves the workers' claims, and the pruning of finished jobs.
+            models.Index(fields=['status', 'run_at'], name='job_status_run_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} ({self.status})'
+
+
+class ArchivedTask(models.Model):
+    """
+    Model holding a completed task moved out of the task table by ``manage.py archive_tasks``.
+
+    Keeps the id and fields the task had, so archived tasks read like they did
+    before, and records when it was archived. Archived tasks are read-only.
+    """
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=100)
+    description = models.TextField()
+    due_date = models.DateField()
+    status = models.CharField(max_length=20, choices=Task.STATUS_CHOICES)
+    # Indexed through the composite index in Meta, which leads with assignee.
+    assignee = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    # Fields copied from the task when it is archived.
+    TASK_FIELDS = (
+        'id', 'title', 'description', 'due_date', 'status', 'assignee_id', 'created_at', 'updated_at', 'completed_at',
+    )
+
+    class Meta:
+        indexes = [
+            # Serves the per-user archive list ordered by due date, including keyset pages.
+            models.Index(fields=['assignee', 'due_date', 'id'], name='archived_assignee_due_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class ReminderWatermark(models.Model):
+    """
+    Model recording how far ``manage.py send_reminders`` got for a kind of reminder.
+
+    The next run only reads the tasks due after ``due_date`` that crossed the
+    threshold since, and the tasks created, rescheduled or reopened after
+    ``updated_at``.
+    """
+
+    kind = models.CharField(max_length=20, unique=True)
+    due_date = models.DateField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.kind}: {self.due_date}, {self.updated_at}'
+
 
+class ReminderDelivery(models.Model):
+    """
+    Model recording a reminder, so that it is never sent twice.
 
+    Keyed on the due date as well, so moving a task's due date allows new reminders.
+    A reminder is recorded before it is handed to the backend and marked ``sent``
+    afterwards; one left unsent, e.g. by a process that died while sending, is
+    delivered again by a later run.
+    """
+
+    KIND_CHOICES = [
+        ('due_soon', 'Due soon'),
+        ('overdue', 'Overdue'),
+    ]
 
+    # Not a foreign key, so that deleting a task does not cost a query on this table;
+    # indexed through the unique constraint, which leads with it.
+    task_id = models.BigIntegerField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    due_date = models.DateField()
+    # When the reminder was recorded, or its delivery last retried.
+    sent_at = models.DateTimeField(default=timezone.now)
+    sent = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['task_id', 'kind', 'due_date'], name='reminder_delivery_unique'),
+        ]
+        indexes = [
+            # Serves the search for unsent reminders, which are few.
+            models.Index(fields=['sent_at'], condition=models.Q(sent=False), name='reminder_delivery_unsent_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.kind} reminder of task {self.task_id}'
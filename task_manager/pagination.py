@@ -0,0 +1,190 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class TaskKeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination for task lists.
+
+    Pagination is opt-in: it only applies when the client sends a ``cursor`` or
+    ``page_size`` query parameter, so existing clients keep receiving a plain list.
+    Each page starts strictly after the last row of the previous one, which lets the
+    database seek along the ``(assignee, due_date, id)`` index instead of skipping
+    rows the way OFFSET does, so every page costs the same as the first one.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+
+    # Must end with a unique field so that every row has a distinct position.
+    ordering = ('due_date', 'id')
+
+    def is_requested(self, request):
+        """
+        Check whether the client asked for a paginated response.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            bool: True if a cursor or page size was supplied.
+        """
+        return (
+            self.cursor_query_param in request.query_params
+            or self.page_size_query_param in request.query_params
+        )
+
+    def get_page_size(self, request):
+        """
+        Resolve the page size from the query string, bounded by the configured maximum.
+
+        Args:
+            request (Request): The incoming API request.
+
+        Returns:
+            int: The number of tasks to return per page.
+        """
+        default = getattr(settings, 'TASK_PAGE_SIZE', 100)
+        maximum = getattr(settings, 'TASK_MAX_PAGE_SIZE', 1000)
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return default
+        if page_size <= 0:
+            return default
+        return min(page_size, maximum)
+
+    def get_ordering(self, view):
+        """
+        Return the ordering the keyset follows, letting the view override it.
+
+        Args:
+            view (APIView): The view being paginated.
+
+        Returns:
+            tuple: Field names, optionally prefixed with ``-`` for descending order.
+        """
+        return getattr(view, 'keyset_ordering', None) or self.ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """
+        Return the requested page of tasks, or None when pagination was not requested.
+
+        Args:
+            queryset (QuerySet): The filtered task queryset.
+            request (Request): The incoming API request.
+            view (APIView): The view being paginated.
+
+        Returns:
+            list | None: The tasks on the requested page.
+        """
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(view)
+        self.fields = [queryset.model._meta.get_field(name.lstrip('-')) for name in self.ordering]
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            queryset = queryset.filter(self.get_seek_filter(self.decode_cursor(encoded)))
+
+        # Fetch one extra row to find out whether a next page exists.
+        results = list(queryset.order_by(*self.ordering)[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_seek_filter(self, position):
+        """
+        Build the filter selecting every row that sorts after ``position``.
+
+        For an ordering ``(a, b)`` this is ``a > x OR (a = x AND b > y)``, with the
+        comparison flipped for descending fields.
+
+        Args:
+            position (list): The ordering values of the last row already seen.
+
+        Returns:
+            Q: The seek condition.
+        """
+        condition = Q()
+        equal = {}
+        for name, field, value in zip(self.ordering, self.fields, position):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{field.name}__{lookup}': value})
+            equal[field.name] = value
+        return condition
+
+    def encode_cursor(self, task):
+        """
+        Encode the position of ``task`` as an opaque, URL-safe cursor.
+
+        Args:
+            task (Task): The last task on the current page.
+
+        Returns:
+            str: The cursor pointing just after ``task``.
+        """
+        position = [field.value_to_string(task) for field in self.fields]
+        data = json.dumps(position, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(data).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, encoded):
+        """
+        Decode a cursor produced by :meth:`encode_cursor`.
+
+        Args:
+            encoded (str): The cursor from the query string.
+
+        Returns:
+            list: The ordering values of the last row already seen.
+
+        Raises:
+            NotFound: If the cursor is malformed.
+        """
+        try:
+            padded = encoded + '=' * (-len(encoded) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+            if not isinstance(position, list) or len(position) != len(self.fields):
+                raise ValueError(encoded)
+            return [field.to_python(value) for field, value in zip(self.fields, position)]
+        except (TypeError, ValueError, UnicodeError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        """
+        Build the absolute URL of the next page.
+
+        Returns:
+            str | None: The next page URL, or None on the last page.
+        """
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = replace_query_param(url, self.page_size_query_param, self.page_size)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        """
+        Wrap a serialized page together with the link to the next one.
+
+        Args:
+            data (list): The serialized tasks on the current page.
+
+        Returns:
+            Response: The paginated API response.
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
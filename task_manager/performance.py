@@ -0,0 +1,154 @@
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Timings of the request being handled, set by PerformanceMiddleware.
+current_timings = ContextVar('current_timings', default=None)
+
+
+class RequestTimings:
+    """
+    Accumulates where the time of one request goes.
+
+    An instance is installed as a database execute wrapper, so it counts and
+    times every SQL query; other phases are added with :func:`measure`. Each
+    query is counted under SQL only, so the phases and the SQL time add up to
+    no more than the total.
+    """
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.phases = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_count += 1
+            self.sql_time += time.perf_counter() - start
+
+    def add(self, name, seconds):
+        """
+        Add ``seconds`` to the phase called ``name``.
+        """
+        self.phases[name] += seconds
+
+    def as_dict(self, total):
+        """
+        Summarize the request in milliseconds.
+
+        Args:
+            total (float): The wall time of the request in seconds.
+
+        Returns:
+            dict: Total, SQL and phase timings.
+        """
+        data = {
+            'total_ms': round(total * 1000, 3),
+            'sql_count': self.sql_count,
+            'sql_ms': round(self.sql_time * 1000, 3),
+        }
+        for name, seconds in self.phases.items():
+            data[f'{name}_ms'] = round(seconds * 1000, 3)
+        return data
+
+    def server_timing(self, total):
+        """
+        Format the timings as a ``Server-Timing`` header value.
+
+        Args:
+            total (float): The wall time of the request in seconds.
+
+        Returns:
+            str: The header value.
+        """
+        metrics = [
+            f'total;dur={total * 1000:.3f}',
+            f'db;dur={self.sql_time * 1000:.3f};desc="{self.sql_count} queries"',
+        ]
+        metrics.extend(f'{name};dur={seconds * 1000:.3f}' for name, seconds in self.phases.items())
+        return ', '.join(metrics)
+
+
+@contextmanager
+def measure(name):
+    """
+    Time the enclosed block as phase ``name`` of the current request.
+
+    The time of the SQL queries run inside the block, e.g. by a queryset evaluated
+    while serializing or a cache miss, is left out of the phase. Does nothing when
+    the request is not instrumented.
+
+    Args:
+        name (str): The phase, e.g. ``'serialize'`` or ``'template'``.
+    """
+    timings = current_timings.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    sql_start = timings.sql_time
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - start - (timings.sql_time - sql_start))
+
+
+class LatencyHistogram:
+    """
+    Rolling window of recent request durations, kept per URL name.
+
+    Only the last ``size`` samples of each URL name are kept, so memory stays
+    bounded and the percentiles follow current behaviour.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.samples = defaultdict(lambda: deque(maxlen=self.size))
+        self.lock = threading.Lock()
+
+    def record(self, name, milliseconds):
+        """
+        Add one request duration for URL name ``name``.
+        """
+        with self.lock:
+            self.samples[name].append(milliseconds)
+
+    def clear(self):
+        """
+        Drop every recorded sample.
+        """
+        with self.lock:
+            self.samples.clear()
+
+    def snapshot(self):
+        """
+        Compute the percentiles of every URL name.
+
+        Returns:
+            dict: ``{url name: {'count', 'p50', 'p95', 'p99'}}`` in milliseconds.
+        """
+        with self.lock:
+            samples = {name: sorted(values) for name, values in self.samples.items()}
+        return {
+            name: {
+                'count': len(values),
+                'p50': percentile(values, 50),
+                'p95': percentile(values, 95),
+                'p99': percentile(values, 99),
+            }
+            for name, values in sorted(samples.items())
+        }
+
+
+def percentile(values, percent):
+    """
+    Return the nearest-rank percentile of already sorted ``values``.
+    """
+    index = max(math.ceil(percent / 100 * len(values)) - 1, 0)
+    return round(values[index], 3)
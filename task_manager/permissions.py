@@ -20,4 +20,5 @@ class IsTaskAssignee(permissions.BasePermission):
         Returns:
             bool: True if the user is the task assignee, False otherwise.
         """
-        return obj.assignee == request.user
\ No newline at end of file
+        # Compare ids so that checking a task never loads its assignee.
+        return obj.assignee_id == request.user.id
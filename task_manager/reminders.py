@@ -0,0 +1,262 @@
+import json
+import sys
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mass_mail
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ReminderDelivery, ReminderWatermark, Task
+
+# Tasks that still get reminders; listed rather than excluding 'completed' so that
+# the scan can range over task_status_due_idx.
+OPEN_STATUSES = ['pending', 'in_progress']
+
+Reminder = namedtuple('Reminder', ['kind', 'task'])
+
+
+class BaseReminderBackend:
+    """
+    Delivers reminders. Subclasses implement :meth:`send`.
+    """
+
+    def send(self, reminders):
+        """
+        Deliver reminders.
+
+        Called once their delivery is recorded and committed, so that slow I/O such as
+        SMTP holds no database lock. If it raises, the records are deleted and they are
+        all tried again by the next run. Reminders whose records are left unsent, e.g.
+        because the process died during this call, are delivered again after
+        ``TASK_REMINDER_RETRY_AFTER`` seconds, so a reminder may rarely arrive twice.
+
+        Args:
+            reminders (list): :class:`Reminder` tuples, with the task's assignee loaded.
+        """
+        raise NotImplementedError
+
+    def format(self, reminder):
+        task = reminder.task
+        if reminder.kind == 'overdue':
+            return f'Task "{task.title}" was due on {task.due_date}.'
+        return f'Task "{task.title}" is due on {task.due_date}.'
+
+
+class ConsoleReminderBackend(BaseReminderBackend):
+    """
+    Writes reminders to standard output, one line each.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, reminders):
+        for reminder in reminders:
+            self.stream.write(f'{reminder.task.assignee.username}: {self.format(reminder)}\n')
+
+
+class FileReminderBackend(BaseReminderBackend):
+    """
+    Appends reminders as JSON lines to ``TASK_REMINDER_FILE_PATH``.
+    """
+
+    def send(self, reminders):
+        with open(getattr(settings, 'TASK_REMINDER_FILE_PATH', 'reminders.log'), 'a') as file:
+            for reminder in reminders:
+                file.write(json.dumps({
+                    'kind': reminder.kind,
+                    'task': reminder.task.id,
+                    'user': reminder.task.assignee.username,
+                    'message': self.format(reminder),
+                }) + '\n')
+
+
+# Reminders sent by LocmemReminderBackend, for tests.
+outbox = []
+
+
+class LocmemReminderBackend(BaseReminderBackend):
+    """
+    Keeps reminders in :data:`outbox`.
+    """
+
+    def send(self, reminders):
+        outbox.extend(reminders)
+
+
+class EmailReminderBackend(BaseReminderBackend):
+    """
+    Emails reminders to the assignees that have an email address.
+    """
+
+    def send(self, reminders):
+        send_mass_mail(
+            (f'Task reminder: {reminder.task.title}', self.format(reminder), None, [reminder.task.assignee.email])
+            for reminder in reminders if reminder.task.assignee.email
+        )
+
+
+def get_reminder_backend():
+    """
+    Return an instance of the backend named by ``TASK_REMINDER_BACKEND``.
+
+    Returns:
+        BaseReminderBackend: The backend.
+    """
+    return import_string(getattr(settings, 'TASK_REMINDER_BACKEND', 'task_manager.reminders.ConsoleReminderBackend'))()
+
+
+def get_thresholds(today):
+    """
+    Return the due dates past each reminder's threshold.
+
+    Args:
+        today (date): The current date.
+
+    Returns:
+        dict: ``(first, last)`` due dates by kind of reminder; None is unbounded.
+    """
+    return {
+        'due_soon': (today, today + timedelta(days=getattr(settings, 'TASK_REMINDER_DUE_SOON_DAYS', 1))),
+        'overdue': (None, today - timedelta(days=1)),
+    }
+
+
+def send_reminders(today=None, backend=None, batch_size=None):
+    """
+    Send the reminders of the tasks that crossed a threshold since the previous run.
+
+    For each kind of reminder only two sets of tasks are read: the open tasks whose
+    due date lies between the watermark and the threshold, through
+    ``task_status_due_idx``, and the tasks written since the previous run, through
+    ``task_updated_idx``. The latter catches new tasks, tasks rescheduled into a
+    range that was already scanned and tasks reopened there. Like the sync, that
+    read overlaps the previous one by ``TASK_SYNC_OVERLAP`` seconds, for writes that
+    committed late. The first run starts from the current state: tasks that
+    were overdue before are not reminded. Reminders a previous run recorded but
+    never marked sent are delivered first, see :func:`resend_unsent`.
+
+    Args:
+        today (date): The current date, ``timezone.localdate()`` by default.
+        backend (BaseReminderBackend): Delivers the reminders, the configured backend by default.
+        batch_size (int): Tasks handled per transaction, ``TASK_REMINDER_BATCH_SIZE`` by default.
+
+    Returns:
+        dict: The number of reminders sent by kind.
+    """
+    now = timezone.now()
+    today = today or timezone.localdate()
+    backend = backend or get_reminder_backend()
+    batch_size = batch_size or getattr(settings, 'TASK_REMINDER_BATCH_SIZE', 500)
+    overlap = timedelta(seconds=getattr(settings, 'TASK_SYNC_OVERLAP', 5))
+    sent = resend_unsent(backend, now)
+    for kind, (first, last) in get_thresholds(today).items():
+        watermark = ReminderWatermark.objects.filter(kind=kind).first()
+        if watermark is None:
+            watermark = ReminderWatermark(kind=kind, due_date=(first or last) - timedelta(days=1), updated_at=now)
+            written_after = now
+        else:
+            written_after = watermark.updated_at - overlap
+        after = watermark.due_date if first is None else max(watermark.due_date, first - timedelta(days=1))
+        task_ids = set(Task.objects.filter(
+            status__in=OPEN_STATUSES, due_date__gt=after, due_date__lte=last,
+        ).values_list('id', flat=True))
+        # Few rows, filtered here so that the updated_at range is always what is scanned.
+        written = Task.objects.filter(updated_at__gt=written_after).values_list('id', 'status', 'due_date')
+        for task_id, status, due_date in written:
+            if status in OPEN_STATUSES and (first is None or due_date >= first) and due_date <= last:
+                task_ids.add(task_id)
+
+        task_ids = sorted(task_ids)
+        sent.setdefault(kind, 0)
+        for start in range(0, len(task_ids), batch_size):
+            sent[kind] += send_batch(kind, task_ids[start:start + batch_size], first, last, backend)
+        watermark.due_date = max(watermark.due_date, last)
+        watermark.updated_at = now
+        watermark.save()
+    return sent
+
+
+def send_batch(kind, task_ids, first, last, backend):
+    """
+    Record one kind of reminder for a batch of tasks, then deliver them.
+
+    The records are written in one short transaction and the reminders are sent
+    after it commits, then the records are marked sent. If sending fails, the
+    records are deleted again so that the next run retries them. Tasks that were completed or rescheduled since the scan,
+    and tasks already reminded of their current due date, are skipped.
+
+    Args:
+        kind (str): The kind of reminder.
+        task_ids (list): Ids of the tasks to remind.
+        first (date): The first due date past the threshold, or None.
+        last (date): The last due date past the threshold.
+        backend (BaseReminderBackend): Delivers the reminders.
+
+    Returns:
+        int: The number of reminders sent.
+    """
+    with transaction.atomic():
+        tasks = Task.objects.filter(
+            pk__in=task_ids, status__in=OPEN_STATUSES, due_date__lte=last, assignee__isnull=False,
+        ).select_related('assignee').order_by('id')
+        if first is not None:
+            tasks = tasks.filter(due_date__gte=first)
+        delivered = set(ReminderDelivery.objects.filter(task_id__in=task_ids, kind=kind).values_list('task_id', 'due_date'))
+        tasks = [task for task in tasks if (task.id, task.due_date) not in delivered]
+        if not tasks:
+            return 0
+        # Fails on the unique constraint if a concurrent run got there first.
+        deliveries = ReminderDelivery.objects.bulk_create(
+            ReminderDelivery(task_id=task.id, kind=kind, due_date=task.due_date) for task in tasks
+        )
+    pks = [delivery.pk for delivery in deliveries]
+    try:
+        backend.send([Reminder(kind, task) for task in tasks])
+    except Exception:
+        ReminderDelivery.objects.filter(pk__in=pks).delete()
+        raise
+    ReminderDelivery.objects.filter(pk__in=pks).update(sent=True)
+    return len(tasks)
+
+
+def resend_unsent(backend, now):
+    """
+    Deliver the reminders that were recorded but never marked sent.
+
+    Only records older than ``TASK_REMINDER_RETRY_AFTER`` seconds are retried, so
+    that reminders another run is still sending are left alone. They are claimed
+    by moving their ``sent_at`` to ``now``, which also delays the next retry if
+    this one fails. Records whose task was since deleted, completed, unassigned or
+    rescheduled are dropped instead.
+
+    Args:
+        backend (BaseReminderBackend): Delivers the reminders.
+        now (datetime): The time of this run.
+
+    Returns:
+        dict: The number of reminders sent by kind.
+    """
+    retry_before = now - timedelta(seconds=getattr(settings, 'TASK_REMINDER_RETRY_AFTER', 300))
+    if not ReminderDelivery.objects.filter(sent=False, sent_at__lt=retry_before).update(sent_at=now):
+        return {}
+    deliveries = list(ReminderDelivery.objects.filter(sent=False, sent_at=now))
+    tasks = Task.objects.filter(
+        pk__in=[delivery.task_id for delivery in deliveries], status__in=OPEN_STATUSES, assignee__isnull=False,
+    ).select_related('assignee').in_bulk()
+    stale = {delivery.pk for delivery in deliveries
+             if delivery.task_id not in tasks or tasks[delivery.task_id].due_date != delivery.due_date}
+    ReminderDelivery.objects.filter(pk__in=stale).delete()
+    deliveries = [delivery for delivery in deliveries if delivery.pk not in stale]
+    if not deliveries:
+        return {}
+
+    backend.send([Reminder(delivery.kind, tasks[delivery.task_id]) for delivery in deliveries])
+    ReminderDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries]).update(sent=True)
+    sent = {}
+    for delivery in deliveries:
+        sent[delivery.kind] = sent.get(delivery.kind, 0) + 1
+    return sent
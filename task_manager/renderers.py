@@ -0,0 +1,113 @@
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class StreamingJSONRenderer(JSONRenderer):
+    """
+    JSON renderer that can also write a list incrementally.
+
+    ``render`` behaves exactly like DRF's ``JSONRenderer``; ``render_stream`` emits
+    the same compact JSON array piece by piece so large exports never have to be
+    held in memory.
+    """
+
+    def encode(self, item):
+        """
+        Encode a single item the same way ``JSONRenderer.render`` would.
+
+        Args:
+            item (dict): The serialized item.
+
+        Returns:
+            str: The compact JSON text.
+        """
+        text = json.dumps(
+            item, cls=JSONEncoder, ensure_ascii=self.ensure_ascii,
+            allow_nan=not self.strict, separators=(',', ':'),
+        )
+        return text.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029')
+
+    def render_stream(self, items, chunk_size):
+        """
+        Render ``items`` as a JSON array, yielding one bytestring per chunk.
+
+        Args:
+            items (iterable): The serialized items.
+            chunk_size (int): How many items to encode before yielding.
+
+        Yields:
+            bytes: Consecutive pieces of the JSON document.
+        """
+        # Send the opening bracket right away so the client gets its first byte
+        # before the first chunk has been read from the database.
+        yield b'['
+        separator = ''
+        buffer = []
+        for item in items:
+            buffer.append(separator + self.encode(item))
+            separator = ','
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer).encode()
+                buffer = []
+        buffer.append(']')
+        yield ''.join(buffer).encode()
+
+
+class NDJSONRenderer(StreamingJSONRenderer):
+    """
+    Renderer for newline-delimited JSON, one object per line.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render a list as one JSON document per line, or any other value as a single line.
+        """
+        if data is None:
+            return b''
+        items = data if isinstance(data, list) else [data]
+        return ''.join(self.encode(item) + '\n' for item in items).encode()
+
+    def render_stream(self, items, chunk_size):
+        """
+        Render ``items`` as newline-delimited JSON, yielding one bytestring per chunk.
+
+        Args:
+            items (iterable): The serialized items.
+            chunk_size (int): How many items to encode before yielding.
+
+        Yields:
+            bytes: Consecutive groups of lines.
+        """
+        buffer = []
+        for item in items:
+            buffer.append(self.encode(item) + '\n')
+            if len(buffer) >= chunk_size:
+                yield ''.join(buffer).encode()
+                buffer = []
+        if buffer:
+            yield ''.join(buffer).encode()
+
+
+class EventStreamRenderer(StreamingJSONRenderer):
+    """
+    Renderer for ``text/event-stream`` responses.
+
+    The events themselves are streamed by the view; this renderer lets content
+    negotiation accept ``EventSource`` requests and renders error responses, such as
+    a failed authentication, as a single ``error`` event.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render ``data`` as one ``error`` event.
+        """
+        if data is None:
+            return b''
+        return f'event: error\ndata: {self.encode(data)}\n\n'.encode()
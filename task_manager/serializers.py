@@ -1,5 +1,8 @@
+from datetime import date
 from rest_framework import serializers
-from .models import Task
+from rest_framework import ISO_8601
+from rest_framework.settings import api_settings
+from .models import Task, ArchivedTask
 from django.contrib.auth.models import User
 from rest_framework import serializers
 
@@ -35,9 +38,120 @@ class TaskSerializer(serializers.ModelSerializer):
     """
     Serializer for tasks.
 
-    Provides serialization and deserialization of task data.
+    Provides serialization and deserialization of task data. Pass ``fields`` to
+    restrict the output to a subset of the task fields.
     """
 
     class Meta:
         model = Task
         fields = '__all__'
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ArchivedTaskSerializer(serializers.ModelSerializer):
+    """
+    Read-only serializer for archived tasks: the task fields and ``archived_at``.
+    """
+
+    class Meta:
+        model = ArchivedTask
+        fields = '__all__'
+
+
+class TaskFastSerializer:
+    """
+    Read-only, high-throughput serializer for task lists.
+
+    Builds plain dicts straight from ``values_list()`` rows, using one converter per
+    field that is picked once up front instead of running the ``ModelSerializer``
+    field machinery for every value. The output is identical to ``TaskSerializer``:
+    same keys in the same order and the same values.
+    """
+
+    def __init__(self, fields=None):
+        self.fields = TaskSerializer(fields=fields).fields
+        self.field_names = list(self.fields)
+        self.columns = [field.source for field in self.fields.values()]
+
+    def get_converter(self, field):
+        """
+        Return a function turning a database value into its ``field`` representation.
+
+        Args:
+            field (Field): The ``TaskSerializer`` field.
+
+        Returns:
+            callable | None: The converter, or None when the value is used as is.
+        """
+        if isinstance(field, serializers.ChoiceField):
+            choices = field.choice_strings_to_values
+            return lambda value: choices.get(str(value), value)
+        if isinstance(field, (serializers.CharField, serializers.IntegerField, serializers.PrimaryKeyRelatedField)):
+            # Values come back from the database as str and int already.
+            return None
+        if type(field) is serializers.DateField and self.is_iso_8601(field, api_settings.DATE_FORMAT):
+            return date.isoformat
+        if type(field) is serializers.DateTimeField and self.is_iso_8601(field, api_settings.DATETIME_FORMAT):
+            field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+            if field_timezone is not None:
+                def convert(value):
+                    value = value.astimezone(field_timezone).isoformat()
+                    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+                return convert
+        return field.to_representation
+
+    def is_iso_8601(self, field, default_format):
+        output_format = getattr(field, 'format', default_format)
+        return isinstance(output_format, str) and output_format.lower() == ISO_8601
+
+    def serialize_rows(self, rows):
+        """
+        Turn ``values_list()`` rows into task dicts.
+
+        Args:
+            rows (iterable): Tuples holding the values of :attr:`columns`, in order.
+
+        Yields:
+            dict: The serialized task.
+        """
+        names = self.field_names
+        # Converters are resolved per call so that the active timezone is honoured.
+        converters = list(enumerate(self.get_converter(field) for field in self.fields.values()))
+        converters = [(index, convert) for index, convert in converters if convert is not None]
+        for row in rows:
+            values = list(row)
+            for index, convert in converters:
+                if values[index] is not None:
+                    values[index] = convert(values[index])
+            yield dict(zip(names, values))
+
+    def serialize(self, queryset):
+        """
+        Serialize every task in ``queryset``.
+
+        Args:
+            queryset (QuerySet): The tasks to serialize.
+
+        Returns:
+            list: The serialized tasks.
+        """
+        return list(self.serialize_rows(queryset.values_list(*self.columns)))
+
+    def iter_serialize(self, queryset, chunk_size):
+        """
+        Serialize the tasks in ``queryset`` lazily, reading them in chunks.
+
+        Args:
+            queryset (QuerySet): The tasks to serialize.
+            chunk_size (int): Rows fetched from the database per round trip.
+
+        Returns:
+            iterator: The serialized tasks.
+        """
+        return self.serialize_rows(queryset.values_list(*self.columns).iterator(chunk_size=chunk_size))
@@ -0,0 +1,14 @@
+from django.dispatch import Signal
+
+# Sent by every code path that writes tasks, including the bulk API which bypasses
+# Model.save() and Model.delete() and therefore never fires post_save/post_delete.
+#
+# tasks_saved provides:
+#   tasks: the created or updated Task instances.
+#   created: True when the tasks were just created.
+#   previous_assignees: {task id: assignee id} for updated tasks, as read before the write.
+tasks_saved = Signal()
+
+# tasks_deleted provides:
+#   task_assignees: {task id: assignee id} of the deleted tasks.
+tasks_deleted = Signal()
@@ -0,0 +1,113 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from .models import Task, TaskSummary
+
+
+def is_summary_available():
+    """
+    Tell whether the task summary table is kept up to date on the current database.
+
+    Returns:
+        bool: True on SQLite, where migration 0008 created the triggers maintaining it.
+    """
+    return connection.vendor == 'sqlite'
+
+
+def get_week_starts(today, weeks):
+    """
+    Return the Mondays of the last ``weeks`` weeks, oldest first, ending with this one.
+
+    Args:
+        today (date): The current date.
+        weeks (int): The number of weeks.
+
+    Returns:
+        list: The first day of each week.
+    """
+    monday = today - timedelta(days=today.weekday())
+    return [monday - timedelta(weeks=weeks - 1 - index) for index in range(weeks)]
+
+
+def get_aggregates(count, completed_on, today, due_days, week_starts):
+    """
+    Build the aggregates of the stats, so that they are computed by a single query.
+
+    Each figure is a count restricted by its own filter, which lets the database
+    compute all of them in one pass over the rows, whether those are tasks or
+    summary rows.
+
+    Args:
+        count (callable): Turns a ``Q`` filter into the aggregate counting the
+            matching rows.
+        completed_on (str): The lookup giving the completion day of a row.
+        today (date): The current date.
+        due_days (list): The numbers of days of the due date buckets.
+        week_starts (list): The Mondays of the completion weeks.
+
+    Returns:
+        dict: Aggregates keyed by name.
+    """
+    open_tasks = ~Q(status='completed')
+    aggregates = {f'status_{value}': count(Q(status=value)) for value, _ in Task.STATUS_CHOICES}
+    aggregates['overdue'] = count(open_tasks & Q(due_date__lt=today))
+    for days in due_days:
+        aggregates[f'due_{days}'] = count(open_tasks & Q(due_date__gte=today, due_date__lt=today + timedelta(days=days)))
+    for index, start in enumerate(week_starts):
+        aggregates[f'week_{index}'] = count(Q(**{
+            f'{completed_on}__gte': start,
+            f'{completed_on}__lt': start + timedelta(weeks=1),
+        }))
+    return aggregates
+
+
+def get_task_stats(user, today=None, use_summary=None):
+    """
+    Compute the dashboard figures of a user's tasks.
+
+    Reads the per-user :class:`TaskSummary` rows when they are maintained, so the cost
+    follows the number of distinct due and completion days rather than the number of
+    tasks, and otherwise counts the tasks themselves. Either way it takes one query.
+
+    Args:
+        user (User): The task assignee.
+        today (date): The current date, ``timezone.localdate()`` by default.
+        use_summary (bool): Whether to read the summary table, by default when it
+            is available.
+
+    Returns:
+        dict: The task count per ``status``, the ``total``, the number of open tasks
+        ``overdue`` and ``due_within`` each number of days in ``TASK_STATS_DUE_DAYS``
+        (from today on), and ``completed_per_week`` over the last ``TASK_STATS_WEEKS``
+        weeks, oldest first.
+    """
+    today = today or timezone.localdate()
+    due_days = getattr(settings, 'TASK_STATS_DUE_DAYS', [1, 7, 30])
+    week_starts = get_week_starts(today, getattr(settings, 'TASK_STATS_WEEKS', 8))
+    if use_summary is None:
+        use_summary = is_summary_available()
+
+    if use_summary:
+        queryset = TaskSummary.objects.filter(assignee_id=user.id)
+        aggregates = get_aggregates(lambda q: Sum('count', filter=q), 'completed_on', today, due_days, week_starts)
+    else:
+        queryset = Task.objects.filter(assignee_id=user.id)
+        aggregates = get_aggregates(lambda q: Count('pk', filter=q), 'completed_at__date', today, due_days, week_starts)
+    # Sum() gives None rather than 0 when no row matches.
+    values = {name: value or 0 for name, value in queryset.aggregate(**aggregates).items()}
+
+    by_status = {value: values[f'status_{value}'] for value, _ in Task.STATUS_CHOICES}
+    return {
+        'status': by_status,
+        'total': sum(by_status.values()),
+        'overdue': values['overdue'],
+        'due_within': {str(days): values[f'due_{days}'] for days in due_days},
+        'completed_per_week': [
+            {'week': start.isoformat(), 'count': values[f'week_{index}']}
+            for index, start in enumerate(week_starts)
+        ],
+    }
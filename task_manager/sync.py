@@ -0,0 +1,132 @@
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.dispatch import receiver
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import Task, TaskTombstone
+from .serializers import TaskFastSerializer
+from .signals import tasks_saved, tasks_deleted
+
+
+# Keeps sync tokens from being accepted anywhere else SECRET_KEY signs data.
+SYNC_TOKEN_SALT = 'task_manager.sync'
+
+
+def encode_sync_token(moment):
+    """
+    Encode a point in time as an opaque, URL-safe sync token.
+
+    The token is signed, so a client cannot make one up.
+
+    Args:
+        moment (datetime): The time the next sync starts from.
+
+    Returns:
+        str: The sync token.
+    """
+    encoded = base64.urlsafe_b64encode(moment.isoformat().encode('ascii')).decode('ascii').rstrip('=')
+    return signing.Signer(salt=SYNC_TOKEN_SALT).sign(encoded)
+
+
+def decode_sync_token(token):
+    """
+    Decode a token produced by :func:`encode_sync_token`.
+
+    Args:
+        token (str): The token from the query string.
+
+    Returns:
+        datetime: The time the sync starts from.
+
+    Raises:
+        ValidationError: If the token is malformed or its signature is wrong.
+    """
+    try:
+        encoded = signing.Signer(salt=SYNC_TOKEN_SALT).unsign(token)
+        padded = encoded + '=' * (-len(encoded) % 4)
+        moment = parse_datetime(base64.urlsafe_b64decode(padded.encode('ascii')).decode('ascii'))
+    except (signing.BadSignature, TypeError, ValueError, UnicodeError):
+        moment = None
+    if moment is None or timezone.is_naive(moment):
+        raise ValidationError({'since': ['Invalid sync token.']})
+    return moment
+
+
+def get_changes(user, token=None):
+    """
+    Collect what changed in a user's tasks since ``token``.
+
+    Without a token, with one older than the tombstones are kept for, or with one
+    ahead of the server clock, e.g. after the clock was set back, every task is
+    returned and ``full`` is True: the client must replace its copy instead of
+    merging into it. A token from the future would otherwise match no change until
+    the clock caught up with it.
+
+    A task's ``updated_at`` is set before its transaction commits, so a write can
+    become visible after a sync that started later than its timestamp. The next
+    token therefore lags ``TASK_SYNC_OVERLAP`` seconds behind, and tasks changed in
+    that window are sent again on the following sync.
+
+    Args:
+        user (User): The user syncing.
+        token (str): The token returned by the previous sync.
+
+    Returns:
+        dict: ``changed`` tasks, ``deleted`` task ids, the next ``token`` and ``full``.
+    """
+    now = timezone.now()
+    since = decode_sync_token(token) if token else None
+    retention = timedelta(days=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30))
+    full = since is None or since < now - retention or since > now
+
+    tasks = Task.objects.filter(assignee_id=user.id).order_by('updated_at', 'id')
+    deleted = []
+    if not full:
+        tasks = tasks.filter(updated_at__gt=since)
+        tombstones = TaskTombstone.objects.filter(assignee_id=user.id, deleted_at__gt=since)
+        deleted = sorted(set(tombstones.values_list('task_id', flat=True)))
+    changed = TaskFastSerializer().serialize(tasks)
+    if deleted:
+        # A task taken away and given back again is current, not deleted.
+        current = {task['id'] for task in changed}
+        deleted = [pk for pk in deleted if pk not in current]
+
+    next_since = now - timedelta(seconds=getattr(settings, 'TASK_SYNC_OVERLAP', 5))
+    if since is not None and not full:
+        next_since = max(next_since, since)
+    return {
+        'changed': changed,
+        'deleted': deleted,
+        'token': encode_sync_token(next_since),
+        'full': full,
+    }
+
+
+@receiver(tasks_saved)
+def record_reassigned_tasks(sender, tasks, previous_assignees=None, **kwargs):
+    """
+    Record a tombstone for the previous assignee of each task given to someone else.
+    """
+    previous_assignees = previous_assignees or {}
+    TaskTombstone.objects.bulk_create(
+        TaskTombstone(task_id=task.pk, assignee_id=previous_assignees[task.pk])
+        for task in tasks
+        if previous_assignees.get(task.pk) not in (None, task.assignee_id)
+    )
+
+
+@receiver(tasks_deleted)
+def record_deleted_tasks(sender, task_assignees, **kwargs):
+    """
+    Record a tombstone for each deleted task.
+    """
+    TaskTombstone.objects.bulk_create(
+        TaskTombstone(task_id=pk, assignee_id=user_id)
+        for pk, user_id in task_assignees.items()
+        if user_id is not None
+    )
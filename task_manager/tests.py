@@ -1,11 +1,46 @@
-from django.test import TestCase, Client
+import asyncio
+import base64
+import json
+from io import StringIO
+import os
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+from django.db import connection, OperationalError
+from django.db.models import Count
+from django.core.cache import cache
+from django.test import TestCase, Client, AsyncClient, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
-from .models import Task
+from config.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from .models import Task, TaskTombstone, Job, ReminderDelivery, ReminderWatermark, ArchivedTask
+from .serializers import TaskSerializer, TaskFastSerializer
+from .middleware import histogram, PasswordHashingBusyMiddleware
+from .performance import RequestTimings, current_timings, measure
+from .events import astream_events, stream_events, buffer as event_buffer, notifier as event_notifier
+from .sync import decode_sync_token, encode_sync_token
+from .filters import TaskListFilter
+from .stats import get_task_stats
+from .board import get_column_limit
+from .cache import get_task_list_version
+from .authentication import TokenCache, token_cache
+from .jobs import registry as job_registry, register as register_job, enqueue, claim_jobs, run_jobs, prune_jobs
+from .reminders import send_reminders, outbox as reminder_outbox, FileReminderBackend
+from .hashers import PasswordHashingBusy, PasswordHashingLimiter, limiter as hashing_limiter
+from django.contrib.auth.hashers import make_password
 from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from django.utils import timezone
 from django.urls import reverse
+from django.http import HttpResponse, QueryDict
+from django.utils.http import parse_http_date
+from rest_framework.exceptions import ValidationError
+from django.core.management import call_command
+from datetime import timedelta
+from asgiref.sync import async_to_sync, iscoroutinefunction, sync_to_async
 
 
 class UserRegistrationTest(TestCase):
@@ -180,6 +215,9 @@ class UserLogoutViewTest(TestCase):
 
 class TaskViewsTestCase(TestCase):
     def setUp(self):
+        # Task lists are cached per user id, and ids are reused between tests
+        cache.clear()
+
         # Create a test user
         self.user = User.objects.create_user(username='testuser', password='TestPassword123')
 
@@ -259,3 +297,1772 @@ class TaskViewsTestCase(TestCase):
         # Check if the task1 is deleted
         with self.assertRaises(Task.DoesNotExist):
             self.task1.refresh_from_db()
+
+
+class TaskPaginationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        # Several tasks share a due date so the id tie-breaker is exercised
+        for i in range(7):
+            Task.objects.create(title=f'Task {i}', description='Description', due_date=f'2023-10-0{1 + i // 3}', assignee=self.user)
+        Task.objects.create(title='Other Task', description='Description', due_date='2023-10-01', assignee=self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_is_unpaginated_by_default(self):
+        response = self.client.get('/api/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 7)
+
+    def test_pages_cover_every_task_once(self):
+        # Follow the next links until the last page
+        titles = []
+        url = '/api/tasks/?page_size=3'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), 3)
+            titles.extend(task['title'] for task in response.data['results'])
+            url = response.data['next']
+
+        expected = list(Task.objects.filter(assignee=self.user).order_by('due_date', 'id').values_list('title', flat=True))
+        self.assertEqual(titles, expected)
+
+    def test_page_size_is_capped(self):
+        with self.settings(TASK_MAX_PAGE_SIZE=2):
+            response = self.client.get('/api/tasks/?page_size=50')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/tasks/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class TaskExportTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        for i in range(5):
+            Task.objects.create(title=f'Task {i}', description='Description   ü', due_date='2023-10-01', assignee=self.user)
+        Task.objects.create(title='Other Task', description='Description', due_date='2023-10-01', assignee=self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_json_export_matches_list(self):
+        with self.settings(TASK_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/api/tasks/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        # The streamed array is byte-for-byte what the list endpoint renders
+        listed = self.client.get('/api/tasks/')
+        self.assertEqual(b''.join(response.streaming_content), listed.content)
+
+    def test_ndjson_export(self):
+        with self.settings(TASK_EXPORT_CHUNK_SIZE=2):
+            response = self.client.get('/api/tasks/export/?format=ndjson')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        titles = [json.loads(line)['title'] for line in lines]
+        self.assertEqual(titles, [f'Task {i}' for i in range(5)])
+
+    def test_export_requires_authentication(self):
+        response = APIClient().get('/api/tasks/export/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are asserted for SQLite only')
+class TaskQueryPlanTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(f'INDEX {index_name} (assignee_id=?', plan)
+        # The index must also deliver the requested order, without a separate sort step
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_task_list_plan(self):
+        queryset = Task.objects.filter(assignee=self.user).order_by('due_date', 'id')
+        self.assertUsesIndex(queryset, 'task_assignee_due_idx')
+
+    def test_keyset_page_plan(self):
+        queryset = Task.objects.filter(assignee=self.user).filter(due_date__gt='2023-10-01').order_by('due_date', 'id')
+        self.assertUsesIndex(queryset, 'task_assignee_due_idx')
+
+    def test_status_column_plan(self):
+        queryset = Task.objects.filter(assignee=self.user, status='pending').order_by('due_date')
+        self.assertUsesIndex(queryset, 'task_assignee_status_idx')
+
+    def test_status_grouping_plan(self):
+        queryset = Task.objects.filter(assignee=self.user).values('status').annotate(count=Count('id')).order_by()
+        self.assertUsesIndex(queryset, 'task_assignee_status_idx')
+
+    def test_list_filter_plans(self):
+        # Every combination the list accepts is read in index order
+        expected_index = {'due_date': None, 'created_at': 'task_assignee_created_idx', 'updated_at': 'task_assignee_updated_idx'}
+        for ordering, index_name in expected_index.items():
+            for descending in ('', '-'):
+                for status_value in ('', 'pending'):
+                    for due in ('', 'overdue', 'week'):
+                        params = QueryDict(mutable=True)
+                        params.update({'ordering': descending + ordering, 'status': status_value, 'due': due})
+                        try:
+                            list_filter = TaskListFilter(params)
+                        except ValidationError:
+                            self.assertTrue(status_value or due)
+                            continue
+                        with self.subTest(params=params.urlencode()):
+                            queryset = list_filter.filter_queryset(Task.objects.filter(assignee=self.user))
+                            due_index = 'task_assignee_status_idx' if status_value else 'task_assignee_due_idx'
+                            self.assertUsesIndex(queryset, index_name or due_index)
+
+
+class TaskBulkTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.task = Task.objects.create(title='Test Task', description='Description', due_date='2023-09-30', status='pending', assignee=self.user)
+        self.other_task = Task.objects.create(title='Other Task', description='Description', due_date='2023-09-30', status='pending', assignee=self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_bulk_create(self):
+        data = [
+            {'title': 'Task A', 'description': 'Description', 'due_date': '2023-10-01', 'status': 'pending'},
+            {'title': 'Task B', 'description': 'Description', 'due_date': '2023-10-02', 'assignee': self.other_user.id},
+        ]
+        response = self.client.post('/api/tasks/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([result['status'] for result in response.data['results']], [201, 201])
+
+        # Every created task belongs to the requesting user, whatever the payload says
+        created = Task.objects.filter(title__in=['Task A', 'Task B'])
+        self.assertEqual(created.count(), 2)
+        self.assertFalse(created.exclude(assignee=self.user).exists())
+        self.assertEqual(response.data['results'][0]['data']['id'], created.get(title='Task A').id)
+
+    def test_bulk_create_reports_invalid_items(self):
+        data = [
+            {'title': 'Task A', 'description': 'Description', 'due_date': '2023-10-01'},
+            {'title': 'Task B'},
+        ]
+        response = self.client.post('/api/tasks/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['status'], 201)
+        self.assertEqual(results[1]['status'], 400)
+        self.assertIn('due_date', results[1]['errors'])
+        self.assertTrue(Task.objects.filter(title='Task A').exists())
+
+    def test_bulk_create_requires_list(self):
+        response = self.client.post('/api/tasks/bulk/', {'title': 'Task A'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with self.settings(TASK_BULK_MAX_ITEMS=1):
+            response = self.client.post('/api/tasks/bulk/', [{}, {}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update(self):
+        before = self.task.updated_at
+        data = [
+            {'id': self.task.id, 'status': 'completed'},
+            {'id': self.other_task.id, 'status': 'completed'},
+            {'id': 0, 'status': 'completed'},
+        ]
+        response = self.client.patch('/api/tasks/bulk/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        # Other users' tasks are out of scope, exactly like a single PATCH
+        self.assertEqual([result['status'] for result in response.data['results']], [200, 404, 404])
+
+        self.task.refresh_from_db()
+        self.other_task.refresh_from_db()
+        self.assertEqual(self.task.status, 'completed')
+        self.assertGreater(self.task.updated_at, before)
+        self.assertEqual(self.other_task.status, 'pending')
+
+    def test_bulk_destroy(self):
+        response = self.client.delete('/api/tasks/bulk/', [self.task.id, self.other_task.id], format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([result['status'] for result in response.data['results']], [204, 404])
+        self.assertFalse(Task.objects.filter(pk=self.task.id).exists())
+        self.assertTrue(Task.objects.filter(pk=self.other_task.id).exists())
+
+    def test_bulk_rejects_boolean_ids(self):
+        # JSON true decodes to a bool, an int in Python, and must not be read as id 1
+        response = self.client.patch('/api/tasks/bulk/', [{'id': True, 'status': 'completed'}], format='json')
+        self.assertEqual(response.data['results'][0]['status'], 400)
+        response = self.client.delete('/api/tasks/bulk/', [True], format='json')
+        self.assertEqual(response.data['results'][0]['status'], 400)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, 'pending')
+
+
+class TaskListCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='TestPassword123')
+        self.task = Task.objects.create(title='Task 1', description='Description', due_date='2023-09-30', assignee=self.user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+        self.client.login(username='testuser', password='TestPassword123')
+
+    def test_api_list_is_cached(self):
+        self.api_client.get('/api/tasks/')
+        with self.assertNumQueries(0):
+            response = self.api_client.get('/api/tasks/')
+        self.assertEqual([task['title'] for task in response.data], ['Task 1'])
+
+    def test_api_writes_invalidate(self):
+        self.api_client.get('/api/tasks/')
+
+        # The lists are invalidated when the write commits
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.post('/api/tasks/', {'title': 'Task 2', 'description': 'Description', 'due_date': '2023-10-01'}, format='json')
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual([task['title'] for task in response.data], ['Task 1', 'Task 2'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.patch(f'/api/tasks/{self.task.id}/', {'title': 'Renamed'}, format='json')
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual(response.data[0]['title'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.delete(f'/api/tasks/{self.task.id}/')
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual([task['title'] for task in response.data], ['Task 2'])
+
+    def test_bulk_writes_invalidate(self):
+        self.api_client.get('/api/tasks/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.patch('/api/tasks/bulk/', [{'id': self.task.id, 'title': 'Renamed'}], format='json')
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual(response.data[0]['title'], 'Renamed')
+
+    def test_reassignment_invalidates_previous_assignee(self):
+        other_user = User.objects.create_user(username='otheruser', password='TestPassword123')
+        self.api_client.get('/api/tasks/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.patch(f'/api/tasks/{self.task.id}/', {'assignee': other_user.id}, format='json')
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual(response.data, [])
+
+    def test_html_writes_invalidate(self):
+        url = reverse('task_list')
+        self.client.get(url)
+
+        data = {'title': 'Task 2', 'description': 'Description', 'due_date': '2023-10-01', 'status': 'pending'}
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_create'), data)
+        self.assertEqual(len(self.client.get(url).context['tasks']), 2)
+
+        data['title'] = 'Renamed'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('task_edit', args=[self.task.id]), data)
+        self.assertIn('Renamed', [task.title for task in self.client.get(url).context['tasks']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('task_delete', args=[self.task.id]))
+        self.assertEqual(len(self.client.get(url).context['tasks']), 1)
+
+    def test_invalidation_waits_for_commit(self):
+        version = get_task_list_version(self.user.id)
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.api_client.delete(f'/api/tasks/{self.task.id}/')
+        # A reader before the commit would still see the task, so it must not get a new version
+        self.assertEqual(get_task_list_version(self.user.id), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_task_list_version(self.user.id), version)
+
+    def test_evicted_version_does_not_resurrect_entries(self):
+        self.api_client.get('/api/tasks/')
+        # Losing the version counter must not make older entries reachable again
+        cache.delete(f'task_manager:tasks:version:{self.user.id}')
+        Task.objects.create(title='Task 2', description='Description', due_date='2023-10-01', assignee=self.user)
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual(len(response.data), 2)
+
+
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='TestPassword123')
+        self.task = Task.objects.create(title='Task 1', description='Description', due_date='2023-09-30', assignee=self.user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+        self.client.login(username='testuser', password='TestPassword123')
+
+    def test_api_list_not_modified(self):
+        response = self.api_client.get('/api/tasks/')
+        etag = response['ETag']
+
+        # An unchanged poll is answered without building the list
+        with self.assertNumQueries(0):
+            response = self.api_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+
+        # Any write changes the ETag, deletions included
+        Task.objects.create(title='Task 2', description='Description', due_date='2023-10-01', assignee=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.delete(f'/api/tasks/{self.task.id}/')
+        response = self.api_client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_api_list_last_modified_after_delete(self):
+        Task.objects.create(title='Task 2', description='Description', due_date='2023-10-01', assignee=self.user)
+        newest = Task.objects.create(title='Task 3', description='Description', due_date='2023-10-02', assignee=self.user)
+        # HTTP dates have a resolution of a second
+        Task.objects.exclude(pk=newest.pk).update(updated_at=timezone.now() - timedelta(hours=2))
+        Task.objects.filter(pk=newest.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        last_modified = self.api_client.get('/api/tasks/')['Last-Modified']
+
+        # Deleting the newest task must not move Last-Modified back to an older task
+        with self.captureOnCommitCallbacks(execute=True):
+            self.api_client.delete(f'/api/tasks/{newest.id}/')
+        response = self.api_client.get('/api/tasks/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertGreaterEqual(parse_http_date(response['Last-Modified']), parse_http_date(last_modified))
+
+    def test_api_list_etag_depends_on_query(self):
+        full = self.api_client.get('/api/tasks/')
+        paged = self.api_client.get('/api/tasks/?page_size=1')
+        self.assertNotEqual(full['ETag'], paged['ETag'])
+
+    def test_api_detail_if_modified_since(self):
+        url = f'/api/tasks/{self.task.id}/'
+        response = self.api_client.get(url)
+        last_modified = response['Last-Modified']
+        response = self.api_client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.api_client.patch(url, {'title': 'Renamed'}, format='json')
+        response = self.api_client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_html_views_not_modified(self):
+        for url in [reverse('task_list'), reverse('task_detail', args=[self.task.id])]:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304)
+            # Nothing was rendered for the 304
+            self.assertIsNone(response.context)
+
+
+class TaskBoardTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='TestPassword123')
+        for i in range(3):
+            Task.objects.create(title=f'Pending {i}', description='Description', due_date=f'2023-10-0{i + 1}', status='pending', assignee=self.user)
+        Task.objects.create(title='Doing', description='Description', due_date='2023-10-01', status='in_progress', assignee=self.user)
+        self.client.login(username='testuser', password='TestPassword123')
+
+    def test_tasks_are_grouped_by_status(self):
+        response = self.client.get(reverse('task_list'))
+        columns = {column['status']: [task.title for task in column['tasks']] for column in response.context['columns']}
+        self.assertEqual(columns, {
+            'pending': ['Pending 0', 'Pending 1', 'Pending 2'],
+            'in_progress': ['Doing'],
+            'completed': [],
+        })
+        self.assertContains(response, 'id="task-', count=4)
+        self.assertNotContains(response, 'Load more')
+
+    def test_column_limit_and_load_more(self):
+        with self.settings(TASK_BOARD_COLUMN_LIMIT=2):
+            response = self.client.get(reverse('task_list'))
+            pending = response.context['columns'][0]
+            self.assertEqual([task.title for task in pending['tasks']], ['Pending 0', 'Pending 1'])
+            self.assertEqual(pending['more_url'], '?pending=4')
+            self.assertContains(response, 'Load more', count=1)
+
+            response = self.client.get(reverse('task_list') + pending['more_url'])
+            self.assertEqual(len(response.context['columns'][0]['tasks']), 3)
+
+    def test_column_limit_is_rounded_and_capped(self):
+        with self.settings(TASK_BOARD_COLUMN_LIMIT=2, TASK_BOARD_COLUMN_MAX=4):
+            self.assertEqual(get_column_limit(QueryDict('pending=3'), 'pending'), 4)
+            self.assertEqual(get_column_limit(QueryDict('pending=-5'), 'pending'), 2)
+            self.assertEqual(get_column_limit(QueryDict('pending=x'), 'pending'), 2)
+            self.assertEqual(get_column_limit(QueryDict('pending=100000000'), 'pending'), 4)
+
+            Task.objects.create(title='Pending 3', description='Description', due_date='2023-10-09', status='pending', assignee=self.user)
+            Task.objects.create(title='Pending 4', description='Description', due_date='2023-10-10', status='pending', assignee=self.user)
+            response = self.client.get(reverse('task_list') + '?pending=100000000')
+            pending = response.context['columns'][0]
+            self.assertEqual(len(pending['tasks']), 4)
+            # At the cap, no link asks for more
+            self.assertIsNone(pending['more_url'])
+
+    def test_board_loads_card_fields_only(self):
+        response = self.client.get(reverse('task_list'))
+        task = response.context['columns'][0]['tasks'][0]
+        self.assertEqual(task.get_deferred_fields(), {'description', 'assignee_id', 'created_at', 'completed_at'})
+
+    def test_only_changed_cards_are_rendered(self):
+        with mock.patch.object(cache, 'set_many', wraps=cache.set_many) as set_many:
+            first = self.client.get(reverse('task_list'))
+            self.assertEqual(sum(len(call.args[0]) for call in set_many.call_args_list), 4)
+            set_many.reset_mock()
+
+            task = Task.objects.get(title='Pending 1')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('task_edit', args=[task.id]), {
+                    'title': 'Renamed', 'description': task.description, 'due_date': task.due_date, 'status': task.status,
+                })
+            second = self.client.get(reverse('task_list'))
+            self.assertEqual(set_many.call_count, 1)
+            self.assertEqual(len(set_many.call_args.args[0]), 1)
+        self.assertContains(second, 'Renamed')
+        self.assertNotContains(second, 'Pending 1')
+        self.assertEqual(first.content.replace(b'Pending 1', b'Renamed'), second.content)
+
+    def test_cards_are_escaped(self):
+        Task.objects.create(title='<b>Bold</b>', description='Description', due_date='2023-10-09', status='pending', assignee=self.user)
+        response = self.client.get(reverse('task_list') + '?pending=10')
+        self.assertContains(response, '&lt;b&gt;Bold&lt;/b&gt;')
+        self.assertContains(self.client.get(reverse('task_list') + '?pending=10'), '&lt;b&gt;Bold&lt;/b&gt;')
+
+
+class TaskSparseFieldsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.task = Task.objects.create(title='Task 1', description='Long description', due_date='2023-09-30', assignee=self.user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_list_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/tasks/?fields=id,title,status')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.task.id, 'title': 'Task 1', 'status': 'pending'}])
+        # The description column is not even selected
+        self.assertFalse(any('description' in query['sql'] for query in queries.captured_queries))
+
+    def test_paginated_and_detail_fields(self):
+        response = self.client.get('/api/tasks/?fields=title&page_size=1')
+        self.assertEqual(response.data['results'], [{'title': 'Task 1'}])
+
+        response = self.client.get(f'/api/tasks/{self.task.id}/?fields=title,due_date')
+        self.assertEqual(response.data, {'title': 'Task 1', 'due_date': '2023-09-30'})
+
+    def test_export_fields(self):
+        response = self.client.get('/api/tasks/export/?format=ndjson&fields=id,title')
+        self.assertEqual(json.loads(b''.join(response.streaming_content)), {'id': self.task.id, 'title': 'Task 1'})
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/tasks/?fields=title,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_fields_ignored_on_writes(self):
+        response = self.client.patch(f'/api/tasks/{self.task.id}/?fields=title', {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'completed')
+
+
+class TaskFastSerializerTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        Task.objects.create(title='Task 1', description='Description with "quotes" and ü', due_date='2023-09-30', assignee=self.user)
+        Task.objects.create(title='', description='', due_date='2024-02-29', status='completed', assignee=None)
+        Task.objects.create(title='Task 3', description='Description', due_date='2023-10-01', status='in_progress', assignee=self.user)
+
+    def test_output_is_identical_to_task_serializer(self):
+        queryset = Task.objects.order_by('id')
+        renderer = JSONRenderer()
+        expected = renderer.render(TaskSerializer(queryset, many=True).data)
+        self.assertEqual(renderer.render(TaskFastSerializer().serialize(queryset)), expected)
+        self.assertEqual(renderer.render(list(TaskFastSerializer().iter_serialize(queryset, chunk_size=2))), expected)
+
+    def test_fields_subset(self):
+        queryset = Task.objects.order_by('id')
+        fields = ['due_date', 'title', 'updated_at']
+        self.assertEqual(
+            TaskFastSerializer(fields).serialize(queryset),
+            TaskSerializer(queryset, many=True, fields=fields).data,
+        )
+
+    def test_active_timezone_is_honoured(self):
+        queryset = Task.objects.order_by('id')
+        with timezone.override('Asia/Kolkata'):
+            self.assertEqual(TaskFastSerializer().serialize(queryset), TaskSerializer(queryset, many=True).data)
+
+
+class TaskQueryCountTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='TestPassword123')
+        self.other_user = User.objects.create_user(username='otheruser', password='TestPassword123')
+        self.task = Task.objects.create(title='Task 1', description='Description', due_date='2023-09-30', assignee=self.user)
+        self.other_task = Task.objects.create(title='Other Task', description='Description', due_date='2023-09-30', assignee=self.other_user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+        self.client.login(username='testuser', password='TestPassword123')
+        self.data = {'title': 'Updated Task', 'description': 'Description', 'due_date': '2023-10-15', 'status': 'in_progress'}
+
+    def test_api_list(self):
+        # Validators (count and max(updated_at), latest tombstone) and the list itself
+        with self.assertNumQueries(3):
+            self.api_client.get('/api/tasks/')
+        with self.assertNumQueries(1):
+            self.api_client.get('/api/tasks/?page_size=10')
+        with self.assertNumQueries(1):
+            b''.join(self.api_client.get('/api/tasks/export/').streaming_content)
+
+    def test_api_retrieve(self):
+        with self.assertNumQueries(1):
+            response = self.api_client.get(f'/api/tasks/{self.task.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_api_update(self):
+        # The scoped lookup, then the UPDATE
+        with self.assertNumQueries(2):
+            response = self.api_client.put(f'/api/tasks/{self.task.id}/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(2):
+            response = self.api_client.patch(f'/api/tasks/{self.task.id}/', {'status': 'completed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_api_destroy(self):
+        # The DELETE and the tombstone
+        with self.assertNumQueries(2):
+            response = self.api_client.delete(f'/api/tasks/{self.task.id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_api_create(self):
+        with self.assertNumQueries(1):
+            response = self.api_client.post('/api/tasks/', self.data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_api_other_users_task(self):
+        url = f'/api/tasks/{self.other_task.id}/'
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api_client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api_client.patch(url, {'status': 'completed'}, format='json').status_code, status.HTTP_404_NOT_FOUND)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.api_client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(Task.objects.filter(pk=self.other_task.id).exists())
+
+    def test_html_views(self):
+        # Every page first loads the session and the user (2 queries)
+        with self.assertNumQueries(3):
+            self.client.get(reverse('task_detail', args=[self.task.id]))
+        with self.assertNumQueries(3):
+            self.client.get(reverse('task_edit', args=[self.task.id]))
+        with self.assertNumQueries(4):
+            self.client.post(reverse('task_edit', args=[self.task.id]), self.data)
+        with self.assertNumQueries(4):
+            self.client.get(reverse('task_delete', args=[self.task.id]))
+        self.assertFalse(Task.objects.filter(pk=self.task.id).exists())
+
+    def test_html_other_users_task(self):
+        for name in ['task_detail', 'task_edit', 'task_delete']:
+            with self.assertNumQueries(3):
+                response = self.client.get(reverse(name, args=[self.other_task.id]))
+            self.assertEqual(response.status_code, 404)
+        self.assertTrue(Task.objects.filter(pk=self.other_task.id).exists())
+
+
+@override_settings(PERFORMANCE_INSTRUMENTATION=True)
+class PerformanceMiddlewareTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        histogram.clear()
+        self.user = User.objects.create_user(username='testuser', password='TestPassword123')
+        Task.objects.create(title='Task 1', description='Description', due_date='2023-09-30', assignee=self.user)
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    def test_api_server_timing(self):
+        with self.assertLogs('task_manager.performance', 'INFO') as logs:
+            response = self.api_client.get('/api/tasks/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+        self.assertIn('desc="3 queries"', response['Server-Timing'])
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['url_name'], 'task_manger-list')
+        self.assertEqual(record['sql_count'], 3)
+        self.assertEqual(record['status'], 200)
+
+    def test_template_server_timing(self):
+        self.client.login(username='testuser', password='TestPassword123')
+        with self.assertLogs('task_manager.performance', 'INFO'):
+            response = self.client.get(reverse('task_list'))
+        self.assertIn('template;dur=', response['Server-Timing'])
+
+    def test_latency_histogram_is_staff_only(self):
+        with self.assertLogs('task_manager.performance', 'INFO'):
+            for _ in range(3):
+                self.api_client.get('/api/tasks/')
+            self.assertEqual(self.api_client.get(reverse('performance_stats')).status_code, status.HTTP_403_FORBIDDEN)
+
+            self.user.is_staff = True
+            self.user.save()
+            response = self.api_client.get(reverse('performance_stats'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = response.data['latency_ms']['task_manger-list']
+        self.assertEqual(stats['count'], 3)
+        self.assertLessEqual(stats['p50'], stats['p95'])
+        self.assertLessEqual(stats['p95'], stats['p99'])
+
+    def test_phases_leave_out_sql_time(self):
+        timings = RequestTimings()
+        reset = current_timings.set(timings)
+        self.addCleanup(current_timings.reset, reset)
+        with measure('serialize'):
+            # A query run while serializing, e.g. on a cache miss
+            timings(lambda *args: time.sleep(0.05), 'SELECT 1', (), False, {})
+        self.assertGreaterEqual(timings.sql_time, 0.05)
+        self.assertLess(timings.phases['serialize'], 0.05)
+
+    @override_settings(PERFORMANCE_INSTRUMENTATION=False)
+    def test_disabled_by_default(self):
+        response = self.api_client.get('/api/tasks/')
+        self.assertNotIn('Server-Timing', response)
+
+
+class ProductionSQLiteBackendTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connection.settings_dict,
+            'ENGINE': 'config.sqlite3',
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'OPTIONS': {
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'busy_timeout': 0},
+            },
+        }
+
+    def connect(self):
+        wrapper = SQLiteDatabaseWrapper(self.settings_dict, alias='production')
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def test_pragmas_are_applied(self):
+        with self.connect().cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        writer = self.connect()
+        other = self.connect()
+        # This is how transaction.atomic() opens a transaction on SQLite
+        writer._start_transaction_under_autocommit()
+        self.addCleanup(writer.connection.rollback)
+        # Without any statement yet, the open transaction already blocks other writers
+        with self.assertRaisesMessage(OperationalError, 'database is locked'):
+            other._start_transaction_under_autocommit()
+
+
+class AsyncTaskAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        self.other_task = Task.objects.create(title='Other', description='Other', due_date='2023-12-31', assignee=self.other_user)
+        # Django 4.2's AsyncClient ignores headers given to its constructor
+        self.headers = {'Authorization': f'Token {self.token.key}'}
+        self.async_client = AsyncClient()
+        self.api_client = APIClient()
+        self.api_client.force_authenticate(user=self.user)
+
+    async def test_requires_token(self):
+        response = await AsyncClient().get('/api/async/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = await AsyncClient().get('/api/async/tasks/', headers={'Authorization': 'Token invalid'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_list_matches_sync_api(self):
+        response = await self.async_client.get('/api/async/tasks/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sync_response = await sync_to_async(self.api_client.get)('/api/tasks/')
+        self.assertEqual(response.content, sync_response.content)
+
+    async def test_list_sparse_fields(self):
+        response = await self.async_client.get('/api/async/tasks/?fields=id,title', headers=self.headers)
+        self.assertEqual(response.json(), [{'id': self.task.id, 'title': 'Task'}])
+        response = await self.async_client.get('/api/async/tasks/?fields=secret', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def test_retrieve(self):
+        response = await self.async_client.get(f'/api/async/tasks/{self.task.id}/', headers=self.headers)
+        self.assertEqual(response.json(), TaskSerializer(self.task).data)
+        response = await self.async_client.get(f'/api/async/tasks/{self.other_task.id}/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    async def test_create(self):
+        data = {'title': 'New', 'description': 'New', 'due_date': '2024-01-01', 'assignee': self.other_user.id}
+        response = await self.async_client.post('/api/async/tasks/', data, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        task = await Task.objects.aget(pk=response.json()['id'])
+        self.assertEqual(task.assignee_id, self.user.id)
+        response = await self.async_client.post('/api/async/tasks/', {'title': 'New'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('due_date', response.json())
+
+    async def test_update(self):
+        url = f'/api/async/tasks/{self.task.id}/'
+        response = await self.async_client.patch(url, {'status': 'completed'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['status'], 'completed')
+        self.assertEqual((await Task.objects.aget(pk=self.task.id)).status, 'completed')
+        response = await self.async_client.put(url, {'title': 'Only title'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = await self.async_client.patch(f'/api/async/tasks/{self.other_task.id}/', {'status': 'completed'}, content_type='application/json', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_writes_invalidate_cached_list(self):
+        self.api_client.get('/api/tasks/')
+        # Sync, so that the commit callbacks are captured on the connection the view uses
+        with self.captureOnCommitCallbacks(execute=True):
+            async_to_sync(self.async_client.patch)(f'/api/async/tasks/{self.task.id}/', {'title': 'Renamed'}, content_type='application/json', headers=self.headers)
+        response = self.api_client.get('/api/tasks/')
+        self.assertEqual(response.data[0]['title'], 'Renamed')
+
+    async def test_delete(self):
+        response = await self.async_client.delete(f'/api/async/tasks/{self.other_task.id}/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = await self.async_client.delete(f'/api/async/tasks/{self.task.id}/', headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(await Task.objects.filter(pk=self.task.id).aexists())
+
+
+@override_settings(TASK_SYNC_OVERLAP=0, TASK_EVENT_STREAM_TIMEOUT=0)
+@override_settings(TASK_EVENT_STREAM_TIMEOUT=0)
+class TaskEventStreamTest(TestCase):
+    def setUp(self):
+        event_buffer.clear()
+        self.addCleanup(event_buffer.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('task_manger-events')
+
+    def parse(self, content):
+        # The events, and the last id sent with or without an event
+        events, last_id = [], None
+        for block in content.decode().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.splitlines() if not line.startswith(':') and ': ' in line)
+            last_id = fields.get('id', last_id)
+            if 'event' in fields:
+                events.append((fields.get('id'), fields['event'], json.loads(fields['data'])))
+        return events, last_id
+
+    def read_events(self, last_event_id=None):
+        headers = {'HTTP_LAST_EVENT_ID': last_event_id} if last_event_id else {}
+        response = self.client.get(self.url, HTTP_ACCEPT='text/event-stream', **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        return self.parse(b''.join(response.streaming_content))
+
+    def test_replays_changes_since_last_event_id(self):
+        _, position = self.read_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tasks/', {'title': 'Task', 'description': 'Description', 'due_date': '2023-12-31'}, format='json')
+            task_id = response.data['id']
+            self.client.patch(f'/api/tasks/{task_id}/', {'status': 'completed'}, format='json')
+            Task.objects.create(title='Other', description='Other', due_date='2023-12-31', assignee=self.other_user)
+
+        events, position = self.read_events(position)
+        self.assertEqual([(event, data['id'], data['status']) for _, event, data in events], [('created', task_id, 'pending'), ('updated', task_id, 'completed')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/tasks/{task_id}/')
+        events, position = self.read_events(position)
+        self.assertEqual([(event, data) for _, event, data in events], [('deleted', {'id': task_id})])
+
+        # Resuming from the last event replays nothing
+        self.assertEqual(self.read_events(position)[0], [])
+
+    def test_new_connection_starts_from_now(self):
+        Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        events, position = self.read_events()
+        self.assertEqual(events, [])
+        self.assertIsNotNone(position)
+
+    def test_changes_missing_from_the_buffer_are_read_from_the_feed(self):
+        _, position = self.read_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tasks/', {'title': 'Task', 'description': 'Description', 'due_date': '2023-12-31'}, format='json')
+            self.client.patch(f'/api/tasks/{response.data["id"]}/', {'status': 'completed'}, format='json')
+        # As after a restart, or more events than the buffer holds
+        event_buffer.clear()
+        events, position = self.read_events(position)
+        # Changes between two reads of the feed are sent once, as they are now
+        self.assertEqual([(event, data['id'], data['status']) for _, event, data in events], [('created', response.data['id'], 'completed')])
+        self.assertEqual(self.read_events(position)[0], [])
+
+    def test_streams_writes_of_other_processes(self):
+        task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        _, position = self.read_events()
+        # Written without signals, as another server process would look from here,
+        # and resumed from an id that process issued
+        Task.objects.filter(pk=task.pk).update(title='Renamed', updated_at=timezone.now())
+        TaskTombstone.objects.create(task_id=12345, assignee=self.user)
+        events, _ = self.read_events('1-1/' + position.rpartition('/')[2])
+        self.assertEqual([(event, data.get('title')) for _, event, data in events], [('updated', 'Renamed'), ('deleted', None)])
+
+    @override_settings(TASK_EVENT_STREAM_TIMEOUT=60, TASK_EVENT_POLL_INTERVAL=0.05, TASK_EVENT_KEEPALIVE=60)
+    def test_open_stream_polls_the_feed(self):
+        task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        stream = stream_events(self.user)
+        next(stream)
+        next(stream)
+        Task.objects.filter(pk=task.pk).update(title='Renamed', updated_at=timezone.now())
+        events, _ = self.parse(next(stream))
+        self.assertEqual([(event, data['title']) for _, event, data in events], [('updated', 'Renamed')])
+
+    @override_settings(TASK_EVENT_STREAM_TIMEOUT=60, TASK_EVENT_POLL_INTERVAL=60, TASK_EVENT_KEEPALIVE=60)
+    def test_open_stream_pushes_published_changes(self):
+        stream = stream_events(self.user)
+        next(stream)
+        next(stream)
+        timer = threading.Timer(0.05, event_buffer.publish, [[(self.user.id, 'deleted', {'id': 12345})]])
+        timer.start()
+        self.addCleanup(timer.cancel)
+        started = time.monotonic()
+        events, _ = self.parse(next(stream))
+        self.assertEqual([(event, data) for _, event, data in events], [('deleted', {'id': 12345})])
+        self.assertLess(time.monotonic() - started, 30)
+
+    def test_reassigned_task_is_deleted_for_previous_assignee(self):
+        task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        _, position = self.read_events()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/tasks/{task.id}/', {'assignee': self.other_user.id}, format='json')
+        events, _ = self.read_events(position)
+        self.assertEqual([(event, data) for _, event, data in events], [('deleted', {'id': task.id})])
+
+    def test_unknown_event_id_resets(self):
+        events, position = self.read_events('1-1')
+        self.assertEqual([event for _, event, _ in events], ['reset'])
+        self.assertEqual(self.read_events(position)[0], [])
+
+    def test_expired_event_id_resets(self):
+        expired = encode_sync_token(timezone.now() - timedelta(days=31))
+        self.assertEqual([event for _, event, _ in self.read_events(expired)[0]], ['reset'])
+
+    def test_future_event_id_resets(self):
+        future = encode_sync_token(timezone.now() + timedelta(days=1))
+        events, position = self.read_events(future)
+        self.assertEqual([event for _, event, _ in events], ['reset'])
+        self.assertLess(decode_sync_token(position.rpartition('/')[2]), timezone.now())
+
+    def test_requires_authentication(self):
+        response = APIClient().get(self.url, HTTP_ACCEPT='text/event-stream')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_events_are_published_on_commit(self):
+        position = event_buffer.position()
+        with mock.patch.object(event_notifier, 'notify') as notify:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.client.post('/api/tasks/', {'title': 'Task', 'description': 'Description', 'due_date': '2023-12-31'}, format='json')
+            notify.assert_not_called()
+            self.assertEqual(event_buffer.since(self.user.id, position), [])
+            for callback in callbacks:
+                callback()
+        notify.assert_called_once_with(self.user.id)
+        self.assertEqual([event for _, event, _ in event_buffer.since(self.user.id, position)], ['created'])
+
+    async def test_async_stream_ends_after_timeout(self):
+        token = await Token.objects.acreate(user=self.user)
+        response = await AsyncClient().get(self.url, headers={'Authorization': f'Token {token.key}', 'Accept': 'text/event-stream'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        events, position = self.parse(b''.join([chunk async for chunk in response.streaming_content]))
+        self.assertEqual(events, [])
+        self.assertIsNotNone(position)
+
+    @override_settings(TASK_EVENT_STREAM_TIMEOUT=60, TASK_EVENT_POLL_INTERVAL=60, TASK_EVENT_KEEPALIVE=60)
+    async def test_async_stream_wakes_up_on_publish(self):
+        stream = astream_events(self.user)
+        try:
+            await anext(stream)
+            await anext(stream)
+            next_chunk = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.05)
+            self.assertFalse(next_chunk.done())
+            # Published from another thread, as a commit in a sync view would
+            await asyncio.get_running_loop().run_in_executor(None, event_buffer.publish, [(self.user.id, 'deleted', {'id': 12345})])
+            events, _ = self.parse(await asyncio.wait_for(next_chunk, 5))
+            self.assertEqual([(event, data) for _, event, data in events], [('deleted', {'id': 12345})])
+        finally:
+            await stream.aclose()
+        self.assertEqual(event_notifier.waiters, {})
+
+
+@override_settings(TASK_SYNC_OVERLAP=0)
+class TaskSyncTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        self.unchanged = Task.objects.create(title='Unchanged', description='Description', due_date='2023-12-31', assignee=self.user)
+        Task.objects.update(updated_at=timezone.now() - timedelta(minutes=1))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def sync(self, token=None):
+        response = self.client.get('/api/tasks/changes/', {'since': token} if token else {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync(self):
+        data = self.sync()
+        self.assertTrue(data['full'])
+        self.assertEqual([task['id'] for task in data['changed']], [self.task.id, self.unchanged.id])
+        self.assertEqual(data['deleted'], [])
+
+    def test_changes_since_token(self):
+        token = self.sync()['token']
+        self.client.patch(f'/api/tasks/{self.task.id}/', {'status': 'completed'}, format='json')
+        created = self.client.post('/api/tasks/', {'title': 'New', 'description': 'New', 'due_date': '2024-01-01'}, format='json').data
+        self.client.delete(f'/api/tasks/{self.unchanged.id}/')
+        Task.objects.create(title='Other', description='Other', due_date='2023-12-31', assignee=self.other_user)
+
+        data = self.sync(token)
+        self.assertFalse(data['full'])
+        self.assertEqual([task['id'] for task in data['changed']], [self.task.id, created['id']])
+        self.assertEqual(data['changed'][0]['status'], 'completed')
+        self.assertEqual(data['deleted'], [self.unchanged.id])
+
+        data = self.sync(data['token'])
+        self.assertEqual((data['changed'], data['deleted']), ([], []))
+
+    def test_html_delete_records_tombstone(self):
+        token = self.sync()['token']
+        self.client.force_login(self.user)
+        self.client.get(reverse('task_delete', args=[self.task.id]))
+        self.assertEqual(self.sync(token)['deleted'], [self.task.id])
+
+    def test_reassigned_task_is_deleted_for_previous_assignee(self):
+        token = self.sync()['token']
+        self.client.patch(f'/api/tasks/{self.task.id}/', {'assignee': self.other_user.id}, format='json')
+        data = self.sync(token)
+        self.assertEqual((data['changed'], data['deleted']), ([], [self.task.id]))
+
+        # Given back, it is current again
+        self.task.refresh_from_db()
+        self.task.assignee = self.user
+        self.task.save()
+        data = self.sync(token)
+        self.assertEqual(([task['id'] for task in data['changed']], data['deleted']), ([self.task.id], []))
+
+    def test_expired_token_gets_full_sync(self):
+        with override_settings(TASK_TOMBSTONE_RETENTION_DAYS=0):
+            token = self.sync()['token']
+            self.assertTrue(self.sync(token)['full'])
+
+    def test_future_token_gets_full_sync(self):
+        data = self.sync(encode_sync_token(timezone.now() + timedelta(days=1)))
+        self.assertTrue(data['full'])
+        self.assertEqual(len(data['changed']), 2)
+        # The next token is back in the present
+        Task.objects.create(title='New', description='Description', due_date='2023-12-31', assignee=self.user)
+        self.assertEqual([task['title'] for task in self.sync(data['token'])['changed']], ['New'])
+
+    def test_forged_token(self):
+        forged = base64.urlsafe_b64encode(timezone.now().isoformat().encode()).decode().rstrip('=')
+        response = self.client.get('/api/tasks/changes/', {'since': forged})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        token = self.sync()['token']
+        response = self.client.get('/api/tasks/changes/', {'since': token[:-1] + ('y' if token.endswith('x') else 'x')})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_token(self):
+        response = self.client.get('/api/tasks/changes/', {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prune_tombstones(self):
+        TaskTombstone.objects.create(task_id=1, assignee=self.user, deleted_at=timezone.now() - timedelta(days=31))
+        recent = TaskTombstone.objects.create(task_id=2, assignee=self.user)
+        call_command('prune_tombstones', stdout=open(os.devnull, 'w'))
+        self.assertEqual(list(TaskTombstone.objects.all()), [recent])
+
+
+class TaskSearchTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.in_description = Task.objects.create(title='Call Bob', description='About the quarterly report', due_date='2023-12-01', assignee=self.user)
+        self.in_title = Task.objects.create(title='Quarterly report', description='Numbers', due_date='2023-12-31', assignee=self.user)
+        Task.objects.create(title='Unrelated', description='Nothing here', due_date='2023-12-31', assignee=self.user)
+        Task.objects.create(title='Quarterly report', description='Numbers', due_date='2023-12-31', assignee=self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def search(self, query):
+        response = self.client.get('/api/tasks/search/', {'q': query, 'fields': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data]
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search('report'), [self.in_title.id, self.in_description.id])
+        newer = Task.objects.create(title='Call Alice', description='Report', due_date='2023-12-31', assignee=self.user)
+        self.assertEqual(self.search('report'), [self.in_title.id, newer.id, self.in_description.id])
+
+    def test_prefix_matching(self):
+        self.assertEqual(self.search('quarterly rep'), [self.in_title.id, self.in_description.id])
+        self.assertEqual(self.search('bob quart'), [self.in_description.id])
+        # Only the last word is a prefix
+        self.assertEqual(self.search('quart report'), [])
+        # Whole words come before prefixes, even on older tasks
+        reporter = Task.objects.create(title='Reporter', description='', due_date='2023-12-31', assignee=self.user)
+        self.assertEqual(self.search('rep'), [reporter.id, self.in_title.id, self.in_description.id])
+        self.assertEqual(self.search('report'), [self.in_title.id, reporter.id, self.in_description.id])
+        self.assertEqual(self.search('reporte'), [reporter.id])
+        self.assertEqual(self.search('reports'), [])
+
+    def test_query_syntax_is_searched_as_text(self):
+        self.assertEqual(self.search('report OR "unrelated'), [])
+        self.assertEqual(self.search('***'), [])
+
+    def test_index_follows_writes(self):
+        self.client.patch(f'/api/tasks/{self.in_title.id}/', {'title': 'Budget'}, format='json')
+        self.assertEqual(self.search('report'), [self.in_description.id])
+        self.assertEqual(self.search('budget'), [self.in_title.id])
+        Task.objects.filter(pk=self.in_title.id).update(description='Annual report')
+        self.assertEqual(self.search('annual'), [self.in_title.id])
+        self.client.delete(f'/api/tasks/{self.in_description.id}/')
+        self.assertEqual(self.search('bob'), [])
+        Task.objects.filter(pk=self.in_title.id).update(assignee=self.other_user)
+        self.assertEqual(self.search('annual'), [])
+
+    def test_search_queries(self):
+        # Whole-word and prefix index lookups per ranking tier, then the tasks themselves
+        with self.assertNumQueries(5):
+            response = self.client.get('/api/tasks/search/', {'q': 'report'})
+        self.assertEqual(response.data[0], TaskSerializer(self.in_title).data)
+
+    def test_board_filter(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('task_list'), {'q': 'report'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([task.id for task in response.context['tasks']], [self.in_title.id, self.in_description.id])
+        self.assertContains(response, 'value="report"')
+
+
+class TaskListFilterTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        today = timezone.localdate()
+        monday = today - timedelta(days=today.weekday())
+        self.late = Task.objects.create(title='Late', description='', due_date=today - timedelta(days=10), assignee=self.user)
+        self.done = Task.objects.create(title='Done', description='', due_date=today - timedelta(days=10), status='completed', assignee=self.user)
+        self.monday = Task.objects.create(title='Monday', description='', due_date=monday, status='in_progress', assignee=self.user)
+        self.sunday = Task.objects.create(title='Sunday', description='', due_date=monday + timedelta(days=6), assignee=self.user)
+        self.later = Task.objects.create(title='Later', description='', due_date=today + timedelta(days=30), assignee=self.user)
+        Task.objects.create(title='Other', description='', due_date=today - timedelta(days=10), assignee=other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def list_ids(self, **params):
+        response = self.client.get('/api/tasks/', {**params, 'fields': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['id'] for task in response.data]
+
+    def test_status_filter(self):
+        self.assertEqual(self.list_ids(status='completed'), [self.done.id])
+
+    def test_overdue_filter(self):
+        # Completed tasks are not overdue, and a task due today is not late yet
+        expected = [self.late.id] + [self.monday.id] * (self.monday.due_date < timezone.localdate())
+        self.assertEqual(self.list_ids(due='overdue'), expected)
+        self.assertEqual(self.list_ids(due='overdue', status='completed'), [])
+
+    def test_due_this_week_filter(self):
+        self.assertEqual(self.list_ids(due='week'), [self.monday.id, self.sunday.id])
+        self.assertEqual(self.list_ids(due='week', status='in_progress'), [self.monday.id])
+
+    def test_ordering(self):
+        by_due_date = [self.late.id, self.done.id, self.monday.id, self.sunday.id, self.later.id]
+        self.assertEqual(self.list_ids(), by_due_date)
+        self.assertEqual(self.list_ids(ordering='-due_date'), by_due_date[::-1])
+        Task.objects.filter(pk=self.late.pk).update(created_at=timezone.now() + timedelta(days=1))
+        self.assertEqual(self.list_ids(ordering='created_at')[-1], self.late.id)
+        self.client.patch(f'/api/tasks/{self.monday.id}/', {'status': 'completed'}, format='json')
+        self.assertEqual(self.list_ids(ordering='-updated_at')[0], self.monday.id)
+
+    def test_pages_follow_the_ordering(self):
+        ids = []
+        url = '/api/tasks/?page_size=2&ordering=-created_at&fields=title'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(task['title'] for task in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(ids, ['Later', 'Sunday', 'Monday', 'Done', 'Late'])
+
+    def test_filters_are_cached_separately(self):
+        self.assertEqual(len(self.list_ids()), 5)
+        self.assertEqual(self.list_ids(status='completed'), [self.done.id])
+        self.assertEqual(len(self.list_ids()), 5)
+
+    def test_rejects_combinations_without_an_index(self):
+        response = self.client.get('/api/tasks/', {'ordering': 'updated_at', 'status': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', response.data)
+
+    def test_rejects_unknown_values(self):
+        response = self.client.get('/api/tasks/', {'ordering': 'title', 'status': 'late', 'due': 'soon'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(response.data), {'ordering', 'status', 'due'})
+
+    def test_date_relative_filters_have_no_last_modified(self):
+        response = self.client.get('/api/tasks/', {'due': 'overdue'})
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        self.assertNotEqual(response['ETag'], self.client.get('/api/tasks/')['ETag'])
+
+
+class TaskStatsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.today = timezone.localdate()
+        self.late = Task.objects.create(title='Late', description='', due_date=self.today - timedelta(days=3), assignee=self.user)
+        Task.objects.create(title='Today', description='', due_date=self.today, status='in_progress', assignee=self.user)
+        Task.objects.create(title='Soon', description='', due_date=self.today + timedelta(days=5), assignee=self.user)
+        Task.objects.create(title='Done', description='', due_date=self.today - timedelta(days=3), status='completed', assignee=self.user)
+        Task.objects.create(title='Other', description='', due_date=self.today, assignee=self.other_user)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def assertSummaryMatchesTasks(self, user):
+        self.assertEqual(get_task_stats(user, use_summary=True), get_task_stats(user, use_summary=False))
+
+    def test_stats(self):
+        response = self.client.get('/api/tasks/stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], {'pending': 2, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['overdue'], 1)
+        self.assertEqual(response.data['due_within'], {'1': 1, '7': 2, '30': 2})
+        self.assertEqual(len(response.data['completed_per_week']), 8)
+        self.assertEqual(response.data['completed_per_week'][-1], {
+            'week': (self.today - timedelta(days=self.today.weekday())).isoformat(), 'count': 1,
+        })
+        self.assertSummaryMatchesTasks(self.user)
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            get_task_stats(self.user)
+        with self.assertNumQueries(1):
+            get_task_stats(self.user, use_summary=False)
+
+    def test_summary_follows_writes(self):
+        self.client.patch(f'/api/tasks/{self.late.id}/', {'status': 'completed'}, format='json')
+        self.late.refresh_from_db()
+        self.assertIsNotNone(self.late.completed_at)
+        self.assertSummaryMatchesTasks(self.user)
+        self.client.patch('/api/tasks/bulk/', [{'id': self.late.id, 'status': 'pending', 'due_date': str(self.today)}], format='json')
+        self.assertSummaryMatchesTasks(self.user)
+        self.client.post('/api/tasks/bulk/', [{'title': 'New', 'description': 'New', 'due_date': str(self.today), 'status': 'completed'}], format='json')
+        Task.objects.filter(pk=self.late.pk).update(assignee=self.other_user)
+        self.assertSummaryMatchesTasks(self.user)
+        self.assertSummaryMatchesTasks(self.other_user)
+        self.client.delete(f'/api/tasks/{Task.objects.get(title="Done").id}/')
+        stats = get_task_stats(self.user)
+        self.assertEqual(stats['status'], {'pending': 1, 'in_progress': 1, 'completed': 1})
+        self.assertEqual(stats['completed_per_week'][-1]['count'], 1)
+        self.assertSummaryMatchesTasks(self.user)
+
+    def test_reopening_clears_completion(self):
+        task = Task.objects.get(title='Done')
+        task.status = 'pending'
+        task.save(update_fields=['status'])
+        task.refresh_from_db()
+        self.assertIsNone(task.completed_at)
+        self.assertEqual(get_task_stats(self.user)['completed_per_week'][-1]['count'], 0)
+
+    def test_stats_are_cached_until_a_write(self):
+        self.client.get('/api/tasks/stats/')
+        with self.assertNumQueries(0):
+            self.client.get('/api/tasks/stats/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/tasks/', {'title': 'New', 'description': 'New', 'due_date': str(self.today)}, format='json')
+        self.assertEqual(self.client.get('/api/tasks/stats/').data['total'], 5)
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.token = Token.objects.create(user=self.user)
+        self.task = Task.objects.create(title='Task', description='Description', due_date='2023-12-31', assignee=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(context)
+
+    def test_query_savings(self):
+        # The Token + User join is skipped once the token is cached, which saves one
+        # query per request: the task detail takes 1 query instead of 2, and a list
+        # served from the task cache takes none instead of 1.
+        for url, cached_queries in [(f'/api/tasks/{self.task.id}/', 1), ('/api/tasks/', 0), ('/api/tasks/stats/', 0)]:
+            with self.subTest(url=url):
+                token_cache.clear()
+                self.count_queries(url)
+                token_cache.clear()
+                uncached = self.count_queries(url)
+                self.assertEqual(self.count_queries(url), cached_queries)
+                self.assertEqual(uncached - cached_queries, 1)
+
+    def test_deleted_token_is_rejected(self):
+        self.count_queries('/api/tasks/')
+        self.token.delete()
+        self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_rotated_token(self):
+        self.count_queries('/api/tasks/')
+        Token.objects.filter(user=self.user).delete()
+        new_token = Token.objects.create(user=self.user)
+        self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {new_token.key}')
+        self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        self.count_queries('/api/tasks/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/tasks/').status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_requests_get_their_own_user(self):
+        self.count_queries('/api/tasks/')
+        first, second = token_cache.get(self.token.key), token_cache.get(self.token.key)
+        self.assertEqual(first.user, self.user)
+        self.assertIsNot(first.user, second.user)
+
+    @override_settings(TASK_TOKEN_CACHE_TTL=0)
+    def test_cache_can_be_disabled(self):
+        self.count_queries('/api/tasks/')
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    def test_cache_is_bounded(self):
+        lru = TokenCache(2)
+        users = [User.objects.create_user(username=f'user{i}') for i in range(3)]
+        tokens = [Token.objects.create(user=user) for user in users]
+        lru.set(tokens[0])
+        lru.set(tokens[1])
+        lru.get(tokens[0].key)
+        lru.set(tokens[2])
+        # The least recently used token made room for the new one
+        self.assertIsNone(lru.get(tokens[1].key))
+        self.assertEqual(lru.get(tokens[0].key).user, users[0])
+        self.assertEqual(lru.get(tokens[2].key).user, users[2])
+        lru.delete_user(users[0].pk)
+        self.assertIsNone(lru.get(tokens[0].key))
+
+    async def test_async_api_shares_the_cache(self):
+        headers = {'Authorization': f'Token {self.token.key}'}
+        response = await AsyncClient().get('/api/async/tasks/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        await sync_to_async(self.token.delete)()
+        response = await AsyncClient().get('/api/async/tasks/', headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PasswordHashingLimiterTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+
+    def hold_slot(self, limiter):
+        # Occupy a slot from another thread until the returned event is set
+        acquired, release = threading.Event(), threading.Event()
+
+        def hold():
+            with limiter.slot():
+                acquired.set()
+                release.wait(5)
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        acquired.wait(5)
+        self.addCleanup(thread.join)
+        self.addCleanup(release.set)
+        return release
+
+    def test_queues_then_rejects(self):
+        limiter = PasswordHashingLimiter(concurrency=1, queue_size=1, timeout=0.05)
+        release = self.hold_slot(limiter)
+        # A waiter times out when the slot does not free up in time
+        with self.assertRaises(PasswordHashingBusy):
+            with limiter.slot():
+                pass
+        release.set()
+        with limiter.slot():
+            pass
+        snapshot = limiter.snapshot()
+        self.assertEqual(snapshot['completed'], 2)
+        self.assertEqual(snapshot['rejected'], 1)
+        self.assertEqual((snapshot['in_progress'], snapshot['waiting']), (0, 0))
+        self.assertEqual(snapshot['wait_ms']['count'], 2)
+
+    def test_full_queue_rejects_at_once(self):
+        limiter = PasswordHashingLimiter(concurrency=1, queue_size=0, timeout=5)
+        self.hold_slot(limiter)
+        start = time.monotonic()
+        with self.assertRaises(PasswordHashingBusy):
+            with limiter.slot():
+                pass
+        self.assertLess(time.monotonic() - start, 1)
+
+    @mock.patch.object(hashing_limiter, 'queue_size', 0)
+    @mock.patch.object(hashing_limiter, 'concurrency', 1)
+    def test_busy_login_answers_503(self):
+        self.hold_slot(hashing_limiter)
+        response = APIClient().post('/api/login/', {'username': 'testuser', 'password': 'testpassword'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        response = Client().post(reverse('login'), {'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    @mock.patch.object(hashing_limiter, 'queue_size', 0)
+    @mock.patch.object(hashing_limiter, 'concurrency', 1)
+    def test_busy_login_answers_503_under_asgi(self):
+        self.hold_slot(hashing_limiter)
+        response = async_to_sync(AsyncClient().post)(reverse('login'), {'username': 'testuser', 'password': 'testpassword'})
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    def test_middleware_keeps_the_request_mode(self):
+        async def async_view(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(PasswordHashingBusyMiddleware(async_view)))
+        self.assertFalse(iscoroutinefunction(PasswordHashingBusyMiddleware(lambda request: HttpResponse())))
+
+    def test_login_uses_the_limiter(self):
+        completed = hashing_limiter.snapshot()['completed']
+        response = APIClient().post('/api/login/', {'username': 'testuser', 'password': 'testpassword'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(hashing_limiter.snapshot()['completed'], completed + 1)
+
+    def test_iterations_are_configurable(self):
+        with self.settings(TASK_PASSWORD_ITERATIONS=1000):
+            self.assertTrue(make_password('secret').startswith('pbkdf2_sha256$1000$'))
+            # Hashes made with the previous setting still work and are upgraded on use
+            self.assertTrue(self.user.check_password('testpassword'))
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+    def test_metrics_are_reported(self):
+        self.user.is_staff = True
+        self.user.save()
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        response = client.get(reverse('performance_stats'))
+        self.assertEqual(response.data['password_hashing']['concurrency'], hashing_limiter.concurrency)
+        self.assertIn('hash_ms', response.data['password_hashing'])
+
+
+class JobQueueTest(TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(job_registry, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.calls = []
+        register_job('record', batch_size=2)(self.calls.append)
+
+    def test_jobs_run_in_batches(self):
+        for number in range(5):
+            enqueue('record', {'number': number})
+        jobs = claim_jobs(10)
+        self.assertEqual(len(jobs), 5)
+        self.assertEqual(run_jobs(jobs), {'done': 5, 'retried': 0, 'failed': 0})
+        self.assertEqual(self.calls, [
+            [{'number': 0}, {'number': 1}], [{'number': 2}, {'number': 3}], [{'number': 4}],
+        ])
+        self.assertEqual(Job.objects.filter(status='done').count(), 5)
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_idempotency_key(self):
+        self.assertTrue(enqueue('record', {'number': 1}, key='once'))
+        self.assertFalse(enqueue('record', {'number': 2}, key='once'))
+        run_jobs(claim_jobs(10))
+        self.assertFalse(enqueue('record', {'number': 3}, key='once'))
+        self.assertEqual(self.calls, [[{'number': 1}]])
+
+    def test_delayed_jobs_wait(self):
+        enqueue('record', delay=60)
+        self.assertEqual(claim_jobs(10), [])
+        self.assertEqual(len(claim_jobs(10, now=timezone.now() + timedelta(seconds=61))), 1)
+
+    def test_claimed_jobs_are_not_claimed_again(self):
+        enqueue('record')
+        self.assertEqual(len(claim_jobs(10)), 1)
+        self.assertEqual(claim_jobs(10), [])
+
+    def test_expired_lease_is_taken_over(self):
+        enqueue('record')
+        first = claim_jobs(10)
+        later = timezone.now() + timedelta(seconds=301)
+        second = claim_jobs(10, now=later)
+        self.assertEqual(second[0].attempts, 2)
+        # The first worker's result is ignored, the second one's recorded.
+        run_jobs(first)
+        self.assertEqual(Job.objects.get().status, 'running')
+        run_jobs(second, now=later)
+        self.assertEqual(Job.objects.get().status, 'done')
+
+    @override_settings(TASK_JOB_MAX_ATTEMPTS=2)
+    def test_job_killing_its_worker_fails(self):
+        enqueue('record')
+        now = timezone.now()
+        # Each worker dies without recording anything, so every lease runs out
+        self.assertEqual(len(claim_jobs(10, now=now)), 1)
+        now += timedelta(seconds=301)
+        self.assertEqual(claim_jobs(10, now=now)[0].attempts, 2)
+        now += timedelta(seconds=301)
+        self.assertEqual(claim_jobs(10, now=now), [])
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts, job.claimed_by), ('failed', 2, ''))
+        self.assertIn('Lease expired', job.last_error)
+
+    @override_settings(TASK_JOB_MAX_ATTEMPTS=3, TASK_JOB_RETRY_DELAY=10)
+    def test_retries_with_backoff(self):
+        def fail(payloads):
+            Task.objects.create(title='Rolled back', description='Rolled back', due_date='2030-01-01')
+            raise RuntimeError('boom')
+        register_job('fail')(fail)
+        enqueue('fail')
+        now = timezone.now()
+        for attempt, delay in [(1, 10), (2, 20)]:
+            self.assertEqual(run_jobs(claim_jobs(10, now=now), now=now), {'done': 0, 'retried': 1, 'failed': 0})
+            job = Job.objects.get()
+            self.assertEqual((job.status, job.attempts, job.run_at), ('pending', attempt, now + timedelta(seconds=delay)))
+            self.assertEqual(job.last_error, 'RuntimeError: boom')
+            self.assertEqual(claim_jobs(10, now=now), [])
+            now = job.run_at
+        self.assertEqual(run_jobs(claim_jobs(10, now=now), now=now), {'done': 0, 'retried': 0, 'failed': 1})
+        self.assertEqual(Job.objects.get().status, 'failed')
+        self.assertFalse(Task.objects.exists())
+
+    def test_unknown_job_fails(self):
+        enqueue('unknown')
+        self.assertEqual(run_jobs(claim_jobs(10)), {'done': 0, 'retried': 0, 'failed': 1})
+        self.assertIn('No handler', Job.objects.get().last_error)
+
+    def test_enqueue_follows_the_transaction(self):
+        from django.db import transaction
+        try:
+            with transaction.atomic():
+                enqueue('record')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertFalse(Job.objects.exists())
+
+    @override_settings(TASK_JOB_RETENTION_DAYS=7)
+    def test_prune(self):
+        enqueue('record', key='old')
+        run_jobs(claim_jobs(10))
+        self.assertEqual(prune_jobs(), 0)
+        self.assertEqual(prune_jobs(now=timezone.now() + timedelta(days=8)), 1)
+        self.assertTrue(enqueue('record', key='old'))
+
+    def test_worker_command(self):
+        for number in range(3):
+            enqueue('record', {'number': number})
+        out = StringIO()
+        call_command('run_jobs', once=True, stdout=out)
+        self.assertEqual(len(self.calls), 2)
+        self.assertIn('Jobs done: 3, retried: 0, failed: 0.', out.getvalue())
+
+
+@override_settings(TASK_REMINDER_BACKEND='task_manager.reminders.LocmemReminderBackend', TASK_REMINDER_DUE_SOON_DAYS=1)
+@override_settings(TASK_SYNC_OVERLAP=0)
+class ReminderTest(TestCase):
+    def setUp(self):
+        reminder_outbox.clear()
+        self.addCleanup(reminder_outbox.clear)
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.today = timezone.localdate()
+        self.yesterday = self.create_task('Yesterday', -1)
+        self.last_week = self.create_task('Last week', -7)
+        self.tomorrow = self.create_task('Tomorrow', 1)
+        self.next_week = self.create_task('Next week', 7)
+        self.done = self.create_task('Done', -1, status='completed')
+
+    def create_task(self, title, days, status='pending'):
+        return Task.objects.create(
+            title=title, description=title, due_date=self.today + timedelta(days=days), status=status, assignee=self.user,
+        )
+
+    def sent(self):
+        sent = sorted((reminder.kind, reminder.task.title) for reminder in reminder_outbox)
+        reminder_outbox.clear()
+        return sent
+
+    def test_first_run_starts_from_the_current_state(self):
+        self.assertEqual(send_reminders(today=self.today), {'due_soon': 1, 'overdue': 1})
+        self.assertEqual(self.sent(), [('due_soon', 'Tomorrow'), ('overdue', 'Yesterday')])
+
+    def test_reminders_are_sent_once(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.assertEqual(send_reminders(today=self.today), {'due_soon': 0, 'overdue': 0})
+        self.assertEqual(self.sent(), [])
+
+    def test_next_day_sends_the_new_crossings(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.create_task('Day after tomorrow', 2)
+        send_reminders(today=self.today + timedelta(days=2))
+        self.assertEqual(self.sent(), [('due_soon', 'Day after tomorrow'), ('overdue', 'Tomorrow')])
+
+    def test_missed_days_are_caught_up(self):
+        send_reminders(today=self.today)
+        self.sent()
+        send_reminders(today=self.today + timedelta(days=8))
+        self.assertEqual(self.sent(), [('overdue', 'Next week'), ('overdue', 'Tomorrow')])
+
+    def test_new_tasks_past_a_threshold(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.create_task('Created late', -3)
+        self.create_task('Created due today', 0)
+        send_reminders(today=self.today)
+        self.assertEqual(self.sent(), [('due_soon', 'Created due today'), ('overdue', 'Created late')])
+
+    def test_completed_and_rescheduled_tasks_are_skipped(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.next_week.status = 'completed'
+        self.next_week.save()
+        send_reminders(today=self.today + timedelta(days=6))
+        self.assertEqual(self.sent(), [('overdue', 'Tomorrow')])
+
+    def test_moved_due_date_is_reminded_again(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.tomorrow.due_date = self.today + timedelta(days=3)
+        self.tomorrow.save()
+        send_reminders(today=self.today + timedelta(days=2))
+        self.assertEqual(self.sent(), [('due_soon', 'Tomorrow')])
+        self.assertEqual(ReminderDelivery.objects.filter(task_id=self.tomorrow.id, kind='due_soon').count(), 2)
+
+    def test_task_rescheduled_into_a_scanned_range(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.next_week.due_date = self.today - timedelta(days=2)
+        self.next_week.save()
+        self.assertEqual(send_reminders(today=self.today), {'due_soon': 0, 'overdue': 1})
+        self.assertEqual(self.sent(), [('overdue', 'Next week')])
+
+    def test_reopened_task(self):
+        send_reminders(today=self.today)
+        self.sent()
+        self.done.status = 'pending'
+        self.done.save()
+        send_reminders(today=self.today)
+        self.assertEqual(self.sent(), [('overdue', 'Done')])
+
+    @override_settings(TASK_SYNC_OVERLAP=5)
+    def test_late_commits_are_caught(self):
+        send_reminders(today=self.today)
+        self.sent()
+        # Written before the previous run started, but committed after it read
+        late = self.create_task('Late', -2)
+        Task.objects.filter(pk=late.pk).update(updated_at=ReminderWatermark.objects.get(kind='overdue').updated_at - timedelta(seconds=2))
+        send_reminders(today=self.today)
+        self.assertIn(('overdue', 'Late'), self.sent())
+
+    def test_written_tasks_are_read_through_the_updated_index(self):
+        plan = Task.objects.filter(updated_at__gt=timezone.now()).values_list('id', 'status', 'due_date').explain()
+        self.assertIn('task_updated_idx', plan)
+        self.assertNotIn('SCAN', plan)
+
+    def test_reminders_are_sent_after_the_commit(self):
+        depth = len(connection.atomic_blocks)
+
+        def send(backend, reminders):
+            # Recorded, and no transaction of send_reminders is open any more
+            self.assertEqual(len(connection.atomic_blocks), depth)
+            self.assertEqual(ReminderDelivery.objects.filter(task_id__in=[reminder.task.id for reminder in reminders]).count(), len(reminders))
+
+        with mock.patch('task_manager.reminders.LocmemReminderBackend.send', autospec=True, side_effect=send) as mocked:
+            send_reminders(today=self.today)
+        self.assertEqual(mocked.call_count, 2)
+
+    def test_failed_delivery_is_retried(self):
+        with mock.patch('task_manager.reminders.LocmemReminderBackend.send', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                send_reminders(today=self.today)
+        self.assertFalse(ReminderDelivery.objects.exists())
+        send_reminders(today=self.today)
+        self.assertEqual(len(self.sent()), 2)
+
+    def test_delivered_reminders_are_marked_sent(self):
+        send_reminders(today=self.today)
+        self.assertEqual(ReminderDelivery.objects.filter(sent=True).count(), 2)
+        self.assertFalse(ReminderDelivery.objects.filter(sent=False).exists())
+
+    def test_unsent_reminders_are_delivered_again(self):
+        send_reminders(today=self.today)
+        self.sent()
+        # Recorded by a run that died while sending
+        ReminderDelivery.objects.filter(task_id=self.yesterday.id).update(sent=False, sent_at=timezone.now() - timedelta(minutes=10))
+        self.assertEqual(send_reminders(today=self.today), {'due_soon': 0, 'overdue': 1})
+        self.assertEqual(self.sent(), [('overdue', 'Yesterday')])
+        self.assertTrue(ReminderDelivery.objects.get(task_id=self.yesterday.id).sent)
+        send_reminders(today=self.today)
+        self.assertEqual(self.sent(), [])
+
+    def test_recent_unsent_reminders_are_left_to_their_run(self):
+        send_reminders(today=self.today)
+        self.sent()
+        ReminderDelivery.objects.filter(task_id=self.yesterday.id).update(sent=False)
+        send_reminders(today=self.today)
+        self.assertEqual(self.sent(), [])
+
+    def test_unsent_reminders_of_completed_tasks_are_dropped(self):
+        send_reminders(today=self.today)
+        self.sent()
+        ReminderDelivery.objects.filter(task_id=self.yesterday.id).update(sent=False, sent_at=timezone.now() - timedelta(minutes=10))
+        self.yesterday.status = 'completed'
+        self.yesterday.save()
+        send_reminders(today=self.today)
+        self.assertEqual(self.sent(), [])
+        self.assertFalse(ReminderDelivery.objects.filter(task_id=self.yesterday.id).exists())
+
+    def test_batches(self):
+        send_reminders(today=self.today)
+        self.sent()
+        with mock.patch('task_manager.reminders.LocmemReminderBackend.send', autospec=True) as send:
+            send_reminders(today=self.today + timedelta(days=10), batch_size=1)
+        # Tomorrow and Next week became overdue, one per batch.
+        self.assertEqual([len(call.args[1]) for call in send.call_args_list], [1, 1])
+        self.assertEqual(ReminderDelivery.objects.filter(kind='overdue').count(), 3)
+
+    def test_scan_uses_the_status_index(self):
+        plan = Task.objects.filter(status__in=['pending', 'in_progress'], due_date__gt=self.today, due_date__lte=self.today).values('id').explain()
+        self.assertIn('task_status_due_idx', plan)
+
+    def test_file_backend(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'reminders.log')
+            with override_settings(TASK_REMINDER_FILE_PATH=path):
+                send_reminders(today=self.today, backend=FileReminderBackend())
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+        self.assertEqual(sorted(line['kind'] for line in lines), ['due_soon', 'overdue'])
+        self.assertEqual(lines[0]['user'], 'testuser')
+
+    def test_command(self):
+        out = StringIO()
+        call_command('send_reminders', stdout=out)
+        self.assertIn('Reminders sent: 1 due_soon, 1 overdue.', out.getvalue())
+
+
+@override_settings(TASK_ARCHIVE_AFTER_DAYS=90)
+class TaskArchiveTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpassword')
+        self.other_user = User.objects.create_user(username='otheruser', password='testpassword')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        old = timezone.now() - timedelta(days=100)
+        self.old = [self.create_task(f'Old {index}', 'completed', old) for index in range(3)]
+        self.recent = self.create_task('Recent', 'completed', timezone.now() - timedelta(days=10))
+        self.open = self.create_task('Open', 'pending')
+        self.others = self.create_task('Other user', 'completed', old, assignee=self.other_user)
+
+    def create_task(self, title, status, completed_at=None, assignee=None):
+        task = Task.objects.create(
+            title=title, description=title, due_date='2023-10-01', status=status, assignee=assignee or self.user,
+        )
+        if completed_at is not None:
+            Task.objects.filter(pk=task.pk).update(completed_at=completed_at)
+        return task
+
+    def archive(self, **options):
+        out = StringIO()
+        call_command('archive_tasks', stdout=out, **options)
+        return out.getvalue()
+
+    def test_moves_old_completed_tasks(self):
+        self.assertIn('Archived 4 tasks.', self.archive(batch_size=2))
+        self.assertEqual(set(Task.objects.values_list('title', flat=True)), {'Recent', 'Open'})
+        archived = ArchivedTask.objects.get(pk=self.old[0].pk)
+        self.assertEqual((archived.title, archived.assignee_id, archived.status), ('Old 0', self.user.id, 'completed'))
+        self.assertEqual(archived.created_at, self.old[0].created_at)
+        self.assertIn('Archived 0 tasks.', self.archive())
+
+    def test_days_option(self):
+        self.archive(days=5)
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Open'])
+
+    def test_archived_tasks_leave_lists_and_syncing_clients(self):
+        self.assertEqual(len(self.client.get('/api/tasks/').data), 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.archive()
+        self.assertEqual([task['title'] for task in self.client.get('/api/tasks/').data], ['Recent', 'Open'])
+        self.assertEqual(
+            set(TaskTombstone.objects.filter(assignee=self.user).values_list('task_id', flat=True)),
+            {task.pk for task in self.old},
+        )
+
+    def test_archive_uses_the_completion_index(self):
+        plan = Task.objects.filter(status='completed', completed_at__lt=timezone.now()).order_by('completed_at', 'id').explain()
+        self.assertIn('task_status_completed_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_read_only_api(self):
+        self.archive()
+        response = self.client.get('/api/archived-tasks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task['id'] for task in response.data], [task.pk for task in self.old])
+        self.assertIn('archived_at', response.data[0])
+
+        response = self.client.get(f'/api/archived-tasks/{self.old[0].pk}/')
+        self.assertEqual(response.data['title'], 'Old 0')
+        self.assertEqual(self.client.get(f'/api/archived-tasks/{self.others.pk}/').status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get('/api/archived-tasks/?page_size=2')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(len(self.client.get(response.data['next']).data['results']), 1)
+
+        self.assertEqual(self.client.delete(f'/api/archived-tasks/{self.old[0].pk}/').status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(self.client.post('/api/archived-tasks/', {}).status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get('/api/archived-tasks/').status_code, status.HTTP_401_UNAUTHORIZED)
@@ -1,15 +1,20 @@
 from django.urls import path,include
-from .api import UserLoginView, UserRegistrationView, TaskViewSet
+from .api import UserLoginView, UserRegistrationView, TaskViewSet, ArchivedTaskViewSet, PerformanceStatsView
+from .async_api import AsyncTaskListView, AsyncTaskDetailView
 from rest_framework.routers import DefaultRouter
 from . import views
 
 # for apis
 router = DefaultRouter()
 router.register(r'tasks', TaskViewSet, basename='task_manger')
+router.register(r'archived-tasks', ArchivedTaskViewSet, basename='archived_task')
 
 urlpatterns = [
     path('api/login/', UserLoginView.as_view(), name='user_login'),
     path('api/register/', UserRegistrationView.as_view(), name='user_registration'),
+    path('api/performance/', PerformanceStatsView.as_view(), name='performance_stats'),
+    path('api/async/tasks/', AsyncTaskListView.as_view(), name='async_task_list'),
+    path('api/async/tasks/<int:pk>/', AsyncTaskDetailView.as_view(), name='async_task_detail'),
     path('api/', include(router.urls)),
 ]
 
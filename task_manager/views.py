@@ -1,8 +1,15 @@
-from django.shortcuts import get_object_or_404, redirect
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from django.shortcuts import redirect
 from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, View
 from .models import Task
 from .forms import TaskForm
+from .cache import get_or_set_task_list
+from .board import BOARD_COLUMNS, build_board, build_search_board, get_column_limit, render_cards
+from .conditional import task_list_validators, task_validators, not_modified_response, set_validators
+from .signals import tasks_saved, tasks_deleted
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import reverse_lazy
@@ -42,6 +49,72 @@ class TaskListView(LoginRequiredMixin, ListView):
     template_name = 'task_manager/task_list.html'
     context_object_name = 'tasks'
 
+    def get(self, request, *args, **kwargs):
+        """
+        Render the task board, or answer 304 if the client's copy is still current.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            HttpResponse: The rendered board or a 304 Not Modified response.
+        """
+        etag, last_modified = task_list_validators(request.user, request.get_full_path())
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return set_validators(super().get(request, *args, **kwargs), etag, last_modified)
+
+    def get_queryset(self):
+        """
+        Retrieve the tasks shown on the current user's board.
+
+        The board is loaded column by column, each one capped by its limit, and
+        cached per user until one of their tasks is written. With ``?q=`` it only
+        holds the tasks matching that search.
+
+        Returns:
+            list: Tasks shown on the board, column after column.
+        """
+        user = self.request.user
+        self.query = self.request.GET.get('q', '').strip()
+        if self.query:
+            self.columns = build_search_board(user, self.query, getattr(settings, 'TASK_SEARCH_LIMIT', 50))
+            return [task for column in self.columns for task in column['tasks']]
+        self.limits = {status: get_column_limit(self.request.GET, status) for status, _ in BOARD_COLUMNS}
+        name = 'board:' + ':'.join(str(self.limits[status]) for status, _ in BOARD_COLUMNS)
+        self.columns = get_or_set_task_list(user.id, name, lambda: build_board(user, self.limits))
+        return [task for column in self.columns for task in column['tasks']]
+
+    def get_context_data(self, **kwargs):
+        """
+        Add the search text and the board columns, each with its rendered cards
+        and a "load more" link when it has hidden cards below the column maximum.
+
+        Returns:
+            dict: The template context.
+        """
+        context = super().get_context_data(**kwargs)
+        step = getattr(settings, 'TASK_BOARD_COLUMN_LIMIT', 50)
+        context['query'] = self.query
+        context['columns'] = []
+        for column in self.columns:
+            more_url = None
+            if column['has_more'] and self.limits[column['status']] < getattr(settings, 'TASK_BOARD_COLUMN_MAX', 500):
+                params = self.request.GET.copy()
+                params[column['status']] = self.limits[column['status']] + step
+                more_url = f'?{params.urlencode()}'
+            context['columns'].append({**column, 'cards': render_cards(column['tasks']), 'more_url': more_url})
+        return context
+
+class TaskAssigneeMixin:
+    """
+    Restrict a single-task view to the tasks assigned to the current user.
+
+    Ownership is part of the lookup query, so other users' tasks answer 404 and no
+    separate permission check (or load of the assignee) is needed.
+    """
+
     def get_queryset(self):
         """
         Retrieve tasks assigned to the current user.
@@ -49,9 +122,9 @@ class TaskListView(LoginRequiredMixin, ListView):
         Returns:
             QuerySet: Tasks assigned to the current user.
         """
-        return Task.objects.filter(assignee=self.request.user)
+        return Task.objects.filter(assignee_id=self.request.user.id)
 
-class TaskDetailView(LoginRequiredMixin, DetailView):
+class TaskDetailView(LoginRequiredMixin, TaskAssigneeMixin, DetailView):
     """
     View for displaying the details of a task.
 
@@ -61,6 +134,24 @@ class TaskDetailView(LoginRequiredMixin, DetailView):
     template_name = 'task_manager/task_detail.html'
     context_object_name = 'task'
 
+    def get(self, request, *args, **kwargs):
+        """
+        Render the task, or answer 304 if the client's copy is still current.
+
+        Args:
+            request (HttpRequest): The incoming HTTP request.
+
+        Returns:
+            HttpResponse: The rendered task or a 304 Not Modified response.
+        """
+        self.object = self.get_object()
+        etag, last_modified = task_validators(self.object, request.user)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        response = self.render_to_response(self.get_context_data(object=self.object))
+        return set_validators(response, etag, last_modified)
+
 class TaskCreateView(LoginRequiredMixin, CreateView):
     """
     View for creating a new task.
@@ -83,9 +174,11 @@ class TaskCreateView(LoginRequiredMixin, CreateView):
             HttpResponseRedirect: Redirects to the task list page.
         """
         form.instance.assignee = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        tasks_saved.send(sender=Task, tasks=[self.object], created=True)
+        return response
 
-class TaskUpdateView(LoginRequiredMixin, UpdateView):
+class TaskUpdateView(LoginRequiredMixin, TaskAssigneeMixin, UpdateView):
     """
     View for updating an existing task.
 
@@ -96,6 +189,20 @@ class TaskUpdateView(LoginRequiredMixin, UpdateView):
     form_class = TaskForm
     success_url = reverse_lazy('task_list')
 
+    def form_valid(self, form):
+        """
+        Save the updated task.
+
+        Args:
+            form (TaskForm): The form containing task data.
+
+        Returns:
+            HttpResponseRedirect: Redirects to the task list page.
+        """
+        response = super().form_valid(form)
+        tasks_saved.send(sender=Task, tasks=[self.object], created=False)
+        return response
+
 class TaskDeleteView(LoginRequiredMixin, View):
     """
     View for deleting a task.
@@ -106,16 +213,25 @@ class TaskDeleteView(LoginRequiredMixin, View):
         """
         Delete the task if the current user is the assignee.
 
+        The ownership check and the deletion are a single DELETE query.
+
         Args:
             request (HttpRequest): The incoming HTTP request.
             pk (int): The primary key of the task to delete.
 
         Returns:
             HttpResponseRedirect: Redirects to the task list page.
+
+        Raises:
+            Http404: If the user has no task with this primary key.
         """
-        task = get_object_or_404(Task, pk=pk)
-        if task.assignee == request.user:
-            task.delete()
+        # The deletion commits together with the tombstone the signal records.
+        with transaction.atomic(savepoint=False):
+            deleted, _ = Task.objects.filter(pk=pk, assignee_id=request.user.id).delete()
+            if deleted:
+                tasks_deleted.send(sender=Task, task_assignees={pk: request.user.id})
+        if not deleted:
+            raise Http404('No task found matching the query')
         return redirect('task_list')
 
             